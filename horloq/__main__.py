@@ -5,8 +5,11 @@ Horloq - 拡張可能デスクトップ据え置き時計
 """
 
 import sys
+import multiprocessing
 from horloq.cli import main
 
 
 if __name__ == "__main__":
+    # ビルド版で別プロセスのプラグインホストを起動できるようにする
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -3,17 +3,30 @@ CLI コマンド
 """
 
 import sys
+import json
 import argparse
+from datetime import datetime
 from pathlib import Path
 from .core.config import ConfigManager
 from .plugins.installer import PluginInstaller
+from .plugins.bytecode import BytecodeCache
+from .plugins.deps import DependencyRoots
+from .plugins.accounting import ResourceMonitor
+from .core.watchdog import MainThreadWatchdog
 
 
 def plugin_command(args):
     """プラグイン管理コマンド"""
-    config = ConfigManager()
+    config = ConfigManager.shared()
     plugin_dir = config.config_path.parent / "plugins"
-    installer = PluginInstaller(plugin_dir)
+    bytecode_cache = BytecodeCache(config.config_path.parent / BytecodeCache.DIRNAME)
+    dependency_roots = DependencyRoots(config.config_path.parent / DependencyRoots.DIRNAME)
+    installer = PluginInstaller(
+        plugin_dir,
+        bytecode_cache=bytecode_cache,
+        dependency_roots=dependency_roots,
+        install_format=config.get("plugins.install_format", "directory"),
+    )
     
     if args.plugin_action == "install":
         if not args.source:
@@ -22,7 +35,11 @@ def plugin_command(args):
             return 1
         
         print(f"プラグインをインストールしています: {args.source}")
-        success, message = installer.install_from_github(args.source)
+        if Path(args.source).exists():
+            # ローカルのディレクトリまたはパッケージファイル
+            success, message = installer.install_from_local(Path(args.source))
+        else:
+            success, message = installer.install_from_github(args.source)
         print(message)
         return 0 if success else 1
     
@@ -54,11 +71,186 @@ def plugin_command(args):
                 print()
         return 0
     
+    elif args.plugin_action == "pack":
+        if not args.source:
+            print("エラー: プラグインのディレクトリを指定してください")
+            print("例: horloq plugin pack ./my-plugin -o dist")
+            return 1
+        
+        success, message = installer.pack_plugin(Path(args.source), args.output)
+        print(f"パッケージを作成しました: {message}" if success else message)
+        return 0 if success else 1
+    
+    elif args.plugin_action == "bench":
+        if args.source and Path(args.source).is_dir():
+            return bench_layouts(installer, Path(args.source))
+        return bench_plugins(installer, bytecode_cache, args.source)
+    
+    elif args.plugin_action == "stats":
+        return show_stats(config.config_path.parent / ResourceMonitor.STATS_FILENAME, args.source, args.json)
+    
     else:
         print("エラー: 不明なアクション")
         return 1
 
 
+def bench_plugins(installer, bytecode_cache, plugin_name=None):
+    """プラグインの読み込み時間（ソースから／バイトコードキャッシュから）を計測"""
+    # プラグインのコードを実行するため、計測するときだけローダーを読み込む
+    from .plugins.loader import PluginLoader
+    
+    loader = PluginLoader(
+        [installer.plugin_dir],
+        installer.index,
+        bytecode_cache,
+        installer.dependency_roots,
+    )
+    names = [plugin_name] if plugin_name else loader.discover_plugins()
+    if not names:
+        print("インストール済みのプラグインはありません")
+        return 0
+    
+    print(f"{'プラグイン':<24}{'コールド':>12}{'ウォーム':>12}")
+    print("-" * 48)
+    failed = False
+    for name in names:
+        result = loader.benchmark_import(name)
+        if result is None:
+            print(f"{name:<24}{'失敗':>12}")
+            failed = True
+            continue
+        print(f"{name:<24}{result['cold_ms']:>10.2f}ms{result['warm_ms']:>10.2f}ms")
+    return 1 if failed else 0
+
+
+def show_stats(stats_path, plugin_name=None, as_json=False):
+    """起動中のアプリが書き出したプラグインごとのリソース使用量を表示"""
+    data = ResourceMonitor.read_stats(stats_path)
+    if data is None:
+        print("使用量の記録がありません（アプリの起動中に1分ごとと終了時に書き出されます）")
+        return 1
+    
+    plugins = data.get("plugins", {})
+    if plugin_name:
+        plugins = {name: usage for name, usage in plugins.items() if name == plugin_name}
+    
+    if as_json:
+        print(json.dumps({**data, "plugins": plugins}, ensure_ascii=False, indent=2))
+        return 0
+    
+    updated_at = datetime.fromtimestamp(data.get("updated_at", 0)).strftime("%Y-%m-%d %H:%M:%S")
+    print(f"記録時刻: {updated_at} (PID {data.get('pid')})")
+    print(f"{'プラグイン':<20}{'CPU%':>7}{'CPU(ms)':>10}{'メモリ':>10}{'タイマー':>8}{'起床/分':>8}{'リスナー':>8}{'スレッド':>8}")
+    print("-" * 79)
+    for name, usage in sorted(plugins.items(), key=lambda item: -item[1].get("cpu_percent", 0)):
+        memory = usage.get("memory_bytes")
+        memory_text = f"{memory / 1024:.0f}KiB" if memory is not None else "-"
+        print(
+            f"{name:<20}{usage.get('cpu_percent', 0):>7.2f}{usage.get('cpu_ms', 0):>10.1f}"
+            f"{memory_text:>10}{usage.get('after_jobs', 0):>8}{usage.get('wakeups_per_min', 0):>8}"
+            f"{usage.get('listeners', 0):>8}{usage.get('threads', 0):>8}"
+        )
+    return 0
+
+
+def stalls_command(args):
+    """UIスレッドの停止の記録を表示するコマンド"""
+    config = ConfigManager.shared()
+    return show_stalls(config.config_path.parent / MainThreadWatchdog.REPORT_FILENAME, args.json)
+
+
+def show_stalls(report_path, as_json=False):
+    """起動中のアプリが書き出したUIスレッドの停止の原因を停止時間の合計の多い順に表示"""
+    data = MainThreadWatchdog.read_report(report_path)
+    if data is None:
+        print("停止の記録がありません（アプリの起動中に1分ごとと終了時に書き出されます）")
+        return 1
+    
+    if as_json:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return 0
+    
+    updated_at = datetime.fromtimestamp(data.get("updated_at", 0)).strftime("%Y-%m-%d %H:%M:%S")
+    print(f"記録時刻: {updated_at} (PID {data.get('pid')})")
+    print(
+        f"{data.get('threshold_ms', 0)}ms 以上の停止: {data.get('stalls', 0)} 回 / "
+        f"合計 {data.get('blocked_ms', 0) / 1000:.1f} 秒"
+    )
+    offenders = data.get("offenders", [])
+    if not offenders:
+        return 0
+    
+    print()
+    print(f"{'合計':>9}{'最大':>9}{'回数':>6}  {'種類':<10}原因")
+    print("-" * 79)
+    for offender in offenders:
+        print(
+            f"{offender.get('total_ms', 0):>7.0f}ms{offender.get('max_ms', 0):>7.0f}ms"
+            f"{offender.get('count', 0):>6}  {offender.get('kind', ''):<10}{offender.get('name', '')}"
+        )
+        for frame in offender.get("stack", [])[:3]:
+            print(f"{'':>26}    {frame}")
+    return 0
+
+
+def _median(values):
+    """中央値"""
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def bench_layouts(installer, plugin_path, repeat=5):
+    """同じプラグインをディレクトリ形式とパッケージファイル形式で配置し、検出と読み込みの時間を比べる"""
+    import shutil
+    import tempfile
+    import time
+    from .plugins.index import PluginIndex
+    from .plugins.loader import PluginLoader
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_path = Path(tmpdir)
+        directory_root = tmp_path / "directory"
+        package_root = tmp_path / "package"
+        directory_root.mkdir()
+        
+        success, message = installer.pack_plugin(plugin_path, package_root)
+        if not success:
+            print(message)
+            return 1
+        plugin_name = Path(message).name[:-len(PluginIndex.PACKAGE_SUFFIX)]
+        shutil.copytree(
+            plugin_path,
+            directory_root / plugin_name,
+            ignore=shutil.ignore_patterns(".git", "__pycache__"),
+        )
+        bytecode_cache = BytecodeCache(tmp_path / BytecodeCache.DIRNAME)
+        bytecode_cache.compile_plugin(directory_root / plugin_name)
+        
+        print(f"{'形式':<16}{'検出':>12}{'読み込み':>12}")
+        print("-" * 40)
+        for label, root in (("ディレクトリ", directory_root), ("パッケージ", package_root)):
+            discovery = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                PluginIndex([root]).refresh()
+                discovery.append((time.perf_counter() - start) * 1000)
+            
+            loader = PluginLoader([root], None, bytecode_cache, installer.dependency_roots)
+            imports = []
+            for attempt in range(repeat + 1):
+                loader.unload_plugin(plugin_name)
+                if loader.load_plugin(plugin_name) is None:
+                    print(f"{label:<16}{'失敗':>12}")
+                    return 1
+                if attempt > 0:
+                    # 最初の1回は依存ライブラリの読み込みを含むため捨てる
+                    imports.append(loader.import_times[plugin_name])
+            loader.unload_plugin(plugin_name)
+            
+            print(f"{label:<16}{_median(discovery):>10.2f}ms{_median(imports):>10.2f}ms")
+    return 0
+
+
 def main():
     """CLIメイン関数"""
     parser = argparse.ArgumentParser(
@@ -72,19 +264,39 @@ def main():
     plugin_parser = subparsers.add_parser("plugin", help="プラグイン管理")
     plugin_parser.add_argument(
         "plugin_action",
-        choices=["install", "uninstall", "list"],
+        choices=["install", "uninstall", "list", "pack", "bench", "stats"],
         help="アクション",
     )
     plugin_parser.add_argument(
         "source",
         nargs="?",
-        help="インストール元（GitHubリポジトリまたはプラグイン名）",
+        help="インストール元（GitHubリポジトリ・ローカルのパスまたはプラグイン名、bench・stats では省略可）",
+    )
+    plugin_parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        help="pack の出力先ディレクトリ（省略時はカレントディレクトリ）",
+    )
+    plugin_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="stats の結果をJSONで出力",
+    )
+    
+    # stallsコマンド
+    stalls_parser = subparsers.add_parser("stalls", help="UIスレッドの停止の記録を表示")
+    stalls_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="JSONで出力",
     )
     
     args = parser.parse_args()
     
     if args.command == "plugin":
         return plugin_command(args)
+    elif args.command == "stalls":
+        return stalls_command(args)
     elif args.command is None:
         # コマンドなしの場合はGUIを起動
         from .core.app import HorloqApp
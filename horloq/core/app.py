@@ -2,25 +2,54 @@
 メインアプリケーション
 """
 
+import queue
+import threading
+import tracemalloc
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 from .config import ConfigManager
 from .events import EventManager
 from .theme import ThemeManager
+from .ticker import Ticker
+from .scheduler import Scheduler
 from .updater import UpdateChecker
+from .watcher import FileWatcher
+from .watchdog import MainThreadWatchdog
 from ..plugins.manager import PluginManager
 from ..plugins.installer import PluginInstaller
+from ..plugins.storage import PluginConfigStore
+from ..plugins.index import PluginIndex
+from ..plugins.bytecode import BytecodeCache
+from ..plugins.deps import DependencyRoots
+from ..plugins.accounting import ResourceMonitor
+from ..plugins.activation import COMMAND_EVENT, ActivationTrigger, PluginStub
 from ..ui.window import MainWindow
 from ..ui.clock import DigitalClock
+from ..ui.clock_window import ClockWindow
 from ..ui.settings import SettingsWindow
 from ..ui.menu import ContextMenu
 from ..ui.plugin_manager import PluginManagerWindow
+from ..ui.diagnostics import StallReportWindow
+from ..ui.style import StyleRegistry
+from ..ui.animation import Animator
+from ..ui.layout import WindowLayout
+from ..ui.reconcile import WidgetReconciler
+from ..ui.virtual import LazySlot, VirtualList
 import customtkinter as ctk
 
 
 class HorloqApp:
     """Horloq メインアプリケーション"""
     
+    # 更新通知バナーのアニメーションキー
+    BANNER_ANIMATION = "update_banner"
+    
+    # 高さを実測したことのないプラグインウィジェットのプレースホルダーの高さ
+    PLUGIN_SLOT_HEIGHT = 120
+    
+    # 監視スレッドなどから渡された処理をUIスレッドで実行する間隔（ミリ秒）
+    UI_CALL_INTERVAL_MS = 100
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         初期化
@@ -29,27 +58,100 @@ class HorloqApp:
             config_path: 設定ファイルパス（Noneの場合はデフォルト）
         """
         # コアシステムを初期化
-        self.config = ConfigManager(config_path)
+        self.config = ConfigManager.shared(config_path)
         self.events = EventManager()
-        self.themes = ThemeManager()
+        self.themes = ThemeManager(self._get_theme_dir())
         
         # テーマを設定
+        self.themes.set_custom_colors(self.config.get("theme.custom_colors", {}))
         theme_name = self.config.get("theme.name", "vscode_dark")
         self.themes.set_theme(theme_name)
         
+        # ウィジェットのスタイル登録
+        self.styles = StyleRegistry(self.themes, self.events)
+        
+        # アニメーションエンジン・時計のティックソース（ルートウィンドウはUI作成時に設定）
+        self.animator = Animator()
+        self.ticker = Ticker()
+        
+        # プラグインごとの設定ストア
+        self.plugin_store = PluginConfigStore(
+            self.config.config_path.parent / "plugin_data",
+            self.config,
+        )
+        
+        # プラグインの検出インデックス（ローダーとインストーラーで共有）
+        plugin_dirs = self._get_plugin_dirs()
+        self.plugin_index = PluginIndex(
+            plugin_dirs,
+            self.config.config_path.parent / PluginIndex.INDEX_FILENAME,
+        )
+        
+        # プラグインのバイトコードキャッシュ（インストール時にコンパイルし、読み込み時に使う）
+        self.bytecode_cache = BytecodeCache(self.config.config_path.parent / BytecodeCache.DIRNAME)
+        
+        # プラグインごとの依存ライブラリのディレクトリ（sys.pathには追加しない）
+        self.plugin_deps = DependencyRoots(self.config.config_path.parent / DependencyRoots.DIRNAME)
+        
+        # プラグインごとのリソース使用量の集計（イベント・ティック・after のコールバックを計測）
+        self.resource_monitor: Optional[ResourceMonitor] = None
+        if self.config.get("plugins.accounting", True):
+            self.resource_monitor = ResourceMonitor(self.plugin_index)
+            self.resource_monitor.install_tk_hooks()
+            self.events.monitor = self.resource_monitor
+            self.ticker.monitor = self.resource_monitor
+            # プラグインのモジュールの読み込みより前に開始する
+            if self.config.get("plugins.trace_memory", False) and not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self._stats_token: Optional[int] = None
+        
+        # プラグインの定期処理・バックグラウンド処理（CPU時間の予算を超えたプラグインは間隔を延ばす）
+        self.scheduler = Scheduler(
+            budget_percent=self.config.get("plugins.cpu_budget_percent", 5.0),
+            budgets=self.config.get("plugins.cpu_budgets", {}),
+        )
+        self.scheduler.monitor = self.resource_monitor
+        
+        # UIスレッドの停止の検出（ハートビートが遅れている間のスタックから原因を集計する）
+        self.watchdog: Optional[MainThreadWatchdog] = None
+        if self.config.get("diagnostics.watchdog", True):
+            self.watchdog = MainThreadWatchdog(
+                threshold_ms=self.config.get("diagnostics.stall_threshold_ms", 100),
+            )
+        self._stall_token: Optional[int] = None
+        
+        # 監視スレッドなどからUIスレッドに渡す処理（Tk は mainloop のスレッド以外から呼べない）
+        self._ui_calls: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._ui_calls_token: Optional[int] = None
+        
         # アプリケーションコンテキスト
         self.app_context = {
             "config": self.config,
             "events": self.events,
             "themes": self.themes,
+            "plugin_store": self.plugin_store,
+            "styles": self.styles,
+            "animator": self.animator,
+            "ticker": self.ticker,
+            "plugin_index": self.plugin_index,
+            "bytecode_cache": self.bytecode_cache,
+            "plugin_deps": self.plugin_deps,
+            "resource_monitor": self.resource_monitor,
+            "scheduler": self.scheduler,
+            "watchdog": self.watchdog,
         }
         
         # プラグインマネージャーを初期化
-        plugin_dirs = self._get_plugin_dirs()
         self.plugins = PluginManager(self.app_context, plugin_dirs)
         
         # プラグインインストーラーを初期化
-        self.plugin_installer = PluginInstaller(plugin_dirs[0] if plugin_dirs else None)
+        self.plugin_installer = PluginInstaller(
+            plugin_dirs[0] if plugin_dirs else None,
+            index=self.plugin_index,
+            bytecode_cache=self.bytecode_cache,
+            dependency_roots=self.plugin_deps,
+            install_format=self.config.get("plugins.install_format", "directory"),
+        )
         
         # アップデートチェッカーを初期化
         self.update_checker = UpdateChecker()
@@ -59,14 +161,24 @@ class HorloqApp:
         self.clock_widget: Optional[DigitalClock] = None
         self.context_menu: Optional[ContextMenu] = None
         
-        # メニューバー要素（テーマ適用用）
+        # 追加の時計ウィンドウ（設定の windows）
+        self.clock_windows: List[ClockWindow] = []
+        
+        # メニューバー要素
         self.menubar: Optional[ctk.CTkFrame] = None
         self.app_label: Optional[ctk.CTkLabel] = None
         self.settings_btn: Optional[ctk.CTkButton] = None
         self.plugin_btn: Optional[ctk.CTkButton] = None
+        self.stall_btn: Optional[ctk.CTkButton] = None
         self.separator: Optional[ctk.CTkFrame] = None
         self.quit_btn: Optional[ctk.CTkButton] = None
         
+        # ウィンドウサイズのレイアウト管理
+        self.layout: Optional[WindowLayout] = None
+        
+        # プラグインウィジェットの差分更新
+        self.plugin_widgets: Optional[WidgetReconciler] = None
+        
         # 更新通知バナー
         self.update_banner: Optional[ctk.CTkFrame] = None
         self.pending_updates: List[Dict[str, Any]] = []
@@ -74,9 +186,21 @@ class HorloqApp:
         self.app_latest_version: Optional[str] = None
         self.app_release_url: Optional[str] = None
         
+        # 設定ファイル・テーマディレクトリの変更監視
+        self.config_watcher: Optional[FileWatcher] = None
+        self.theme_watcher: Optional[FileWatcher] = None
+        # プラグインディレクトリの変更監視（ホットリロード）
+        self.plugin_watcher: Optional[FileWatcher] = None
+        
         # イベントリスナーを登録
         self._setup_event_listeners()
     
+    def _get_theme_dir(self) -> Path:
+        """ユーザーテーマのディレクトリを取得"""
+        theme_dir = self.config.config_path.parent / "themes"
+        theme_dir.mkdir(parents=True, exist_ok=True)
+        return theme_dir
+    
     def _get_plugin_dirs(self) -> list[Path]:
         """プラグインディレクトリのリストを取得"""
         # ユーザープラグインディレクトリのみ
@@ -86,14 +210,53 @@ class HorloqApp:
     
     def _setup_event_listeners(self):
         """イベントリスナーをセットアップ"""
+        self.config.add_change_listener(self._on_external_config_change)
         self.events.on("app_closing", self._on_app_closing)
         self.events.on("open_settings", self._on_open_settings)
-        self.events.on("theme_changed", self._on_theme_changed)
+        self.events.on("config_changed", self._on_config_changed)
+        self.events.on("window_geometry_changed", self._on_window_geometry_changed)
+        self.events.on("plugin_activated", self._on_plugin_activated)
+        self.events.on("plugin_ready", self._on_plugin_ready)
+        self.events.on("plugin_reloaded", self._on_plugin_reloaded)
     
     def _on_app_closing(self, event):
         """アプリケーション終了時の処理"""
-        # プラグインをシャットダウン
+        # 設定ファイルの監視を停止
+        if self.config_watcher:
+            self.config_watcher.stop()
+            self.config_watcher = None
+        self.config.remove_change_listener(self._on_external_config_change)
+        if self.theme_watcher:
+            self.theme_watcher.stop()
+            self.theme_watcher = None
+        if self.plugin_watcher:
+            self.plugin_watcher.stop()
+            self.plugin_watcher = None
+        if self._ui_calls_token is not None:
+            self.ticker.unsubscribe(self._ui_calls_token)
+            self._ui_calls_token = None
+        
+        # プラグインの使用量を書き出す
+        if self._stats_token is not None:
+            self.ticker.unsubscribe(self._stats_token)
+            self._stats_token = None
+        if self.resource_monitor is not None:
+            self._write_plugin_stats()
+        
+        # UIスレッドの監視を止めて停止の記録を書き出す
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            if self._stall_token is not None:
+                self.ticker.unsubscribe(self._stall_token)
+                self._stall_token = None
+            self._write_stall_report()
+        
+        # プラグインをシャットダウン（予約された処理も取り消される）
         self.plugins.shutdown_all()
+        self.scheduler.shutdown()
+        
+        # 未保存のプラグイン設定を書き出す
+        self.plugin_store.flush()
     
     def _on_open_settings(self):
         """設定画面を開く"""
@@ -107,28 +270,234 @@ class HorloqApp:
     
     def _on_settings_saved(self):
         """設定保存時の処理"""
+        # テーマ・時計・ウィンドウ設定を再適用
+        self.events.emit("config_changed", {"theme": True, "clock": True, "window": True})
+    
+    def _on_config_changed(self, event):
+        """
+        設定変更時の処理
+        
+        event.data には変更されたセクション名をキーとした辞書が渡される。
+        設定ファイルの再読み込み時は "keys" に変更されたキーの一覧も含まれる。
+        """
+        data = event.data or {}
+        
         # テーマを再適用
-        theme_name = self.config.get("theme.name", "vscode_dark")
-        if self.themes.set_theme(theme_name):
-            self.events.emit("theme_changed")
+        if "theme" in data:
+            self.styles.set_transition(self.animator, self.config.get("theme.transition_duration", 0.25))
+            self.themes.set_custom_colors(self.config.get("theme.custom_colors", {}))
+            theme_name = self.config.get("theme.name", "vscode_dark")
+            if self.themes.set_theme(theme_name):
+                self.events.emit("theme_changed")
         
         # 時計を更新
-        if self.clock_widget:
+        if "clock" in data and self.clock_widget:
             self._update_clock_settings()
         
-        # ウィンドウ設定を更新
-        self.events.emit("config_changed", {"window": True})
+        # ウィンドウの幅を更新（MainWindow が設定したサイズはアイドル時に上書きする）
+        if "window" in data and self.layout:
+            self.layout.set_width(self.config.get("window.width", 400))
+            self.layout.reapply()
+            self.plugin_container.max_height = self.config.get("window.max_plugin_height", 400)
+            self.plugin_container.refresh()
+        
+        # プラグインのCPU時間の予算を更新
+        if "plugins" in data:
+            self.scheduler.budget_percent = float(self.config.get("plugins.cpu_budget_percent", 5.0))
+            self.scheduler.budgets = dict(self.config.get("plugins.cpu_budgets", {}))
+        
+        # 有効なプラグインを同期
+        if "plugins.enabled" in data.get("keys", []):
+            self._sync_enabled_plugins()
+        
+        # 追加の時計ウィンドウを作り直す
+        if self.window and ("windows" in data or ("clock" in data and self.clock_windows)):
+            self._open_clock_windows()
     
-    def _on_theme_changed(self, event):
-        """テーマ変更時の処理"""
-        theme = self.themes.current_theme
+    def _on_window_geometry_changed(self, event):
+        """ユーザーが変更したウィンドウの幅をレイアウトに反映（高さは中身から決まる）"""
+        data = event.data or {}
+        if "width" in data and self.layout:
+            self.layout.set_width(data["width"])
+    
+    def _sync_enabled_plugins(self):
+        """設定の plugins.enabled に合わせてプラグインを読み込み/アンロード"""
+        enabled_plugins = self.config.get("plugins.enabled", [])
+        active_plugins = self.plugins.list_active_plugins() + self.plugins.list_pending_plugins()
+        
+        for plugin_name in active_plugins:
+            if plugin_name not in enabled_plugins:
+                self.plugins.unload_plugin(plugin_name)
+        
+        missing = [name for name in enabled_plugins if name not in active_plugins]
+        for plugin_name, success in self.plugins.start_plugins(missing).items():
+            if not success:
+                print(f"プラグインの読み込みに失敗: {plugin_name}")
+            elif self.plugins.get_plugin(plugin_name):
+                self._report_plugin_loaded(plugin_name)
+        
+        self._display_plugin_widgets()
+        self._adjust_window_size()
+    
+    def _start_config_watcher(self):
+        """設定ファイルの変更監視を開始"""
+        self.config_watcher = FileWatcher(
+            self.config.layer_paths(),
+            self._on_config_file_changed,
+            debounce=0.5,
+        )
+        self.config_watcher.start()
+    
+    def _start_theme_watcher(self):
+        """テーマディレクトリの変更監視を開始"""
+        if self.themes.theme_dir is None:
+            return
+        self.theme_watcher = FileWatcher(
+            [self.themes.theme_dir],
+            self._on_theme_files_changed,
+            debounce=0.3,
+        )
+        self.theme_watcher.start()
+    
+    def _start_plugin_watcher(self):
+        """
+        プラグインディレクトリの変更監視を開始（ホットリロード）
         
-        # 時計ウィジェットにテーマを適用
-        if self.clock_widget:
-            self.clock_widget.apply_theme(theme)
+        監視はディレクトリ単位で再帰しないため、各プラグインのサブディレクトリも個別に監視する。
+        """
+        if not self.config.get("plugins.hot_reload", True):
+            return
         
-        # メニューバーにテーマを適用
-        self._apply_theme_to_menubar()
+        paths = []
+        for plugin_dir in self.plugins.loader.plugin_dirs:
+            if not plugin_dir.is_dir():
+                continue
+            paths.append(plugin_dir)
+            for item in plugin_dir.iterdir():
+                if item.is_dir() and not item.name.startswith("."):
+                    paths.append(item)
+                    paths.extend(
+                        sub for sub in item.rglob("*")
+                        if sub.is_dir() and "__pycache__" not in sub.parts
+                    )
+        
+        self.plugin_watcher = FileWatcher(paths, self._on_plugin_files_changed, debounce=0.5)
+        self.plugin_watcher.start()
+    
+    def _restart_plugin_watcher(self):
+        """プラグインの追加・削除に合わせて監視するディレクトリを作り直す"""
+        if self.plugin_watcher:
+            self.plugin_watcher.stop()
+            self.plugin_watcher = None
+        self._start_plugin_watcher()
+    
+    def _on_plugin_files_changed(self, paths):
+        """
+        プラグインのファイル変更時の処理（監視スレッドから呼ばれる）
+        
+        Args:
+            paths: 変更されたパスの集合
+        """
+        self._call_on_ui(lambda: self._reload_changed_plugins(paths))
+    
+    def _reload_changed_plugins(self, paths):
+        """変更されたファイルを含むプラグインを再読み込み"""
+        names = set()
+        restart = False
+        for path in paths:
+            if "__pycache__" in path.parts or path.name.startswith("."):
+                continue
+            for plugin_dir in self.plugins.loader.plugin_dirs:
+                try:
+                    rel_path = path.relative_to(plugin_dir)
+                except ValueError:
+                    continue
+                name = rel_path.parts[0]
+                if name.endswith(PluginIndex.PACKAGE_SUFFIX):
+                    name = name[:-len(PluginIndex.PACKAGE_SUFFIX)]
+                elif name.endswith(".py"):
+                    name = name[:-3]
+                names.add(name)
+                # ディレクトリの追加・削除があれば監視対象を作り直す
+                restart |= path.is_dir() or not path.exists()
+                break
+        
+        if restart:
+            self._restart_plugin_watcher()
+        if names:
+            # 通知ごとに1回だけ検証する（PluginIndex.get() は検証しない）
+            self.plugin_index.refresh()
+            self.plugins.reload_modified_plugins(sorted(names))
+    
+    def _on_theme_files_changed(self, paths):
+        """
+        テーマファイル変更時の処理（監視スレッドから呼ばれる）
+        
+        Args:
+            paths: 変更されたパスの集合
+        """
+        self._call_on_ui(lambda: self._reload_theme_files(paths))
+    
+    def _reload_theme_files(self, paths):
+        """テーマファイルの変更を反映し、使用中のテーマなら再適用"""
+        if self.themes.refresh_theme_files(paths):
+            print(f"テーマファイルの変更を適用しました: {self.themes.current_theme.name}")
+            self.events.emit("theme_changed")
+    
+    def _on_config_file_changed(self, paths):
+        """
+        設定ファイル変更時の処理（監視スレッドから呼ばれる）
+        
+        Args:
+            paths: 変更されたパスの集合
+        """
+        self._call_on_ui(self._reload_config)
+    
+    def _call_on_ui(self, callback: Callable[[], None]):
+        """
+        UIスレッドで処理を実行するよう予約（どのスレッドから呼んでもよい）
+        
+        Tk は mainloop のスレッド以外から呼ぶと開始前は失敗するため、after は使わずに
+        キューに入れ、UIスレッドのティックで取り出す。
+        
+        Args:
+            callback: UIスレッドで呼ぶ処理
+        """
+        self._ui_calls.put(callback)
+    
+    def _drain_ui_calls(self, now: Optional[float] = None):
+        """予約された処理をUIスレッドで実行（ティックから呼ばれる）"""
+        while True:
+            try:
+                callback = self._ui_calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback()
+            except Exception as e:
+                print(f"UIスレッドでの処理に失敗しました: {e}")
+    
+    def _reload_config(self):
+        """他のプロセスによる設定の変更を取り込む（変更があればリスナー経由で通知）"""
+        self.config.reload()
+    
+    def _on_external_config_change(self, changed: List[str]):
+        """
+        他のプロセスによる設定の変更を通知
+        
+        Args:
+            changed: 変更されたキーのリスト
+        """
+        # まとめて保存（save_later）した場合は保存スレッドから呼ばれる
+        if threading.current_thread() is not threading.main_thread():
+            self._call_on_ui(lambda: self._on_external_config_change(changed))
+            return
+        
+        print(f"設定ファイルの変更を検出しました: {', '.join(changed)}")
+        
+        data: Dict[str, Any] = {key.split(".")[0]: True for key in changed}
+        data["keys"] = changed
+        self.events.emit("config_changed", data)
     
     def _update_clock_settings(self):
         """時計設定を更新"""
@@ -166,7 +535,7 @@ class HorloqApp:
                     text="",
                     font=(font_family, self.clock_widget.font_size // 3),
                 )
-                self.clock_widget.apply_theme(self.themes.current_theme)
+                self.clock_widget.bind_styles(self.styles)
             # 日付ラベルを表示（再表示の場合も対応）
             self.clock_widget.date_label.pack()
         else:
@@ -187,7 +556,7 @@ class HorloqApp:
                     text="",
                     font=(font_family, self.clock_widget.font_size // 4),
                 )
-                self.clock_widget.apply_theme(self.themes.current_theme)
+                self.clock_widget.bind_styles(self.styles)
             # 曜日ラベルを表示（再表示の場合も対応）
             self.clock_widget.weekday_label.pack()
         else:
@@ -209,52 +578,28 @@ class HorloqApp:
         
         # 即座に表示を更新
         self.clock_widget._update_time()
-    
-    def _apply_theme_to_menubar(self):
-        """メニューバーにテーマを適用"""
-        if not self.menubar:
-            return
-        
-        theme = self.themes.current_theme
         
-        # メニューバーの背景色
-        self.menubar.configure(fg_color=theme.bg_secondary or theme.bg)
-        
-        # アプリラベルの色
-        if self.app_label:
-            self.app_label.configure(text_color=theme.accent)
-        
-        # 設定ボタン
-        if self.settings_btn:
-            self.settings_btn.configure(
-                hover_color=theme.bg,
-                text_color=theme.fg,
-            )
-        
-        # プラグインボタン
-        if self.plugin_btn:
-            self.plugin_btn.configure(
-                hover_color=theme.bg,
-                text_color=theme.fg,
-            )
-        
-        # セパレータ
-        if self.separator:
-            self.separator.configure(fg_color=theme.border or "#3e3e42")
+        # フォントや表示項目で時計の要求サイズが変わるため測り直す
+        if self.layout:
+            self.layout.invalidate(self.clock_widget)
     
     def _create_ui(self):
         """UIを作成"""
         # メインウィンドウを作成
-        self.window = MainWindow(self.config, self.events, self.themes)
+        self.window = MainWindow(self.config, self.events, self.themes, styles=self.styles)
+        self.styles.bind_root(self.window)
+        self.animator.bind_root(self.window)
+        self.ticker.bind_root(self.window)
+        self.scheduler.bind_root(self.window)
+        self.styles.set_transition(self.animator, self.config.get("theme.transition_duration", 0.25))
         
         # メニューバー（上部ボタン群）
-        theme = self.themes.current_theme
         self.menubar = ctk.CTkFrame(
             self.window, 
             height=45,
-            fg_color=theme.bg_secondary or theme.bg,
             corner_radius=8,
         )
+        self.styles.register(self.menubar, fg_color="bg_secondary")
         self.menubar.pack(fill="x", padx=8, pady=(8, 5))
         
         # 左側：アプリ名
@@ -262,8 +607,8 @@ class HorloqApp:
             self.menubar,
             text="🕰️ Horloq",
             font=("Arial", 16, "bold"),
-            text_color=theme.accent,
         )
+        self.styles.register(self.app_label, text_color="accent")
         self.app_label.pack(side="left", padx=15, pady=8)
         
         # 右側：ボタン群
@@ -285,10 +630,9 @@ class HorloqApp:
             command=self._on_open_settings,
             width=40,
             fg_color="transparent",
-            hover_color=theme.bg,
-            text_color=theme.fg,
             **button_style
         )
+        self.styles.register(self.settings_btn, hover_color="bg", text_color="fg")
         self.settings_btn.pack(side="left", padx=3)
         
         # プラグインボタン
@@ -298,19 +642,31 @@ class HorloqApp:
             command=self._on_plugin_manager,
             width=40,
             fg_color="transparent",
-            hover_color=theme.bg,
-            text_color=theme.fg,
             **button_style
         )
+        self.styles.register(self.plugin_btn, hover_color="bg", text_color="fg")
         self.plugin_btn.pack(side="left", padx=3)
         
+        # 応答停止の記録ボタン
+        if self.watchdog is not None:
+            self.stall_btn = ctk.CTkButton(
+                button_frame,
+                text="🩺",
+                command=self._on_stall_report,
+                width=40,
+                fg_color="transparent",
+                **button_style
+            )
+            self.styles.register(self.stall_btn, hover_color="bg", text_color="fg")
+            self.stall_btn.pack(side="left", padx=3)
+        
         # セパレータ
         self.separator = ctk.CTkFrame(
             button_frame,
             width=1,
             height=24,
-            fg_color=theme.border or "#3e3e42",
         )
+        self.styles.register(self.separator, fg_color="border")
         self.separator.pack(side="left", padx=8, pady=4)
         
         # 終了ボタン
@@ -332,24 +688,38 @@ class HorloqApp:
         # 時計ウィジェット
         self.clock_widget = DigitalClock(
             container,
-            timezone=self.config.get("clock.timezone", "Asia/Tokyo"),
-            format_24h=self.config.get("clock.format", "24h") == "24h",
-            show_seconds=self.config.get("clock.show_seconds", True),
-            show_milliseconds=self.config.get("clock.show_milliseconds", False),
-            show_date=self.config.get("clock.show_date", True),
-            show_weekday=self.config.get("clock.show_weekday", True),
-            date_format=self.config.get("clock.date_format", "%Y/%m/%d"),
-            font_size=self.config.get("clock.font_size", 48),
-            font_family=self.config.get("clock.font_family", "Arial"),
+            ticker=self.ticker,
             fg_color="transparent",
+            **DigitalClock.options_from_config(self.config.get("clock", {})),
         )
         self.clock_widget.pack(fill="both", expand=True)
-        # 初期テーマを適用
-        self.clock_widget.apply_theme(theme)
+        # テーマロールを登録（初期テーマもここで適用される）
+        self.clock_widget.bind_styles(self.styles)
         
-        # プラグインウィジェット用のコンテナ
-        self.plugin_container = ctk.CTkFrame(container, fg_color="transparent")
+        # プラグインウィジェット用のコンテナ（表示範囲に入ったものだけ作成する）
+        self.plugin_container = VirtualList(
+            container,
+            max_height=self.config.get("window.max_plugin_height", 400),
+        )
+        self.styles.register(self.plugin_container.canvas, bg="bg")
         self.plugin_container.pack(fill="both", expand=False, pady=(10, 0))
+        
+        # ウィンドウの高さは各セクションの要求サイズから求める（余白は pack の pady と対応）
+        self.layout = WindowLayout(
+            self.window,
+            width=self.config.get("window.width", 400),
+            extra_height=10,
+        )
+        self.layout.track(self.menubar, padding=13)
+        self.layout.track(self.clock_widget)
+        self.layout.track(self.plugin_container, padding=10)
+        
+        # プラグインウィジェットのスロットはプラグイン名をキーに差分更新する
+        self.plugin_widgets = WidgetReconciler(
+            self.plugin_container.inner,
+            self._create_plugin_slot,
+            pack_options={"fill": "x", "expand": False, "pady": VirtualList.SLOT_PADY},
+        )
     
     def _show_menu_dropdown(self):
         """メニュードロップダウンを表示（将来の拡張用）"""
@@ -364,12 +734,18 @@ class HorloqApp:
                 self.window,
                 self.plugins,
                 on_plugin_changed=self._on_plugin_changed,
+                installer=self.plugin_installer,
             )
     
+    def _on_stall_report(self):
+        """応答停止の記録を開く"""
+        if self.window and self.watchdog is not None:
+            StallReportWindow(self.window, self.watchdog)
+    
     def _on_plugin_changed(self):
         """プラグイン変更時の処理"""
-        # プラグイン設定を保存
-        enabled_plugins = self.plugins.list_active_plugins()
+        # プラグイン設定を保存（起動トリガーを待っているものも有効として残す）
+        enabled_plugins = self.plugins.list_active_plugins() + self.plugins.list_pending_plugins()
         self.config.set("plugins.enabled", enabled_plugins)
         self.config.save()
         
@@ -390,59 +766,380 @@ class HorloqApp:
         """有効なプラグインを読み込む"""
         enabled_plugins = self.config.get("plugins.enabled", [])
         
-        for plugin_name in enabled_plugins:
-            if self.plugins.load_plugin(plugin_name):
-                print(f"プラグインを読み込みました: {plugin_name}")
-            else:
+        # onStartup 以外の起動トリガーを持つプラグインはトリガーが発火するまで読み込まない
+        results = self.plugins.start_plugins(enabled_plugins)
+        for plugin_name, success in results.items():
+            if not success:
                 print(f"プラグインの読み込みに失敗: {plugin_name}")
+            elif self.plugins.get_plugin(plugin_name):
+                self._report_plugin_loaded(plugin_name)
     
-    def _display_plugin_widgets(self):
-        """有効なプラグインのウィジェットを表示"""
-        if not self.plugin_container:
+    def _report_plugin_loaded(self, plugin_name: str):
+        """
+        プラグインの読み込みにかかった時間を表示してイベントを発行
+        
+        Args:
+            plugin_name: プラグイン名
+        """
+        times = self.plugins.load_times.get(plugin_name, {})
+        print(
+            f"プラグインを読み込みました: {plugin_name} "
+            f"(読み込み {times.get('import_ms', 0.0):.1f}ms, "
+            f"初期化 {times.get('initialize_ms', 0.0):.1f}ms, "
+            f"有効化 {times.get('enable_ms', 0.0):.1f}ms)"
+        )
+        self.events.emit("plugin_loaded", {"plugin_id": plugin_name, **times})
+    
+    def _write_plugin_stats(self, now: Optional[float] = None):
+        """
+        プラグインごとのリソース使用量を書き出す（CLI の plugin stats で表示する）
+        
+        Args:
+            now: ティックの時刻（未使用）
+        """
+        ResourceMonitor.write_stats(
+            self.config.config_path.parent / ResourceMonitor.STATS_FILENAME,
+            self.plugins.resource_usage(),
+        )
+    
+    def _start_watchdog(self):
+        """UIスレッドの監視を開始（停止の記録は1分ごとに書き出す）"""
+        if self.watchdog is None or self.window is None:
             return
+        self.watchdog.bind_root(self.window)
+        self.watchdog.start()
+        self._stall_token = self.ticker.subscribe(self._write_stall_report, 60 * 1000)
+    
+    def _write_stall_report(self, now: Optional[float] = None):
+        """
+        UIスレッドの停止の記録を書き出す（CLI の stalls で表示する）
         
-        # 既存のウィジェットをクリア
-        for widget in self.plugin_container.winfo_children():
-            widget.destroy()
+        Args:
+            now: ティックの時刻（未使用）
+        """
+        if self.watchdog is None:
+            return
+        MainThreadWatchdog.write_report(
+            self.config.config_path.parent / MainThreadWatchdog.REPORT_FILENAME,
+            self.watchdog.report(),
+        )
+    
+    def _display_plugin_widgets(self):
+        """
+        有効なプラグインのウィジェットを表示
         
-        # 有効なプラグインのウィジェットを表示
-        active_plugins = self.plugins.list_active_plugins()
-        for plugin_name in active_plugins:
+        新しく有効になったプラグインのスロットだけを作成し、無効になったプラグインの
+        スロットだけを破棄する。表示中のスロットは作り直さずに並び順だけを合わせる。
+        ウィジェット自体はスロットが表示範囲に入ったときに作成される。
+        """
+        if not self.plugin_widgets:
+            return
+        
+        # 起動トリガーを待っているプラグインはスタブをキーの元データにする
+        # （起動後も同じスタブを使い、スロットを作り直さずに中身だけを入れ替える）
+        names = list(dict.fromkeys(
+            self.config.get("plugins.enabled", []) + self.plugins.list_active_plugins()
+        ))
+        items = []
+        for plugin_name in names:
+            stub = self.plugins.get_stub(plugin_name)
             plugin = self.plugins.get_plugin(plugin_name)
-            if plugin and plugin.enabled:
-                try:
-                    widget = plugin.create_widget(self.plugin_container)
-                    if widget:
-                        widget.pack(fill="both", expand=False, pady=5)
-                        print(f"プラグインウィジェットを表示: {plugin_name}")
-                except Exception as e:
-                    print(f"プラグインウィジェットの表示エラー ({plugin_name}): {e}")
+            if plugin and not plugin.enabled:
+                continue
+            if stub is not None:
+                items.append((plugin_name, stub))
+            elif plugin:
+                items.append((plugin_name, plugin))
+        
+        self.plugin_widgets.reconcile(items)
+        self.plugin_container.refresh()
     
-    def _adjust_window_size(self):
-        """プラグインウィジェットの有無に応じてウィンドウサイズを調整"""
-        if not self.window or not self.plugin_container:
+    def _create_plugin_slot(self, plugin_name: str, plugin, parent) -> LazySlot:
+        """
+        プラグインウィジェットのスロットを作成（前回の実測値をプレースホルダーの高さにする）
+        
+        Args:
+            plugin_name: プラグイン名
+            plugin: プラグインのインスタンス（起動トリガーを待っている場合はスタブ）
+            parent: 親フレーム
+            
+        Returns:
+            スロット
+        """
+        height = self.plugin_store.get(
+            plugin_name, "widget_height", self.PLUGIN_SLOT_HEIGHT, section="state"
+        )
+        if isinstance(plugin, PluginStub):
+            stub = plugin
+            factory = lambda slot_parent: self._create_stub_widget(stub, slot_parent)
+            rebuildable = stub.activated and stub.plugin.rebuildable
+        else:
+            factory = lambda slot_parent: self._create_plugin_widget(plugin, slot_parent)
+            rebuildable = plugin.rebuildable
+        return LazySlot(
+            parent,
+            plugin_name,
+            factory,
+            height=height,
+            rebuildable=rebuildable,
+            on_mount=self._on_plugin_widget_mounted,
+            on_measured=self._on_plugin_widget_measured,
+        )
+    
+    def _create_plugin_widget(self, plugin, parent):
+        """
+        プラグインのウィジェットを作成
+        
+        Args:
+            plugin: プラグインのインスタンス
+            parent: 親フレーム
+            
+        Returns:
+            ウィジェット（表示しない場合はNone）
+        """
+        widget = plugin.create_widget(parent)
+        if widget:
+            # テーマ既定値のままのウィジェットをテーマ切り替えの対象にする
+            self.styles.adopt_tree(widget)
+        return widget
+    
+    def _create_stub_widget(self, stub: PluginStub, parent):
+        """
+        起動トリガーを待っているプラグインのウィジェットを作成
+        
+        onWidgetVisible を持つ場合はここで起動して本来のウィジェットを作成し、
+        それ以外はトリガーが発火するまで軽量なプレースホルダーを表示する。
+        
+        Args:
+            stub: プラグインのスタブ
+            parent: 親フレーム
+            
+        Returns:
+            ウィジェット（表示しない場合はNone）
+        """
+        if not stub.activated and stub.has_trigger("onWidgetVisible"):
+            self.plugins.activate(stub.name, ActivationTrigger("onWidgetVisible"))
+        
+        if stub.activated:
+            return self._create_plugin_widget(stub.plugin, parent)
+        return self._create_plugin_placeholder(stub, parent)
+    
+    def _create_plugin_placeholder(self, stub: PluginStub, parent):
+        """
+        起動前のプラグインのプレースホルダーを作成
+        
+        Args:
+            stub: プラグインのスタブ
+            parent: 親フレーム
+            
+        Returns:
+            プレースホルダーのフレーム
+        """
+        frame = ctk.CTkFrame(parent, corner_radius=8)
+        self.styles.register(frame, fg_color="bg_secondary")
+        
+        title = stub.metadata.get("name", stub.name)
+        condition = stub.describe()
+        label = ctk.CTkLabel(
+            frame,
+            text=f"{title}（{condition}に起動）" if condition else title,
+            font=("Arial", 11),
+            anchor="w",
+        )
+        self.styles.register(label, text_color="fg_secondary")
+        label.pack(side="left", padx=10, pady=6)
+        
+        if stub.has_trigger("onCommand"):
+            start_btn = ctk.CTkButton(
+                frame,
+                text="起動",
+                width=60,
+                height=24,
+                command=lambda: self.events.emit(COMMAND_EVENT, {"plugin_id": stub.name}),
+            )
+            self.styles.register(start_btn, fg_color="accent", hover_color="hover")
+            start_btn.pack(side="right", padx=10, pady=6)
+        
+        return frame
+    
+    def _on_plugin_activated(self, event):
+        """
+        起動トリガーでプラグインが起動した
+        
+        プレースホルダーを表示中のスロットは中身だけを作り直す。
+        """
+        plugin_name = (event.data or {}).get("plugin_id")
+        self._report_plugin_loaded(plugin_name)
+        if not self.plugin_widgets:
             return
         
-        # ウィンドウを更新して正確なサイズを取得
-        self.window.update_idletasks()
+        slot = self.plugin_widgets.get_widget(plugin_name)
+        if slot is not None and slot.mounted:
+            slot.unmount()
+        self.plugin_container.refresh()
+        self._adjust_window_size()
+    
+    def _on_plugin_ready(self, event):
+        """
+        非同期の初期化を終えたプラグインが有効になった
         
-        # プラグインウィジェットが存在するか確認
-        has_plugin_widgets = len(self.plugin_container.winfo_children()) > 0
+        プラグインのスロットを追加する（表示範囲に入ったときにウィジェットを作成する）。
+        """
+        data = event.data or {}
+        plugin_name = data.get("plugin_id")
+        if not data.get("success"):
+            print(f"プラグインの読み込みに失敗: {plugin_name}")
+            return
         
-        # 基本的なウィンドウサイズ（時計のみ）
-        base_width = 400
-        base_height = 200
+        self._report_plugin_loaded(plugin_name)
+        self._display_plugin_widgets()
+        self._adjust_window_size()
+    
+    def _on_plugin_reloaded(self, event):
+        """
+        プラグインがホットリロードされた
         
-        if has_plugin_widgets:
-            # プラグインウィジェットのサイズを計算
-            self.plugin_container.update_idletasks()
-            plugin_height = self.plugin_container.winfo_reqheight()
-            new_height = base_height + plugin_height + 40  # マージン追加
-        else:
-            new_height = base_height
+        そのプラグインのスロットの中身と追加の時計ウィンドウのウィジェットだけを
+        同じ位置で作り直す（他のプラグインのウィジェットには触れない）。
+        """
+        plugin_name = (event.data or {}).get("plugin_id")
+        plugin = self.plugins.get_plugin(plugin_name)
+        
+        for clock_window in self.clock_windows:
+            clock_window.replace_plugin_widget(plugin_name, plugin)
+        
+        if not self.plugin_widgets:
+            return
+        slot = self.plugin_widgets.get_widget(plugin_name)
+        if slot is None or plugin is None:
+            # 再読み込みに失敗した場合はスロットを外す
+            self._display_plugin_widgets()
+            self._adjust_window_size()
+            return
+        
+        # スタブの場合はスタブが新しいインスタンスを指すため元データはそのまま
+        if self.plugins.get_stub(plugin_name) is None:
+            self.plugin_widgets.replace_source(plugin_name, plugin)
+            slot.factory = lambda slot_parent: self._create_plugin_widget(plugin, slot_parent)
+        slot.rebuildable = plugin.rebuildable
+        if slot.mounted:
+            slot.unmount()
+        self.plugin_container.refresh()
+        self._adjust_window_size()
+    
+    def _on_plugin_widget_mounted(self, plugin_name: str, widget, elapsed_ms: float):
+        """
+        プラグインウィジェットの表示後の処理
         
-        # ウィンドウサイズを設定
-        self.window.geometry(f"{base_width}x{new_height}")
+        Args:
+            plugin_name: プラグイン名
+            widget: 表示したウィジェット
+            elapsed_ms: 作成と配置にかかった時間（ミリ秒）
+        """
+        print(f"プラグインウィジェットを表示: {plugin_name} ({elapsed_ms:.1f}ms)")
+        self.events.emit("plugin_widget_mounted", {
+            "name": plugin_name,
+            "duration_ms": elapsed_ms,
+        })
+    
+    def _on_plugin_widget_measured(self, plugin_name: str, height: int):
+        """
+        プラグインウィジェットの実測の高さを記録（次回起動時のプレースホルダーに使う）
+        
+        Args:
+            plugin_name: プラグイン名
+            height: 高さ
+        """
+        self.plugin_store.set(plugin_name, "widget_height", height, section="state")
+    
+    def _open_clock_windows(self):
+        """
+        設定の windows に従って追加の時計ウィンドウを開く
+        
+        作成中だけ tracemalloc でPython側のメモリ使用量を計測し、
+        ウィンドウ1つあたりの増加量を記録する。
+        """
+        self._close_clock_windows()
+        
+        specs = self.config.get("windows", []) or []
+        if not specs:
+            return
+        
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        
+        try:
+            clock_defaults = self.config.get("clock", {})
+            for index, spec in enumerate(specs):
+                if not isinstance(spec, dict):
+                    continue
+                spec = {"name": f"clock{index + 1}", **spec}
+                
+                before = tracemalloc.get_traced_memory()[0]
+                try:
+                    clock_window = ClockWindow(
+                        self.window,
+                        spec,
+                        clock_defaults,
+                        self.styles,
+                        self.ticker,
+                        plugins=self.plugins,
+                        on_close=self._on_clock_window_closed,
+                        on_geometry=lambda window, changed, i=index: self._save_clock_window_geometry(i, changed),
+                    )
+                except Exception as e:
+                    print(f"時計ウィンドウの作成に失敗しました ({spec['name']}): {e}")
+                    continue
+                clock_window.memory_bytes = tracemalloc.get_traced_memory()[0] - before
+                self.clock_windows.append(clock_window)
+                print(f"時計ウィンドウを開きました: {clock_window.name} ({clock_window.memory_bytes / 1024:.1f} KiB)")
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+    
+    def _close_clock_windows(self):
+        """追加の時計ウィンドウをすべて閉じる"""
+        windows, self.clock_windows = self.clock_windows, []
+        for clock_window in windows:
+            try:
+                clock_window.destroy()
+            except Exception:
+                pass
+    
+    def _save_clock_window_geometry(self, index: int, changed: Dict[str, int]):
+        """
+        追加の時計ウィンドウの位置とサイズを windows のエントリに保存
+        
+        Args:
+            index: windows 内の位置
+            changed: 変化した値（x, y, width, height）
+        """
+        specs = self.config.get("windows", []) or []
+        if index >= len(specs) or not isinstance(specs[index], dict):
+            return
+        
+        window_settings = specs[index].setdefault("window", {})
+        if all(window_settings.get(key) == value for key, value in changed.items()):
+            return
+        window_settings.update(changed)
+        self.config.set("windows", specs)
+        self.config.save_later()
+    
+    def _on_clock_window_closed(self, clock_window: ClockWindow):
+        """
+        追加の時計ウィンドウが閉じられた
+        
+        Args:
+            clock_window: 閉じられたウィンドウ
+        """
+        if clock_window in self.clock_windows:
+            self.clock_windows.remove(clock_window)
+    
+    def _adjust_window_size(self):
+        """ウィンドウサイズの再計算を予約（アイドル時に変更のあったセクションだけを測り直す）"""
+        if self.layout:
+            self.layout.request()
     
     def run(self):
         """アプリケーションを起動"""
@@ -452,12 +1149,31 @@ class HorloqApp:
         # UIを作成
         self._create_ui()
         
+        # UIスレッドの停止の検出を開始（以降の初期化での停止も記録する）
+        self._start_watchdog()
+        
+        # 監視スレッドなどから渡された処理をUIスレッドで実行する
+        if self._ui_calls_token is None:
+            self._ui_calls_token = self.ticker.subscribe(self._drain_ui_calls, self.UI_CALL_INTERVAL_MS)
+        
+        # プラグインの使用量を1分ごとに書き出す
+        if self.resource_monitor is not None and self._stats_token is None:
+            self._stats_token = self.ticker.subscribe(self._write_plugin_stats, 60 * 1000)
+        
         # プラグインウィジェットを表示
         self._display_plugin_widgets()
         
+        # 追加の時計ウィンドウを開く
+        self._open_clock_windows()
+        
         # ウィンドウサイズを調整
         self._adjust_window_size()
         
+        # 設定ファイル・テーマディレクトリの変更監視を開始
+        self._start_config_watcher()
+        self._start_theme_watcher()
+        self._start_plugin_watcher()
+        
         # イベントを発行
         self.events.emit("app_started")
         
@@ -467,6 +1183,9 @@ class HorloqApp:
         # メインループを開始
         if self.window:
             self.window.show()
+        
+        # 終了ボタンなど _on_close を通らない終了でも予約中の保存を書き出す
+        self.config.flush()
     
     def _check_updates(self):
         """プラグインと本体の更新をチェック（非同期）"""
@@ -508,12 +1227,11 @@ class HorloqApp:
         if not self.app_update_available and not self.pending_updates:
             return
         
-        # 既存のバナーがあれば削除
+        # 既存のバナーがあれば削除（閉じるアニメーション中のバナーも完了時の処理で破棄する）
+        self.animator.cancel(self.BANNER_ANIMATION, finish=True)
         if self.update_banner:
             self.update_banner.destroy()
         
-        theme = self.themes.current_theme
-        
         # 更新通知バナー
         self.update_banner = ctk.CTkFrame(
             self.window,
@@ -590,6 +1308,10 @@ class HorloqApp:
         )
         close_btn.pack(side="left", padx=5)
         
+        # スライドインで表示（高さの変化はレイアウト管理がウィンドウサイズに反映する）
+        self.animator.slide_in(self.update_banner, key=self.BANNER_ANIMATION)
+        self.layout.track(self.update_banner, padding=5)
+        
         # ウィンドウサイズを再調整
         self._adjust_window_size()
     
@@ -759,6 +1481,7 @@ class HorloqApp:
     def _dismiss_update_banner(self):
         """更新通知バナーを非表示"""
         if self.update_banner:
-            self.update_banner.destroy()
+            banner = self.update_banner
             self.update_banner = None
+            self.animator.slide_out(banner, on_done=banner.destroy, key=self.BANNER_ANIMATION)
             self._adjust_window_size()
@@ -2,14 +2,49 @@
 設定管理システム
 """
 
+import os
+import sys
 import yaml
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from copy import deepcopy
+from .filelock import FileLock
+
+
+_MISSING = object()
+
+
+@dataclass
+class ConfigLayer:
+    """設定レイヤー"""
+    name: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    path: Optional[Path] = None
+    signature: Optional[Tuple[int, int]] = None
 
 
 class ConfigManager:
-    """アプリケーション設定管理"""
+    """
+    アプリケーション設定管理
+    
+    設定は優先度の低い順に defaults → system → user → session → env の
+    レイヤーを重ねたものとして解決される。値の取得はキーごとにキャッシュされた
+    解決済みビューを通して行い、いずれかのレイヤーでキーが変更されたときは
+    そのキーに関係するキャッシュだけを破棄する。書き込みは write_layer
+    （通常は user、セッション設定ファイル指定時は session）に対して行う。
+    """
+    
+    LAYER_ORDER = ("defaults", "system", "user", "session", "env")
+    
+    # 環境変数による上書き（例: HORLOQ__CLOCK__FONT_SIZE=64）
+    ENV_PREFIX = "HORLOQ__"
+    SYSTEM_CONFIG_ENV = "HORLOQ_SYSTEM_CONFIG"
+    SESSION_CONFIG_ENV = "HORLOQ_SESSION_CONFIG"
+    
+    # save_later() で書き込みをまとめる待ち時間（秒）
+    SAVE_DELAY = 1.0
     
     DEFAULT_CONFIG = {
         "window": {
@@ -20,6 +55,7 @@ class ConfigManager:
             "always_on_top": True,
             "transparent": False,
             "opacity": 1.0,
+            "max_plugin_height": 400,  # プラグイン領域の最大の高さ（超えるとスクロール）
         },
         "clock": {
             "format": "24h",  # "12h" or "24h"
@@ -39,11 +75,34 @@ class ConfigManager:
                 "fg": "#d4d4d4",
                 "accent": "#007acc",
             },
+            "transition_duration": 0.25,  # テーマ切り替えのフェード（秒、0で無効）
         },
         "plugins": {
             "enabled": [],
             "configs": {},
+            # インストール形式（"directory" または "package": 1つのファイルにまとめて zipimport で読み込む）
+            "install_format": "directory",
+            # プラグインのファイルの変更を監視して再読み込みする（状態は snapshot/restore で引き継ぐ）
+            "hot_reload": True,
+            # プラグインごとのCPU時間・タイマー・リスナー・スレッドを集計する
+            "accounting": True,
+            # プラグインごとのメモリも集計する（tracemalloc を使うため全体が遅くなる）
+            "trace_memory": False,
+            # 別プロセスで動かすプラグイン（ブロックやクラッシュが時計に影響しない）
+            "isolated": [],
+            # プラグインごとのUIスレッドのCPU使用率の予算（%、超えると定期処理の間隔を延ばす、0で無制限）
+            "cpu_budget_percent": 5.0,
+            # プラグインごとの予算（例: {"weather": 10}）
+            "cpu_budgets": {},
+        },
+        "diagnostics": {
+            # UIスレッドの停止を検出して原因（プラグイン・リスナー・本体のコード）を集計する
+            "watchdog": True,
+            # 停止とみなすメインループの遅れ（ミリ秒）
+            "stall_threshold_ms": 100,
         },
+        # 追加の時計ウィンドウ（例: [{"name": "right", "window": {"x": 1920, "y": 0}, "clock": {"timezone": "UTC"}}]）
+        "windows": [],
         "general": {
             "language": "ja",
             "auto_start": False,
@@ -51,10 +110,15 @@ class ConfigManager:
         },
     }
     
+    _instances: Dict[Path, "ConfigManager"] = {}
+    _instances_lock = threading.Lock()
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         初期化
         
+        通常は shared() でプロセス共通のインスタンスを取得すること。
+        
         Args:
             config_path: 設定ファイルのパス（Noneの場合はデフォルトパスを使用）
         """
@@ -62,9 +126,226 @@ class ConfigManager:
             config_path = self._get_default_config_path()
         
         self.config_path = config_path
-        self.config: Dict[str, Any] = {}
+        
+        # 設定レイヤー
+        self._layers: Dict[str, ConfigLayer] = {
+            name: ConfigLayer(name) for name in self.LAYER_ORDER
+        }
+        self._layers["defaults"].data = deepcopy(self.DEFAULT_CONFIG)
+        self._layers["user"].path = config_path
+        self._cache: Dict[str, Any] = {}
+        self.write_layer = "user"
+        
+        # プロセス間の書き込み調整
+        self._file_lock = FileLock(config_path.with_name(config_path.name + ".lock"))
+        self._revision_path = config_path.with_name(config_path.name + ".rev")
+        self._lock = threading.RLock()
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._dirty_keys: set[str] = set()
+        self._change_listeners: List[Callable[[List[str]], None]] = []
+        self._save_timer: Optional[threading.Timer] = None
+        
+        self._load_system_layer()
+        self._load_session_layer()
+        self._load_env_layer()
         self.load()
     
+    @property
+    def config(self) -> Dict[str, Any]:
+        """userレイヤー（config.yaml に保存される設定）"""
+        return self._layers["user"].data
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        self._layers["user"].data = value
+        self._cache.clear()
+    
+    @staticmethod
+    def _get_system_config_path() -> Path:
+        """マシン共通の設定ファイルパスを取得"""
+        override = os.environ.get(ConfigManager.SYSTEM_CONFIG_ENV)
+        if override:
+            return Path(override)
+        
+        if sys.platform == "win32":
+            base = Path(os.environ.get("PROGRAMDATA", r"C:\ProgramData"))
+            return base / "Horloq" / "config.yaml"
+        if sys.platform == "darwin":
+            return Path("/Library/Application Support/Horloq/config.yaml")
+        return Path("/etc/horloq/config.yaml")
+    
+    def _load_system_layer(self) -> List[str]:
+        """
+        systemレイヤーを読み込む（ファイルが変更されていない場合は何もしない）
+        
+        Returns:
+            変更されたキーのリスト
+        """
+        layer = self._layers["system"]
+        if layer.path is None:
+            layer.path = self._get_system_config_path()
+        
+        signature = self._stat_signature(layer.path)
+        if signature == layer.signature:
+            return []
+        
+        data: Dict[str, Any] = {}
+        if signature is not None:
+            try:
+                with open(layer.path, "r", encoding="utf-8") as f:
+                    loaded = yaml.safe_load(f) or {}
+                if isinstance(loaded, dict):
+                    data = loaded
+            except Exception as e:
+                print(f"システム設定の読み込みに失敗しました: {e}")
+        
+        layer.signature = signature
+        return self.set_layer("system", data)
+    
+    def _load_session_layer(self):
+        """sessionレイヤーを読み込む（キオスクモードなどのセッション限定設定）"""
+        session_path = os.environ.get(self.SESSION_CONFIG_ENV)
+        if not session_path:
+            return
+        
+        layer = self._layers["session"]
+        layer.path = Path(session_path)
+        try:
+            with open(layer.path, "r", encoding="utf-8") as f:
+                loaded = yaml.safe_load(f) or {}
+            if isinstance(loaded, dict):
+                layer.data = loaded
+        except Exception as e:
+            print(f"セッション設定の読み込みに失敗しました: {e}")
+        
+        # セッション中の変更は config.yaml に残さない
+        self.write_layer = "session"
+    
+    def _load_env_layer(self):
+        """envレイヤーを環境変数から構築"""
+        data: Dict[str, Any] = {}
+        for name, raw in os.environ.items():
+            if not name.startswith(self.ENV_PREFIX):
+                continue
+            parts = [p.lower() for p in name[len(self.ENV_PREFIX):].split("__") if p]
+            if not parts:
+                continue
+            try:
+                value = yaml.safe_load(raw)
+            except yaml.YAMLError:
+                value = raw
+            
+            target = data
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        
+        self._layers["env"].data = data
+    
+    @staticmethod
+    def _stat_signature(path: Path) -> Optional[Tuple[int, int]]:
+        """ファイルの (mtime, サイズ)（存在しない場合はNone）"""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def get_layer(self, name: str) -> Dict[str, Any]:
+        """
+        レイヤーの設定を取得
+        
+        Args:
+            name: レイヤー名
+            
+        Returns:
+            レイヤーの設定（コピー）
+        """
+        return deepcopy(self._layers[name].data)
+    
+    def layer_paths(self) -> List[Path]:
+        """
+        再読み込みの対象となるレイヤーのファイルパスを取得
+        
+        Returns:
+            userレイヤーと（存在する場合は）systemレイヤーのパス
+        """
+        paths = [self.config_path]
+        system_path = self._layers["system"].path
+        if system_path is not None and system_path.exists():
+            paths.append(system_path)
+        return paths
+    
+    def set_layer(self, name: str, data: Dict[str, Any]) -> List[str]:
+        """
+        レイヤーの設定を置き換え、変更されたキーのキャッシュだけを破棄
+        
+        Args:
+            name: レイヤー名
+            data: 新しい設定
+            
+        Returns:
+            変更されたキーのリスト
+        """
+        layer = self._layers[name]
+        changed = self._diff_config(layer.data, data)
+        layer.data = data
+        for key in changed:
+            self._invalidate(key)
+        return changed
+    
+    @classmethod
+    def shared(cls, config_path: Optional[Path] = None) -> "ConfigManager":
+        """
+        プロセス共通のインスタンスを取得
+        
+        Args:
+            config_path: 設定ファイルのパス（Noneの場合はデフォルトパスを使用）
+            
+        Returns:
+            同じ設定ファイルに対して常に同一のConfigManager
+        """
+        if config_path is None:
+            config_path = cls._get_default_config_path()
+        key = Path(config_path).resolve()
+        
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls(Path(config_path))
+                cls._instances[key] = instance
+            return instance
+    
+    def add_change_listener(self, callback: Callable[[List[str]], None]):
+        """
+        他のプロセスによる変更が反映されたときのリスナーを登録
+        
+        Args:
+            callback: 変更されたキーのリストを受け取る関数
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable[[List[str]], None]):
+        """
+        変更リスナーを解除
+        
+        Args:
+            callback: 登録済みの関数
+        """
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_external_changes(self, changed: List[str]):
+        """外部からの変更をリスナーに通知"""
+        if not changed:
+            return
+        for callback in list(self._change_listeners):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"設定変更リスナーのエラー: {e}")
+    
     @staticmethod
     def _get_default_config_path() -> Path:
         """デフォルト設定ファイルパスを取得"""
@@ -85,34 +366,174 @@ class ConfigManager:
     
     def load(self):
         """設定ファイルを読み込む"""
-        if self.config_path.exists():
+        with self._lock:
+            if self.config_path.exists():
+                try:
+                    with self._file_lock:
+                        loaded_config = self._read_file()
+                        self._signature = self._disk_signature()
+                    # デフォルトと同じ値は取り除き、上書き分だけをuserレイヤーに持つ
+                    self.config = self._prune_defaults(loaded_config)
+                except Exception as e:
+                    print(f"設定ファイルの読み込みに失敗しました: {e}")
+                    self.config = {}
+            else:
+                self.config = {}
+                self._dirty_keys.add("")
+                self.save()
+    
+    def reload(self) -> List[str]:
+        """
+        他のプロセスによる変更を取り込む
+        
+        変更カウンタとファイルの状態が最後に読み書きした時点と同じであれば
+        設定ファイルを解析せずに終了する。変更があった場合は差分を取り、
+        変更されたキーのみを現在の設定に適用する（未保存のキーは上書きしない）。
+        
+        Returns:
+            変更されたキーのリスト（ドット記法）
+        """
+        with self._lock:
+            changed = self._load_system_layer()
+            
+            if not self.config_path.exists() or not self.has_external_changes():
+                self._notify_external_changes(changed)
+                return changed
+            
             try:
-                with open(self.config_path, "r", encoding="utf-8") as f:
-                    loaded_config = yaml.safe_load(f) or {}
-                # デフォルト設定にマージ
-                self.config = self._merge_config(self.DEFAULT_CONFIG, loaded_config)
+                with self._file_lock:
+                    loaded_config = self._read_file()
+                    self._signature = self._disk_signature()
             except Exception as e:
-                print(f"設定ファイルの読み込みに失敗しました: {e}")
-                self.config = deepcopy(self.DEFAULT_CONFIG)
-        else:
-            self.config = deepcopy(self.DEFAULT_CONFIG)
-            self.save()
+                print(f"設定ファイルの再読み込みに失敗しました: {e}")
+                return []
+            
+            changed += self._apply_changes(
+                self._prune_defaults(loaded_config),
+                skip=self._dirty_keys,
+            )
+        
+        self._notify_external_changes(changed)
+        return changed
+    
+    def has_external_changes(self) -> bool:
+        """
+        最後に読み書きした後で、設定ファイルが他から変更されたかどうか
+        
+        Returns:
+            変更されている場合True
+        """
+        return self._disk_signature() != self._signature
     
     def save(self):
-        """設定ファイルに保存"""
+        """
+        設定ファイルに保存
+        
+        ファイルロックを取得し、他のプロセスによる変更があれば先に取り込んでから
+        書き込むため、別プロセスの変更を上書きで失うことはない。
+        """
+        changed: List[str] = []
         try:
-            # ディレクトリが存在しない場合は作成
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                yaml.dump(self.config, f, allow_unicode=True, default_flow_style=False)
+            with self._lock:
+                # 予約中の保存はこの書き込みに含まれる
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                
+                # ディレクトリが存在しない場合は作成
+                self.config_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                with self._file_lock:
+                    if "" not in self._dirty_keys and self.config_path.exists() and self.has_external_changes():
+                        loaded_config = self._read_file()
+                        changed = self._apply_changes(
+                            self._prune_defaults(loaded_config),
+                            skip=self._dirty_keys,
+                        )
+                    
+                    self._write_file()
+                    self._dirty_keys.clear()
         except Exception as e:
             print(f"設定ファイルの保存に失敗しました: {e}")
+        
+        self._notify_external_changes(changed)
+    
+    def save_later(self, delay: Optional[float] = None):
+        """
+        保存を予約（予約済みの場合は何もしない）
+        
+        短時間に繰り返される変更を1回の書き込みにまとめる。保存は別スレッドで
+        行われ、他のプロセスの変更を取り込んだ場合のリスナー通知もそのスレッドから呼ばれる。
+        
+        Args:
+            delay: 書き込みまでの待ち時間（秒、Noneの場合は SAVE_DELAY）
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(
+                self.SAVE_DELAY if delay is None else delay,
+                self.flush,
+            )
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """予約中の保存があれば即座に書き込む"""
+        with self._lock:
+            pending = self._save_timer is not None
+        if pending:
+            self.save()
+    
+    def _read_file(self) -> Dict[str, Any]:
+        """設定ファイルを解析（ロックは呼び出し側で取得）"""
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            loaded_config = yaml.safe_load(f) or {}
+        if not isinstance(loaded_config, dict):
+            raise ValueError("設定ファイルの形式が不正です")
+        return loaded_config
+    
+    def _write_file(self):
+        """設定ファイルと変更カウンタを書き込む（ロックは呼び出し側で取得）"""
+        tmp_path = self.config_path.with_name(self.config_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.dump(self.config, f, allow_unicode=True, default_flow_style=False)
+        os.replace(tmp_path, self.config_path)
+        
+        revision = self._read_revision() + 1
+        with open(self._revision_path, "w", encoding="utf-8") as f:
+            f.write(str(revision))
+        
+        self._signature = self._disk_signature()
+    
+    def _read_revision(self) -> int:
+        """変更カウンタを読み込む"""
+        try:
+            with open(self._revision_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def _disk_signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        設定ファイルの状態を表す値（変更カウンタ, mtime, サイズ）
+        
+        カウンタはHorloq同士の書き込みを、mtimeとサイズは外部ツールによる
+        直接編集を検出するために使う。
+        """
+        try:
+            st = self.config_path.stat()
+        except OSError:
+            return None
+        return (self._read_revision(), st.st_mtime_ns, st.st_size)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
         設定値を取得（ドット記法対応）
         
+        すべてのレイヤーを重ねた解決済みの値を返す。解決結果はキーごとに
+        キャッシュされる。
+        
         Args:
             key: 設定キー（例: "window.width"）
             default: デフォルト値
@@ -120,39 +541,230 @@ class ConfigManager:
         Returns:
             設定値
         """
-        keys = key.split(".")
-        value = self.config
+        # 予約した保存（save_later）は別スレッドでキャッシュを破棄するためロックを取る
+        with self._lock:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                value = self._resolve(key)
+                self._cache[key] = value
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        if value is _MISSING:
+            return default
         
+        # キャッシュを呼び出し側の変更から守る
+        if isinstance(value, (dict, list)):
+            return deepcopy(value)
         return value
     
-    def set(self, key: str, value: Any):
+    def set(self, key: str, value: Any, layer: Optional[str] = None):
         """
         設定値を設定（ドット記法対応）
         
         Args:
             key: 設定キー（例: "window.width"）
             value: 設定値
+            layer: 書き込み先のレイヤー（Noneの場合は write_layer）
         """
+        layer = layer or self.write_layer
+        with self._lock:
+            if layer == "user":
+                self._set(key, value)
+                self._dirty_keys.add(key)
+            else:
+                self._set_in(self._layers[layer].data, key, value)
+                self._invalidate(key)
+    
+    def _set(self, key: str, value: Any):
+        """userレイヤーに設定値を設定（未保存のキーとして記録しない）"""
+        self._set_in(self.config, key, value)
+        self._invalidate(key)
+    
+    @staticmethod
+    def _set_in(config: Dict[str, Any], key: str, value: Any):
+        """辞書にドット記法のキーで値を設定"""
         keys = key.split(".")
-        config = self.config
         
         for k in keys[:-1]:
-            if k not in config:
+            if not isinstance(config.get(k), dict):
                 config[k] = {}
             config = config[k]
         
         config[keys[-1]] = value
     
+    def _resolve(self, key: str) -> Any:
+        """
+        レイヤーを重ねてキーの値を解決
+        
+        辞書以外の値は最も優先度の高いレイヤーの値をそのまま返し、辞書の場合は
+        そのキー以下の部分だけをマージする（全体のマージは行わない）。
+        """
+        found: List[Dict[str, Any]] = []
+        
+        for name in reversed(self.LAYER_ORDER):
+            value = self._lookup(self._layers[name].data, key)
+            if value is _MISSING:
+                continue
+            if not isinstance(value, dict):
+                if not found:
+                    return value
+                break
+            found.append(value)
+        
+        if not found:
+            return _MISSING
+        
+        result: Dict[str, Any] = {}
+        for value in reversed(found):
+            result = self._merge_config(result, value)
+        return result
+    
+    def _invalidate(self, key: str):
+        """キーとその親子に当たるキャッシュを破棄"""
+        with self._lock:
+            for cached_key in [k for k in self._cache if self._is_related_key(k, key)]:
+                del self._cache[cached_key]
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        すべてのレイヤーを重ねた設定全体を取得
+        
+        Returns:
+            解決済みの設定（コピー）
+        """
+        result: Dict[str, Any] = {}
+        for name in self.LAYER_ORDER:
+            result = self._merge_config(result, self._layers[name].data)
+        return result
+    
     def reset(self):
         """設定をデフォルトにリセット"""
-        self.config = deepcopy(self.DEFAULT_CONFIG)
-        self.save()
+        with self._lock:
+            self.config = {}
+            self._dirty_keys.add("")
+            self.save()
+    
+    def _apply_changes(
+        self,
+        new_config: Dict,
+        skip: Iterable[str] = (),
+        mark_dirty: bool = False,
+    ) -> List[str]:
+        """
+        新しい設定との差分を取り、変更されたキーだけを反映
+        
+        Args:
+            new_config: 新しいuserレイヤーの設定
+            skip: 反映しないキー（未保存の変更など。親子関係にあるキーも対象）
+            mark_dirty: 反映したキーを未保存として記録するかどうか
+            
+        Returns:
+            変更されたキーのリスト（ドット記法）
+        """
+        skip = list(skip)
+        changed = [
+            key for key in self._diff_config(self.config, new_config)
+            if not any(self._is_related_key(key, s) for s in skip)
+        ]
+        
+        for key in changed:
+            value = self._lookup(new_config, key)
+            if value is _MISSING:
+                self._delete(key)
+            else:
+                self._set(key, deepcopy(value))
+            if mark_dirty:
+                self._dirty_keys.add(key)
+        
+        return changed
+    
+    @staticmethod
+    def _is_related_key(key: str, other: str) -> bool:
+        """2つのキーが同じか、一方がもう一方の親であるかどうか"""
+        if other == "" or key == other:
+            return True
+        return key.startswith(other + ".") or other.startswith(key + ".")
+    
+    def _diff_config(self, old: Dict, new: Dict, prefix: str = "") -> List[str]:
+        """
+        2つの設定を比較して、値が異なる末端のキーを列挙
+        
+        Args:
+            old: 比較元の設定
+            new: 比較先の設定
+            prefix: キーの接頭辞
+            
+        Returns:
+            変更されたキーのリスト（ドット記法）
+        """
+        changed = []
+        
+        for key in sorted(set(old) | set(new), key=str):
+            path = f"{prefix}{key}"
+            old_value = old.get(key, _MISSING)
+            new_value = new.get(key, _MISSING)
+            
+            if isinstance(old_value, dict) and isinstance(new_value, dict):
+                changed.extend(self._diff_config(old_value, new_value, f"{path}."))
+            elif old_value != new_value:
+                changed.append(path)
+        
+        return changed
+    
+    @staticmethod
+    def _lookup(config: Dict, key: str) -> Any:
+        """ドット記法のキーで値を取得（存在しない場合は_MISSING）"""
+        value = config
+        for k in key.split("."):
+            if isinstance(value, dict) and k in value:
+                value = value[k]
+            else:
+                return _MISSING
+        return value
+    
+    def _delete(self, key: str):
+        """ドット記法のキーを削除"""
+        keys = key.split(".")
+        config = self.config
+        
+        for k in keys[:-1]:
+            if not isinstance(config, dict) or k not in config:
+                return
+            config = config[k]
+        
+        if isinstance(config, dict):
+            config.pop(keys[-1], None)
+        self._invalidate(key)
+    
+    def _prune_defaults(self, config: Dict, default: Any = _MISSING) -> Dict:
+        """
+        userレイヤーより下のレイヤー（defaults と system）を重ねた値と同じ値を取り除く
+        
+        以前のバージョンは config.yaml にデフォルト値も含めて保存していたため、
+        そのままuserレイヤーに載せるとsystemレイヤーの値を隠してしまう。
+        DEFAULT_CONFIG ではなく下のレイヤーの解決済みの値と比べるため、
+        systemレイヤーの値をデフォルト値に戻す上書きは取り除かれない。
+        
+        Args:
+            config: 読み込んだ設定
+            default: 比較する設定（省略時は defaults と system を重ねたもの）
+            
+        Returns:
+            下のレイヤーと異なる値だけを含む設定
+        """
+        if default is _MISSING:
+            default = self._merge_config(self._layers["defaults"].data, self._layers["system"].data)
+        
+        result = {}
+        for key, value in config.items():
+            default_value = default.get(key, _MISSING) if isinstance(default, dict) else _MISSING
+            if isinstance(value, dict) and isinstance(default_value, dict):
+                pruned = self._prune_defaults(value, default_value)
+                if pruned:
+                    result[key] = pruned
+            elif value != default_value:
+                result[key] = value
+        return result
     
     def _merge_config(self, default: Dict, loaded: Dict) -> Dict:
         """
@@ -190,17 +802,20 @@ class ConfigManager:
             export_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(export_path, "w", encoding="utf-8") as f:
-                yaml.dump(self.config, f, allow_unicode=True, default_flow_style=False)
+                yaml.dump(self.as_dict(), f, allow_unicode=True, default_flow_style=False)
         except Exception as e:
             raise Exception(f"設定のエクスポートに失敗しました: {e}")
     
-    def import_config(self, import_path: Path):
+    def import_config(self, import_path: Path) -> List[str]:
         """
         設定をファイルからインポート
         
         Args:
             import_path: インポート元のパス
         
+        Returns:
+            変更されたキーのリスト（ドット記法）
+        
         Raises:
             Exception: インポートに失敗した場合
         """
@@ -211,10 +826,15 @@ class ConfigManager:
             with open(import_path, "r", encoding="utf-8") as f:
                 loaded_config = yaml.safe_load(f) or {}
             
-            # デフォルト設定にマージ
-            self.config = self._merge_config(self.DEFAULT_CONFIG, loaded_config)
+            # userレイヤーとの差分のみ反映
+            with self._lock:
+                changed = self._apply_changes(
+                    self._prune_defaults(loaded_config),
+                    mark_dirty=True,
+                )
             
             # 現在の設定ファイルに保存
             self.save()
+            return changed
         except Exception as e:
             raise Exception(f"設定のインポートに失敗しました: {e}")
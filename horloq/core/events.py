@@ -21,6 +21,8 @@ class EventManager:
     def __init__(self):
         """初期化"""
         self._listeners: Dict[str, List[Callable]] = {}
+        # プラグインごとのCPU時間を集計する ResourceMonitor（HorloqApp が設定する）
+        self.monitor = None
     
     def on(self, event_name: str, callback: Callable):
         """
@@ -61,9 +63,29 @@ class EventManager:
         
         event = Event(name=event_name, data=data, timestamp=datetime.now())
         
-        for callback in self._listeners[event_name]:
+        # コールバック内でリスナーが増減しても影響しないようにコピーを回す
+        self.deliver(event, list(self._listeners[event_name]))
+    
+    def deliver(self, event: Event, callbacks: List[Callable]):
+        """
+        発行済みのイベントを指定したリスナーに渡す
+        
+        emit と同じくリスナーごとのCPU時間を集計する（起動したプラグインに
+        起動トリガーのイベントを渡し直す場合などに使う）。
+        
+        Args:
+            event: イベント
+            callbacks: コールバック関数のリスト
+        """
+        # MainThreadWatchdog がリスナーの停止の表示に使う
+        event_name = event.name
+        monitor = self.monitor
+        for callback in callbacks:
             try:
-                callback(event)
+                if monitor is None:
+                    callback(event)
+                else:
+                    monitor.call(callback, event)
             except Exception as e:
                 print(f"イベント処理エラー ({event_name}): {e}")
     
@@ -88,6 +110,18 @@ class EventManager:
         """
         return list(self._listeners.keys())
     
+    def listeners(self, event_name: str) -> List[Callable]:
+        """
+        指定イベントのリスナーを取得
+        
+        Args:
+            event_name: イベント名
+            
+        Returns:
+            コールバック関数のリスト（登録順）
+        """
+        return list(self._listeners.get(event_name, []))
+    
     def listener_count(self, event_name: str) -> int:
         """
         指定イベントのリスナー数を取得
@@ -0,0 +1,106 @@
+"""
+プロセス間のアドバイザリファイルロック
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class FileLockTimeout(Exception):
+    """ロックの取得がタイムアウトした"""
+
+
+class FileLock:
+    """
+    アドバイザリファイルロック
+
+    POSIXではfcntl.flock、Windowsではmsvcrt.lockingを使用する。
+    GUIプロセスとCLIの呼び出しが同じ設定ファイルを同時に書き換えないように
+    withブロックで排他区間を作る。同一インスタンスの入れ子取得にも対応する。
+    """
+
+    def __init__(self, path: Path, timeout: float = 5.0, poll_interval: float = 0.05):
+        """
+        初期化
+
+        Args:
+            path: ロックファイルのパス
+            timeout: 取得を待つ最大時間（秒）
+            poll_interval: 再試行の間隔（秒）
+        """
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._depth = 0
+
+    def acquire(self):
+        """ロックを取得"""
+        if self._depth > 0:
+            self._depth += 1
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                self._try_lock(fd)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise FileLockTimeout(f"ロックを取得できませんでした: {self.path}")
+                time.sleep(self.poll_interval)
+
+        self._fd = fd
+        self._depth = 1
+
+    def release(self):
+        """ロックを解放"""
+        if self._depth == 0:
+            return
+
+        self._depth -= 1
+        if self._depth > 0:
+            return
+
+        fd = self._fd
+        self._fd = None
+        try:
+            self._unlock(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _try_lock(fd: int):
+        """ノンブロッキングでロックを試みる（取得できない場合はOSError）"""
+        if sys.platform == "win32":
+            import msvcrt
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _unlock(fd: int):
+        """ロックを解除"""
+        if sys.platform == "win32":
+            import msvcrt
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
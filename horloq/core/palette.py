@@ -0,0 +1,224 @@
+"""
+派生カラー計算（パレットエンジン）
+"""
+
+import math
+from dataclasses import replace
+from functools import lru_cache
+from typing import Tuple
+
+
+Lab = Tuple[float, float, float]
+
+# WCAG AA の本文テキストに必要なコントラスト比
+MIN_TEXT_CONTRAST = 4.5
+
+
+def parse_hex(color: str) -> Tuple[int, int, int]:
+    """
+    16進カラーコードをRGBに変換
+
+    Args:
+        color: "#rgb" または "#rrggbb"
+
+    Returns:
+        (r, g, b)（0-255）
+    """
+    value = color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    if len(value) != 6:
+        raise ValueError(f"不正なカラーコードです: {color}")
+    return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+
+
+def to_hex(rgb: Tuple[float, float, float]) -> str:
+    """RGB（0-255）を16進カラーコードに変換"""
+    return "#" + "".join(f"{max(0, min(255, round(c))):02x}" for c in rgb)
+
+
+def _srgb_to_linear(c: float) -> float:
+    c /= 255.0
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(c: float) -> float:
+    c = max(0.0, min(1.0, c))
+    c = 12.92 * c if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+    return c * 255.0
+
+
+@lru_cache(maxsize=512)
+def to_oklab(color: str) -> Lab:
+    """
+    16進カラーコードをOKLab（知覚的に均等な色空間）に変換
+
+    Args:
+        color: 16進カラーコード
+
+    Returns:
+        (L, a, b)
+    """
+    r, g, b = (_srgb_to_linear(c) for c in parse_hex(color))
+
+    l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b
+    m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
+    s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
+
+    l_, m_, s_ = (math.copysign(abs(v) ** (1 / 3), v) for v in (l, m, s))
+
+    return (
+        0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+        1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+        0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_,
+    )
+
+
+def from_oklab(lab: Lab) -> str:
+    """
+    OKLabを16進カラーコードに変換（sRGBの範囲外は切り詰める）
+
+    Args:
+        lab: (L, a, b)
+
+    Returns:
+        16進カラーコード
+    """
+    L, a, b = lab
+    l_ = L + 0.3963377774 * a + 0.2158037573 * b
+    m_ = L - 0.1055613458 * a - 0.0638541728 * b
+    s_ = L - 0.0894841775 * a - 1.2914855480 * b
+
+    l, m, s = l_ ** 3, m_ ** 3, s_ ** 3
+
+    return to_hex((
+        _linear_to_srgb(4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s),
+        _linear_to_srgb(-1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s),
+        _linear_to_srgb(-0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s),
+    ))
+
+
+def mix(color_a: str, color_b: str, t: float) -> str:
+    """
+    2色をOKLab上で補間
+
+    Args:
+        color_a: 開始色
+        color_b: 終了色
+        t: 補間係数（0でcolor_a、1でcolor_b）
+
+    Returns:
+        補間された色
+    """
+    a = to_oklab(color_a)
+    b = to_oklab(color_b)
+    return from_oklab(tuple(x + (y - x) * t for x, y in zip(a, b)))
+
+
+def shift_lightness(color: str, delta: float) -> str:
+    """
+    明度（OKLabのL）をずらす
+
+    Args:
+        color: 元の色
+        delta: 明度の変化量（正で明るく、負で暗く）
+
+    Returns:
+        変更後の色
+    """
+    L, a, b = to_oklab(color)
+    return from_oklab((max(0.0, min(1.0, L + delta)), a, b))
+
+
+@lru_cache(maxsize=512)
+def relative_luminance(color: str) -> float:
+    """WCAGの相対輝度"""
+    r, g, b = (_srgb_to_linear(c) for c in parse_hex(color))
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(color_a: str, color_b: str) -> float:
+    """
+    WCAGのコントラスト比
+
+    Args:
+        color_a: 色1
+        color_b: 色2
+
+    Returns:
+        コントラスト比（1〜21）
+    """
+    la = relative_luminance(color_a)
+    lb = relative_luminance(color_b)
+    lighter, darker = max(la, lb), min(la, lb)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def is_dark(color: str) -> bool:
+    """暗い色かどうか"""
+    return to_oklab(color)[0] < 0.6
+
+
+@lru_cache(maxsize=1024)
+def derive_color(role: str, bg: str, fg: str, accent: str) -> str:
+    """
+    基本色からロールの色を導出（テーマ・ロールごとに一度だけ計算される）
+
+    Args:
+        role: "bg_secondary", "fg_secondary", "hover", "border" のいずれか
+        bg: 背景色
+        fg: 前景色
+        accent: アクセント色
+
+    Returns:
+        導出された色
+    """
+    dark = is_dark(bg)
+
+    if role == "bg_secondary":
+        # 背景からわずかに浮かせる
+        return shift_lightness(bg, 0.04 if dark else -0.03)
+
+    if role == "hover":
+        # 暗いテーマでは明るく、明るいテーマでは暗くする
+        return shift_lightness(accent, 0.08 if dark else -0.08)
+
+    if role == "border":
+        return mix(bg, fg, 0.18)
+
+    if role == "fg_secondary":
+        # 背景に寄せて控えめにしつつ、読めるコントラストは確保する
+        t = 0.35
+        while t > 0:
+            candidate = mix(fg, bg, t)
+            if contrast_ratio(candidate, bg) >= MIN_TEXT_CONTRAST:
+                return candidate
+            t = round(t - 0.05, 2)
+        return fg
+
+    raise ValueError(f"導出できないロールです: {role}")
+
+
+DERIVED_ROLES = ("bg_secondary", "fg_secondary", "hover", "border")
+
+
+def complete_theme(theme):
+    """
+    未指定のロールを導出してテーマを補完
+
+    Args:
+        theme: Theme
+
+    Returns:
+        すべてのロールが埋まったTheme（補完が不要な場合は同じオブジェクト）
+    """
+    missing = [role for role in DERIVED_ROLES if getattr(theme, role) is None]
+    if not missing:
+        return theme
+
+    derived = {
+        role: derive_color(role, theme.bg, theme.fg, theme.accent)
+        for role in missing
+    }
+    return replace(theme, **derived)
+
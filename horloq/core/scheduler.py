@@ -0,0 +1,512 @@
+"""
+プラグインの定期処理・時刻指定の処理・バックグラウンド処理のスケジューラー
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+
+@dataclass
+class _Job:
+    """予約された処理1件"""
+
+    owner: Any
+    callback: Callable[[], Any]
+    due: float  # 次に実行する時刻（time.time()）
+    interval: Optional[float] = None  # 定期処理の間隔（秒、時刻指定の場合はNone）
+    align: bool = True
+
+
+@dataclass
+class _Budget:
+    """持ち主1件分のCPU時間の集計と間引きの倍率"""
+
+    # 直近の実行（時刻, CPU時間）
+    recent: Deque[Tuple[float, float]] = field(default_factory=deque)
+    backoff: int = 1
+    adjusted_at: float = 0.0
+
+
+class Scheduler:
+    """
+    プラグインの処理をまとめて実行するスケジューラー
+
+    すべての予約を1つの after ループから実行し、近い時刻の予約は1回の起床で
+    まとめて実行する。align した定期処理は時計の間隔の境界に揃えるため、
+    同じ間隔の処理は同じ起床で実行される。
+
+    持ち主（プラグイン）ごとにUIスレッドでのCPU時間を集計し、予算を超えた持ち主の
+    定期処理は間隔を倍々に延ばす（予算の半分を下回ると戻す）。
+    ルートウィンドウがない場合は run_pending() と timeout() で外部のループから駆動する。
+    """
+
+    # この時間内に予定されている処理は同じ起床で実行する（秒）
+    BATCH_WINDOW = 0.01
+    # CPU時間を集計する期間（秒）
+    BUDGET_WINDOW = 10.0
+    # 間引きの倍率を変える最短の間隔（秒）
+    ADJUST_INTERVAL = 2.0
+    # 間引きの最大の倍率
+    MAX_BACKOFF = 16
+    # バックグラウンド処理の実行中に完了を確認する間隔（秒）
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        root=None,
+        budget_percent: float = 5.0,
+        budgets: Optional[Dict[str, float]] = None,
+        max_workers: int = 4,
+    ):
+        """
+        初期化
+
+        Args:
+            root: Tkのルートウィンドウ（後から bind_root で設定可能）
+            budget_percent: 持ち主ごとのCPU時間の予算（UIスレッドの使用率%、0で無制限）
+            budgets: 持ち主の名前 → 予算（個別に指定する場合）
+            max_workers: バックグラウンド処理のスレッド数
+        """
+        self._root = root
+        self.budget_percent = float(budget_percent)
+        self.budgets: Dict[str, float] = dict(budgets or {})
+        self.max_workers = max(1, int(max_workers))
+        # プラグインごとのCPU時間を集計する ResourceMonitor（HorloqApp が設定する）
+        self.monitor = None
+
+        self._jobs: Dict[int, _Job] = {}
+        self._next_id = 0
+        self._paused: List[Any] = []
+        self._budgets: Dict[str, _Budget] = {}
+
+        self._timer: Optional[str] = None
+        self._timer_due: Optional[float] = None
+
+        # バックグラウンド処理
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[int, Tuple[Any, Future, Optional[Callable[[Any, Optional[Exception]], None]]]] = {}
+        self._completed: "queue.Queue[int]" = queue.Queue()
+        self._lock = threading.Lock()
+        # コルーチンを実行するイベントループ（最初の run_coroutine で専用のスレッドに作る）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_root(self, root):
+        """
+        タイマーに使うルートウィンドウを設定
+
+        Args:
+            root: Tkのルートウィンドウ
+        """
+        self._root = root
+        self._reschedule()
+
+    # --- 予約 ---
+
+    def schedule_periodic(
+        self,
+        owner: Any,
+        interval: float,
+        callback: Callable[[], Any],
+        align: bool = True,
+    ) -> int:
+        """
+        定期処理を予約
+
+        Args:
+            owner: 持ち主（プラグインインスタンス）
+            interval: 間隔（秒）
+            callback: 引数なしで呼ばれる関数
+            align: 時計の間隔の境界（毎秒0ミリ秒、毎分0秒など）に揃える場合True
+
+        Returns:
+            取り消しに使うID
+        """
+        interval = max(0.001, float(interval))
+        job = _Job(owner, callback, 0.0, interval, align)
+        job.due = self._next_due(job, time.time())
+        return self._add(job)
+
+    def schedule_at(self, owner: Any, when: Union[datetime, float], callback: Callable[[], Any]) -> int:
+        """
+        指定した時刻に1回だけ実行する処理を予約
+
+        Args:
+            owner: 持ち主（プラグインインスタンス）
+            when: 実行する時刻（datetime または time.time() の値、過ぎている場合はすぐに実行）
+            callback: 引数なしで呼ばれる関数
+
+        Returns:
+            取り消しに使うID
+        """
+        due = when.timestamp() if isinstance(when, datetime) else float(when)
+        return self._add(_Job(owner, callback, due))
+
+    def run_in_background(
+        self,
+        owner: Any,
+        func: Callable[[], Any],
+        on_done: Optional[Callable[[Any, Optional[Exception]], None]] = None,
+    ) -> int:
+        """
+        関数をバックグラウンドのスレッドで実行し、完了をUIスレッドに通知
+
+        Args:
+            owner: 持ち主（プラグインインスタンス）
+            func: スレッドで実行する引数なしの関数（UIに触れないこと）
+            on_done: UIスレッドで (戻り値, 例外) を受け取る関数（成功時の例外はNone）
+
+        Returns:
+            取り消しに使うID
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="horloq-background",
+                )
+            future = self._executor.submit(func)
+            job_id = self._track(owner, future, on_done)
+        return self._watch(job_id, future)
+
+    def run_coroutine(
+        self,
+        owner: Any,
+        coroutine: Any,
+        on_done: Optional[Callable[[Any, Optional[Exception]], None]] = None,
+    ) -> int:
+        """
+        コルーチンをバックグラウンドのイベントループで実行し、完了をUIスレッドに通知
+
+        イベントループは終了まで動き続けるため、コルーチンが作ったタスクも完了後に
+        取り消されない。
+
+        Args:
+            owner: 持ち主（プラグインインスタンス）
+            coroutine: 実行するコルーチン（UIに触れないこと）
+            on_done: UIスレッドで (戻り値, 例外) を受け取る関数（成功時の例外はNone）
+
+        Returns:
+            取り消しに使うID（取り消すとコルーチンのタスクも取り消す）
+        """
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="horloq-asyncio",
+                    daemon=True,
+                ).start()
+            future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+            job_id = self._track(owner, future, on_done)
+        return self._watch(job_id, future)
+
+    def cancel(self, job_id: Optional[int]):
+        """
+        予約を取り消す（バックグラウンド処理は未開始なら実行せず、完了の通知もしない）
+
+        Args:
+            job_id: 予約したときのID
+        """
+        if self._jobs.pop(job_id, None) is not None:
+            self._reschedule()
+            return
+        with self._lock:
+            entry = self._futures.pop(job_id, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    def cancel_owner(self, owner: Any) -> int:
+        """
+        持ち主の予約をすべて取り消す（プラグインの終了時）
+
+        Args:
+            owner: 持ち主
+
+        Returns:
+            取り消した件数
+        """
+        job_ids = [job_id for job_id, job in self._jobs.items() if job.owner is owner]
+        with self._lock:
+            job_ids += [job_id for job_id, entry in self._futures.items() if entry[0] is owner]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._paused = [paused for paused in self._paused if paused is not owner]
+        return len(job_ids)
+
+    def pause_owner(self, owner: Any):
+        """
+        持ち主の予約の実行を止める（再開まで時刻を過ぎても実行しない）
+
+        Args:
+            owner: 持ち主
+        """
+        if not any(paused is owner for paused in self._paused):
+            self._paused.append(owner)
+            self._reschedule()
+
+    def resume_owner(self, owner: Any):
+        """
+        pause_owner() で止めた予約を再開（過ぎた定期処理は次の境界から実行する）
+
+        Args:
+            owner: 持ち主
+        """
+        if not any(paused is owner for paused in self._paused):
+            return
+        self._paused = [paused for paused in self._paused if paused is not owner]
+        now = time.time()
+        for job in self._jobs.values():
+            if job.owner is owner and job.interval is not None and job.due < now:
+                job.due = self._next_due(job, now)
+        self._reschedule()
+
+    # --- 状態 ---
+
+    def jobs(self, owner: Any) -> int:
+        """
+        持ち主の予約の数（バックグラウンド処理を含む）
+
+        Args:
+            owner: 持ち主
+
+        Returns:
+            件数
+        """
+        count = sum(1 for job in self._jobs.values() if job.owner is owner)
+        with self._lock:
+            count += sum(1 for entry in self._futures.values() if entry[0] is owner)
+        return count
+
+    def backoff(self, owner: Any) -> int:
+        """
+        持ち主の定期処理の間引きの倍率
+
+        Args:
+            owner: 持ち主
+
+        Returns:
+            倍率（予算内の場合は1）
+        """
+        budget = self._budgets.get(self._owner_name(owner))
+        return budget.backoff if budget is not None else 1
+
+    def timeout(self) -> Optional[float]:
+        """
+        次の予約までの秒数（ルートウィンドウなしで駆動する場合に使う）
+
+        Returns:
+            秒数（予約がない場合はNone）
+        """
+        due = self._next_timer_due()
+        if due is None:
+            return None
+        return max(0.0, due - time.time())
+
+    def shutdown(self):
+        """すべての予約を取り消し、バックグラウンドのスレッドを止める"""
+        self._jobs.clear()
+        self._cancel_timer()
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            executor, self._executor = self._executor, None
+            loop, self._loop = self._loop, None
+        for _owner, future, _on_done in futures:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    # --- 実行 ---
+
+    def run_pending(self):
+        """時刻を過ぎた予約とバックグラウンド処理の完了の通知をまとめて実行"""
+        self._drain_completed()
+
+        now = time.time()
+        limit = now + self.BATCH_WINDOW
+        due = [
+            (job_id, job) for job_id, job in self._jobs.items()
+            if job.due <= limit and not self._is_paused(job.owner)
+        ]
+        due.sort(key=lambda item: item[1].due)
+
+        for job_id, job in due:
+            # 先に実行した処理が取り消した場合
+            if self._jobs.get(job_id) is not job:
+                continue
+            if job.interval is None:
+                del self._jobs[job_id]
+            else:
+                job.due = self._next_due(job, now)
+            self._run(job.owner, job.callback)
+
+    def _run(self, owner: Any, callback: Callable, *args):
+        """持ち主のCPU時間を計りながらコールバックを呼ぶ"""
+        start = time.thread_time()
+        try:
+            if self.monitor is None:
+                callback(*args)
+            else:
+                self.monitor.call(callback, *args, wakeup=True)
+        except Exception as e:
+            print(f"予約した処理でエラーが発生しました ({self._owner_name(owner)}): {e}")
+        finally:
+            self._charge(owner, time.thread_time() - start)
+
+    def _next_due(self, job: _Job, now: float) -> float:
+        """定期処理の次の実行時刻（間引きの倍率を含む）"""
+        interval = job.interval * self.backoff(job.owner)
+        if job.align:
+            return (now // interval + 1) * interval
+        # 前回の予定から数える（大きく遅れた場合は今から数える）
+        due = job.due + interval if job.due else now + interval
+        return due if due > now else now + interval
+
+    # --- CPU時間の予算 ---
+
+    @staticmethod
+    def _owner_name(owner: Any) -> str:
+        """持ち主の名前（予算の設定と表示に使う）"""
+        return str(getattr(owner, "name", owner))
+
+    def _charge(self, owner: Any, cpu: float):
+        """CPU時間を加算し、予算に応じて間引きの倍率を変える"""
+        name = self._owner_name(owner)
+        limit = self.budgets.get(name, self.budget_percent)
+        if limit <= 0:
+            return
+
+        now = time.monotonic()
+        budget = self._budgets.setdefault(name, _Budget())
+        budget.recent.append((now, cpu))
+        while budget.recent and now - budget.recent[0][0] > self.BUDGET_WINDOW:
+            budget.recent.popleft()
+        if now - budget.adjusted_at < self.ADJUST_INTERVAL:
+            return
+
+        usage = sum(c for _t, c in budget.recent) / self.BUDGET_WINDOW * 100
+        backoff = budget.backoff
+        if usage > limit and backoff < self.MAX_BACKOFF:
+            backoff *= 2
+        elif usage < limit / 2 and backoff > 1:
+            backoff //= 2
+        if backoff == budget.backoff:
+            return
+
+        budget.backoff = backoff
+        budget.adjusted_at = now
+        if backoff > 1:
+            print(f"{name} のCPU使用率が予算を超えたため定期処理の間隔を {backoff} 倍にします ({usage:.1f}% > {limit:g}%)")
+        else:
+            print(f"{name} の定期処理の間隔を元に戻します")
+        current = time.time()
+        for job in self._jobs.values():
+            if job.interval is not None and self._owner_name(job.owner) == name:
+                job.due = self._next_due(job, current)
+
+    # --- バックグラウンド処理の完了 ---
+
+    def _track(self, owner: Any, future: Future, on_done) -> int:
+        """バックグラウンド処理を登録（self._lock を取って呼ぶ）"""
+        self._next_id += 1
+        self._futures[self._next_id] = (owner, future, on_done)
+        return self._next_id
+
+    def _watch(self, job_id: int, future: Future) -> int:
+        """完了をUIスレッドのタイマーで確認する"""
+        future.add_done_callback(lambda _future: self._completed.put(job_id))
+        if self._timer_due is None or self._timer_due > time.time() + self.POLL_INTERVAL:
+            self._reschedule()
+        return job_id
+
+    def _drain_completed(self):
+        """完了したバックグラウンド処理の on_done を呼ぶ"""
+        while True:
+            try:
+                job_id = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                entry = self._futures.pop(job_id, None)
+            if entry is None:
+                continue
+            owner, future, on_done = entry
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if on_done is None:
+                if error is not None:
+                    print(f"バックグラウンド処理でエラーが発生しました ({self._owner_name(owner)}): {error}")
+                continue
+            self._run(owner, on_done, None if error is not None else future.result(), error)
+
+    # --- タイマー ---
+
+    def _add(self, job: _Job) -> int:
+        """予約を追加してタイマーを合わせる"""
+        self._next_id += 1
+        self._jobs[self._next_id] = job
+        if self._timer_due is None or job.due < self._timer_due:
+            self._reschedule()
+        return self._next_id
+
+    def _is_paused(self, owner: Any) -> bool:
+        """持ち主が一時停止中かどうか"""
+        return any(paused is owner for paused in self._paused)
+
+    def _next_timer_due(self) -> Optional[float]:
+        """
+        次に起床する時刻
+
+        ワーカースレッドからはTkを呼ばず（メインループの開始前は呼び出しがブロックして失敗する）、
+        実行中のバックグラウンド処理がある間はUIスレッドのタイマーで完了を確認する。
+        """
+        now = time.time()
+        if not self._completed.empty():
+            return now
+        dues = [job.due for job in self._jobs.values() if not self._is_paused(job.owner)]
+        with self._lock:
+            if self._futures:
+                dues.append(now + self.POLL_INTERVAL)
+        return min(dues) if dues else None
+
+    def _reschedule(self):
+        """次の起床を予約し直す"""
+        self._cancel_timer()
+        if self._root is None:
+            return
+        due = self._next_timer_due()
+        if due is None:
+            return
+        delay = max(0, int((due - time.time()) * 1000) + 1)
+        try:
+            self._timer = self._root.after(delay, self._on_timer)
+            self._timer_due = due
+        except Exception:
+            self._timer = None
+
+    def _cancel_timer(self):
+        """予約中の起床を取り消す"""
+        if self._timer is not None:
+            try:
+                self._root.after_cancel(self._timer)
+            except Exception:
+                pass
+        self._timer = None
+        self._timer_due = None
+
+    def _on_timer(self):
+        """起床（UIスレッド）"""
+        self._timer = None
+        self._timer_due = None
+        self.run_pending()
+        self._reschedule()
@@ -2,8 +2,12 @@
 テーマ管理システム
 """
 
-from typing import Dict, Optional
-from dataclasses import dataclass
+import re
+import yaml
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass, fields
+from .palette import complete_theme
 
 
 @dataclass
@@ -105,10 +109,36 @@ class ThemeManager:
         ),
     }
     
-    def __init__(self):
-        """初期化"""
+    THEME_FILE_SUFFIXES = (".yaml", ".yml")
+    REQUIRED_COLORS = ("bg", "fg", "accent")
+    _COLOR_PATTERN = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$")
+    
+    def __init__(self, theme_dir: Optional[Path] = None):
+        """
+        初期化
+        
+        Args:
+            theme_dir: ユーザーテーマのディレクトリ（ファイル名がテーマ名になる）
+        """
         self._current_theme: Theme = self.BUILTIN_THEMES["vscode_dark"]
+        self._current_name: str = "vscode_dark"
         self._custom_themes: Dict[str, Theme] = {}
+        
+        # ユーザーテーマ: 起動時は名前とパスの索引だけを作り、解析は選択時に行う
+        self.theme_dir = theme_dir
+        self._theme_files: Dict[str, Path] = {}
+        self._compiled: Dict[Path, Tuple[Tuple[int, int], Theme]] = {}
+        self.index_theme_dir()
+    
+    def index_theme_dir(self):
+        """テーマディレクトリのファイルを名前で索引付け（内容は解析しない）"""
+        self._theme_files = {}
+        if self.theme_dir is None or not self.theme_dir.is_dir():
+            return
+        
+        for path in sorted(self.theme_dir.iterdir()):
+            if path.suffix in self.THEME_FILE_SUFFIXES and not path.name.startswith("."):
+                self._theme_files.setdefault(path.stem, path)
     
     def get_theme(self, theme_name: str) -> Optional[Theme]:
         """
@@ -123,7 +153,104 @@ class ThemeManager:
         if theme_name in self.BUILTIN_THEMES:
             return self.BUILTIN_THEMES[theme_name]
         
-        return self._custom_themes.get(theme_name)
+        if theme_name in self._custom_themes:
+            return self._custom_themes[theme_name]
+        
+        path = self._theme_files.get(theme_name)
+        if path is not None:
+            return self._load_theme_file(path)
+        
+        return None
+    
+    def _load_theme_file(self, path: Path) -> Optional[Theme]:
+        """
+        テーマファイルを解析・検証（結果はmtimeごとにキャッシュ）
+        
+        Args:
+            path: テーマファイルのパス
+            
+        Returns:
+            テーマ（読み込めない場合はNone）
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            self._compiled.pop(path, None)
+            return None
+        
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._compiled.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            theme = self._theme_from_dict(path.stem, data)
+        except Exception as e:
+            print(f"テーマファイルの読み込みに失敗しました ({path.name}): {e}")
+            return None
+        
+        self._compiled[path] = (signature, theme)
+        return theme
+    
+    def _theme_from_dict(self, default_name: str, data: Dict) -> Theme:
+        """
+        辞書からテーマを作成
+        
+        Args:
+            default_name: name が無い場合の表示名
+            data: テーマの定義
+            
+        Returns:
+            テーマ
+            
+        Raises:
+            ValueError: 必須の色が無い、または色の形式が不正な場合
+        """
+        if not isinstance(data, dict):
+            raise ValueError("テーマの定義は辞書である必要があります")
+        
+        for key in self.REQUIRED_COLORS:
+            if not data.get(key):
+                raise ValueError(f"'{key}' が指定されていません")
+        
+        colors = {}
+        for f in fields(Theme):
+            if f.name == "name" or data.get(f.name) is None:
+                continue
+            value = str(data[f.name])
+            if not self._COLOR_PATTERN.match(value):
+                raise ValueError(f"'{f.name}' の色の形式が不正です: {value}")
+            colors[f.name] = value
+        
+        return complete_theme(Theme(name=str(data.get("name", default_name)), **colors))
+    
+    def refresh_theme_files(self, changed_paths: Iterable[Path]) -> bool:
+        """
+        テーマディレクトリの変更を反映
+        
+        Args:
+            changed_paths: 変更されたファイルのパス
+            
+        Returns:
+            現在のテーマが更新された場合True（呼び出し側で theme_changed を発行する）
+        """
+        changed_paths = set(changed_paths)
+        for path in changed_paths:
+            self._compiled.pop(path, None)
+        self.index_theme_dir()
+        
+        current_path = self._theme_files.get(self._current_name)
+        if current_path is None or current_path not in changed_paths:
+            return False
+        
+        theme = self._load_theme_file(current_path)
+        if theme is None:
+            return False
+        
+        self._current_theme = theme
+        return True
     
     def set_theme(self, theme_name: str) -> bool:
         """
@@ -140,6 +267,7 @@ class ThemeManager:
             return False
         
         self._current_theme = theme
+        self._current_name = theme_name
         return True
     
     @property
@@ -153,9 +281,31 @@ class ThemeManager:
         
         Args:
             theme_name: テーマ名
-            theme: テーマデータ
+            theme: テーマデータ（未指定のロールは自動で導出される）
         """
+        theme = complete_theme(theme)
         self._custom_themes[theme_name] = theme
+        if self._current_name == theme_name:
+            self._current_theme = theme
+    
+    def set_custom_colors(self, colors: Dict[str, str]) -> bool:
+        """
+        設定の theme.custom_colors から "custom" テーマを登録
+        
+        Args:
+            colors: bg, fg, accent（と任意のその他のロール）の色
+            
+        Returns:
+            登録できた場合True
+        """
+        try:
+            theme = self._theme_from_dict("Custom", {"name": "Custom", **(colors or {})})
+        except ValueError as e:
+            print(f"カスタムカラーが不正です: {e}")
+            return False
+        
+        self.add_custom_theme("custom", theme)
+        return True
     
     def remove_custom_theme(self, theme_name: str):
         """
@@ -176,7 +326,8 @@ class ThemeManager:
         """
         builtin = list(self.BUILTIN_THEMES.keys())
         custom = list(self._custom_themes.keys())
-        return builtin + custom
+        user = [name for name in self._theme_files if name not in self.BUILTIN_THEMES and name not in self._custom_themes]
+        return builtin + custom + user
     
     def create_theme_from_colors(
         self,
@@ -197,9 +348,9 @@ class ThemeManager:
             **kwargs: その他のオプション
             
         Returns:
-            作成されたテーマ
+            作成されたテーマ（未指定のロールはパレットエンジンで導出される）
         """
-        return Theme(
+        return complete_theme(Theme(
             name=name,
             bg=bg,
             fg=fg,
@@ -208,4 +359,4 @@ class ThemeManager:
             fg_secondary=kwargs.get("fg_secondary"),
             border=kwargs.get("border"),
             hover=kwargs.get("hover"),
-        )
+        ))
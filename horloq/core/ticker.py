@@ -0,0 +1,142 @@
+"""
+共有ティックソース
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class _Subscription:
+    """ティックの購読"""
+
+    callback: Callable[[float], None]
+    interval_ms: int
+    last_bucket: int = -1
+
+
+class Ticker:
+    """
+    複数の時計で共有するティックソース
+
+    購読者ごとの間隔（1秒、100ミリ秒など）の境界に合わせて、1つの after ループから
+    まとめて通知する。購読者がいない間はタイマーを止める。
+    """
+
+    def __init__(self, root=None):
+        """
+        初期化
+
+        Args:
+            root: Tkのルートウィンドウ（後から bind_root で設定可能）
+        """
+        self._root = root
+        self._subscriptions: Dict[int, _Subscription] = {}
+        self._next_token = 0
+        self._job: Optional[str] = None
+        # プラグインごとのCPU時間を集計する ResourceMonitor（HorloqApp が設定する）
+        self.monitor = None
+
+    @property
+    def root(self):
+        """タイマーに使うルートウィンドウ（未設定の場合はNone）"""
+        return self._root
+
+    def bind_root(self, root):
+        """
+        タイマーに使うルートウィンドウを設定
+
+        Args:
+            root: Tkのルートウィンドウ
+        """
+        self._root = root
+        self._schedule()
+
+    def subscribe(self, callback: Callable[[float], None], interval_ms: int = 1000) -> int:
+        """
+        ティックを購読
+
+        Args:
+            callback: 現在時刻（time.time()）を受け取るコールバック
+            interval_ms: 通知の間隔（ミリ秒）
+
+        Returns:
+            購読解除に使うトークン
+        """
+        self._next_token += 1
+        token = self._next_token
+        self._subscriptions[token] = _Subscription(callback, max(1, int(interval_ms)))
+        self._reschedule()
+        return token
+
+    def unsubscribe(self, token: Optional[int]):
+        """
+        購読を解除
+
+        Args:
+            token: subscribe が返したトークン
+        """
+        if self._subscriptions.pop(token, None) is not None and not self._subscriptions:
+            self._cancel()
+
+    def callbacks(self) -> List[Callable[[float], None]]:
+        """
+        購読中のコールバック
+
+        Returns:
+            コールバックのリスト（購読順）
+        """
+        return [sub.callback for sub in self._subscriptions.values()]
+
+    def _interval(self) -> int:
+        """最も短い購読間隔"""
+        return min(sub.interval_ms for sub in self._subscriptions.values())
+
+    def _reschedule(self):
+        """間隔が変わった可能性があるため、次のティックを予約し直す"""
+        self._cancel()
+        self._schedule()
+
+    def _schedule(self):
+        """次の間隔の境界にティックを予約"""
+        if self._job is not None or self._root is None or not self._subscriptions:
+            return
+        interval = self._interval()
+        now_ms = time.time() * 1000
+        delay = int(interval - now_ms % interval) + 1
+        try:
+            self._job = self._root.after(delay, self._tick)
+        except Exception:
+            self._job = None
+
+    def _cancel(self):
+        """予約中のティックを取り消す"""
+        if self._job is None:
+            return
+        try:
+            self._root.after_cancel(self._job)
+        except Exception:
+            pass
+        self._job = None
+
+    def _tick(self):
+        """間隔の境界を越えた購読者に通知"""
+        self._job = None
+        now = time.time()
+        now_ms = int(now * 1000)
+
+        for sub in list(self._subscriptions.values()):
+            bucket = now_ms // sub.interval_ms
+            if bucket == sub.last_bucket:
+                continue
+            sub.last_bucket = bucket
+            try:
+                if self.monitor is None:
+                    sub.callback(now)
+                else:
+                    self.monitor.call(sub.callback, now, wakeup=True)
+            except Exception as e:
+                print(f"ティックの処理でエラーが発生しました: {e}")
+
+        self._schedule()
@@ -0,0 +1,371 @@
+"""
+UIスレッドの停止の検出と原因の集計
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .events import EventManager
+from .ticker import Ticker
+
+
+# プラグインのモジュール名の接頭辞（PluginLoader が付ける）
+MODULE_PREFIX = "horloq_plugin_"
+
+# horloq パッケージのディレクトリ（本体のコードかどうかの判定に使う）
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 原因の種類
+KIND_PLUGIN = "plugin"
+KIND_LISTENER = "listener"
+KIND_CORE = "core"
+
+
+class MainThreadWatchdog:
+    """
+    Tk のメインループのハートビートを監視し、UIスレッドの停止を記録する
+
+    メインスレッドで after によるハートビートを刻み、監視スレッドがその遅れを調べる。
+    遅れがしきい値を超えている間は sys._current_frames() でメインスレッドのスタックを
+    採取し、停止が終わったときに最も多く採取された原因（プラグイン・イベントリスナー・
+    本体のコード）に停止時間を加算する。
+    """
+
+    REPORT_FILENAME = "stall_report.json"
+
+    # 直近の停止を残す件数
+    RECENT_LIMIT = 50
+    # コンソールにも表示する停止時間（ミリ秒）
+    LOG_THRESHOLD_MS = 1000
+    # 記録するスタックのフレーム数（内側から）
+    STACK_DEPTH = 8
+
+    def __init__(self, root=None, threshold_ms: int = 100):
+        """
+        初期化
+
+        Args:
+            root: Tkのルートウィンドウ（後から bind_root で設定可能）
+            threshold_ms: 停止とみなすハートビートの遅れ（ミリ秒）
+        """
+        self.root = root
+        self.threshold_ms = max(10, int(threshold_ms))
+        # しきい値程度の停止を見逃さないよう、ハートビートはしきい値の半分の間隔で刻む
+        self.heartbeat_ms = max(10, self.threshold_ms // 2)
+        self.started_at = time.time()
+
+        self._last_beat: Optional[float] = None
+        self._job: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._main_ident = threading.main_thread().ident
+
+        self._lock = threading.Lock()
+        # (種類, 名前) → {count, total_ms, max_ms, last_at, stack}
+        self._offenders: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=self.RECENT_LIMIT)
+        self._stalls = 0
+        self._blocked_ms = 0.0
+        # 停止中の場合の {since, kind, name}
+        self._current: Optional[Dict[str, Any]] = None
+
+    def bind_root(self, root):
+        """
+        Tkのルートウィンドウを設定
+
+        Args:
+            root: Tkのルートウィンドウ
+        """
+        self.root = root
+
+    # --- 開始と停止 ---
+
+    def start(self):
+        """
+        ハートビートと監視スレッドを開始
+
+        メインループの開始前に呼んでよい（最初のハートビートが届くまでは監視しない）。
+        """
+        if self.root is None or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._last_beat = None
+        self._job = self.root.after(0, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="horloq-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ハートビートと監視スレッドを停止"""
+        self._stop_event.set()
+        if self._job is not None and self.root is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _beat(self):
+        """ハートビート（メインスレッド）"""
+        self._last_beat = time.monotonic()
+        if not self._stop_event.is_set():
+            self._job = self.root.after(self.heartbeat_ms, self._beat)
+
+    # --- 監視 ---
+
+    def _watch(self):
+        """ハートビートの遅れを調べ、停止中はスタックを採取する（監視スレッド）"""
+        interval = self.heartbeat_ms / 1000
+        threshold = self.threshold_ms / 1000
+        poll = max(0.005, min(interval, threshold) / 4)
+
+        stall_beat: Optional[float] = None
+        samples: Counter = Counter()
+        stacks: Dict[Tuple[str, str], List[str]] = {}
+
+        while not self._stop_event.wait(poll):
+            beat = self._last_beat
+            if beat is None:
+                continue
+
+            if stall_beat is not None and beat != stall_beat:
+                # ハートビートが再開した（after の待ち時間を除いた分を停止時間とする）
+                blocked = (beat - stall_beat - interval) * 1000
+                self._record(blocked, samples, stacks)
+                stall_beat = None
+                samples = Counter()
+                stacks = {}
+                continue
+
+            if time.monotonic() - beat - interval < threshold:
+                continue
+
+            frame = sys._current_frames().get(self._main_ident)
+            if frame is None:
+                continue
+            culprit, stack = self.attribute(frame)
+            del frame
+            if stall_beat is None:
+                stall_beat = beat
+            samples[culprit] += 1
+            stacks.setdefault(culprit, stack)
+            with self._lock:
+                self._current = {
+                    "since": time.time() - (time.monotonic() - beat - interval),
+                    "kind": culprit[0],
+                    "name": culprit[1],
+                }
+
+    def _record(
+        self,
+        blocked_ms: float,
+        samples: Counter,
+        stacks: Dict[Tuple[str, str], List[str]],
+    ):
+        """停止1回分を最も多く採取された原因に加算"""
+        culprit = samples.most_common(1)[0][0]
+        blocked_ms = max(float(self.threshold_ms), blocked_ms)
+        now = time.time()
+
+        with self._lock:
+            self._current = None
+            self._stalls += 1
+            self._blocked_ms += blocked_ms
+            offender = self._offenders.setdefault(
+                culprit,
+                {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_at": 0.0, "stack": []},
+            )
+            offender["count"] += 1
+            offender["total_ms"] += blocked_ms
+            offender["last_at"] = now
+            if blocked_ms >= offender["max_ms"]:
+                offender["max_ms"] = blocked_ms
+                offender["stack"] = stacks.get(culprit, [])
+            self._recent.append({
+                "at": now,
+                "duration_ms": round(blocked_ms, 1),
+                "kind": culprit[0],
+                "name": culprit[1],
+            })
+
+        if blocked_ms >= self.LOG_THRESHOLD_MS:
+            print(f"UIスレッドが {blocked_ms:.0f}ms 停止しました: {culprit[1]}")
+
+    # --- 原因の判定 ---
+
+    @classmethod
+    def attribute(cls, frame) -> Tuple[Tuple[str, str], List[str]]:
+        """
+        スタックから停止の原因を判定
+
+        プラグインのモジュールのフレームがあればそのプラグイン、EventManager.deliver から
+        呼ばれたリスナーの中であればそのリスナー、それ以外は最も内側の本体のコードとする。
+
+        Args:
+            frame: メインスレッドの実行中のフレーム
+
+        Returns:
+            ((種類, 名前), 内側からのスタックの表示用の文字列のリスト)
+        """
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()  # 外側 → 内側
+
+        stack = [cls._describe(f) for f in reversed(frames[-cls.STACK_DEPTH:])]
+
+        for f in frames:
+            module = f.f_globals.get("__name__", "")
+            if isinstance(module, str) and module.startswith(MODULE_PREFIX):
+                return (KIND_PLUGIN, module[len(MODULE_PREFIX):].split(".", 1)[0]), stack
+
+        deliver_code = EventManager.deliver.__code__
+        for index in range(len(frames) - 1, -1, -1):
+            if frames[index].f_code is not deliver_code:
+                continue
+            callee = cls._callee(frames[index + 1:])
+            if callee is not None:
+                event_name = frames[index].f_locals.get("event_name", "?")
+                return (KIND_LISTENER, f"{event_name}: {cls._qualname(callee)}"), stack
+            break
+
+        tick_code = Ticker._tick.__code__
+        for index, f in enumerate(frames):
+            if f.f_code is tick_code:
+                callee = cls._callee(frames[index + 1:])
+                if callee is not None:
+                    return (KIND_LISTENER, f"tick: {cls._qualname(callee)}"), stack
+                break
+
+        for f in reversed(frames):
+            filename = os.path.abspath(f.f_code.co_filename)
+            if filename.startswith(_PACKAGE_DIR + os.sep) and not filename.endswith("watchdog.py"):
+                return (KIND_CORE, cls._qualname(f)), stack
+
+        # Python のコードがメインループ以外にない（Tk の描画・レイアウトなど）
+        innermost = frames[-1] if frames else None
+        if innermost is None or innermost.f_code.co_name == "mainloop":
+            return (KIND_CORE, "Tk（描画・レイアウト）"), stack
+        module = innermost.f_globals.get("__name__", "?")
+        return (KIND_CORE, f"{module}.{cls._qualname(innermost)}"), stack
+
+    @staticmethod
+    def _callee(frames: List[Any]):
+        """呼び出されたコールバックのフレーム（ResourceMonitor.call による計測を飛ばす）"""
+        for frame in frames:
+            code = frame.f_code
+            if code.co_name == "call" and os.path.basename(code.co_filename) == "accounting.py":
+                continue
+            return frame
+        return None
+
+    @staticmethod
+    def _qualname(frame) -> str:
+        """フレームの関数の修飾名"""
+        code = frame.f_code
+        return getattr(code, "co_qualname", code.co_name)
+
+    @classmethod
+    def _describe(cls, frame) -> str:
+        """フレームの表示用の文字列"""
+        filename = frame.f_code.co_filename
+        path = os.path.abspath(filename)
+        if path.startswith(_PACKAGE_DIR + os.sep):
+            filename = os.path.relpath(path, os.path.dirname(_PACKAGE_DIR))
+        else:
+            filename = os.path.basename(filename)
+        return f"{cls._qualname(frame)} ({filename}:{frame.f_lineno})"
+
+    # --- 集計 ---
+
+    def report(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        停止の集計
+
+        Args:
+            limit: 返す原因の件数（Noneの場合はすべて）
+
+        Returns:
+            {threshold_ms, started_at, stalls, blocked_ms, current, offenders, recent}。
+            offenders は停止時間の合計の多い順の
+            {kind, name, count, total_ms, max_ms, last_at, stack} のリスト
+        """
+        with self._lock:
+            offenders = [
+                {
+                    "kind": kind,
+                    "name": name,
+                    "count": data["count"],
+                    "total_ms": round(data["total_ms"], 1),
+                    "max_ms": round(data["max_ms"], 1),
+                    "last_at": data["last_at"],
+                    "stack": list(data["stack"]),
+                }
+                for (kind, name), data in self._offenders.items()
+            ]
+            offenders.sort(key=lambda o: -o["total_ms"])
+            return {
+                "threshold_ms": self.threshold_ms,
+                "started_at": self.started_at,
+                "stalls": self._stalls,
+                "blocked_ms": round(self._blocked_ms, 1),
+                "current": dict(self._current) if self._current else None,
+                "offenders": offenders if limit is None else offenders[:limit],
+                "recent": list(self._recent),
+            }
+
+    def reset(self):
+        """集計を破棄"""
+        with self._lock:
+            self._offenders.clear()
+            self._recent.clear()
+            self._stalls = 0
+            self._blocked_ms = 0.0
+            self.started_at = time.time()
+
+    # --- 書き出し ---
+
+    @staticmethod
+    def write_report(path: Path, report: Dict[str, Any]):
+        """
+        集計結果をJSONファイルに書き出す（CLI の stalls が読む）
+
+        Args:
+            path: 書き出し先
+            report: report() の戻り値
+        """
+        data = {"updated_at": time.time(), "pid": os.getpid(), **report}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"UIスレッドの停止の記録の書き出しに失敗しました: {e}")
+
+    @staticmethod
+    def read_report(path: Path) -> Optional[Dict[str, Any]]:
+        """
+        write_report() で書き出したファイルを読み込む
+
+        Args:
+            path: ファイルのパス
+
+        Returns:
+            書き出した内容（ない場合や壊れている場合はNone）
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
@@ -0,0 +1,246 @@
+"""
+ファイル変更監視
+"""
+
+import os
+import sys
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class FileWatcher:
+    """
+    ファイル・ディレクトリの変更監視
+
+    Linuxではinotifyを使用し、それ以外の環境（またはinotifyが使えない場合）は
+    mtimeポーリングにフォールバックする。エディタの保存時に発生する連続イベントは
+    debounce秒の間まとめてから1回だけコールバックに通知する。
+    """
+
+    # inotify定数（<sys/inotify.h>）
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        callback: Callable[[Set[Path]], None],
+        debounce: float = 0.3,
+        poll_interval: float = 1.0,
+    ):
+        """
+        初期化
+
+        Args:
+            paths: 監視するパス（ファイルの場合は親ディレクトリを監視して名前で絞り込む）
+            callback: 変更されたパスの集合を受け取るコールバック（監視スレッドから呼ばれる）
+            debounce: 連続した変更をまとめる待ち時間（秒）
+            poll_interval: ポーリング時の確認間隔（秒）
+        """
+        self.paths = [Path(p) for p in paths]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self._pending: Set[Path] = set()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify_fd: Optional[int] = None
+        self._wd_map: Dict[int, Tuple[Path, Optional[Set[str]]]] = {}
+        self.backend: Optional[str] = None
+
+    def start(self):
+        """監視を開始"""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        if sys.platform.startswith("linux") and self._init_inotify():
+            self.backend = "inotify"
+            target = self._inotify_loop
+        else:
+            self.backend = "polling"
+            target = self._polling_loop
+
+        self._thread = threading.Thread(target=target, name="horloq-file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """監視を停止"""
+        self._stop.set()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+        if self._inotify_fd is not None:
+            try:
+                os.close(self._inotify_fd)
+            except OSError:
+                pass
+            self._inotify_fd = None
+
+    def _notify(self, path: Path):
+        """変更を記録し、debounceタイマーを再設定"""
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self._pending.add(path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        """溜まった変更をコールバックに通知"""
+        with self._lock:
+            changed = self._pending
+            self._pending = set()
+            self._timer = None
+
+        if not changed or self._stop.is_set():
+            return
+
+        try:
+            self.callback(changed)
+        except Exception as e:
+            print(f"ファイル監視コールバックのエラー: {e}")
+
+    def _watch_targets(self) -> Dict[Path, Optional[Set[str]]]:
+        """
+        実際に監視するディレクトリと、その中で対象とする名前の集合を取得
+
+        Returns:
+            {ディレクトリ: 名前の集合（Noneの場合はディレクトリ内すべて）}
+        """
+        targets: Dict[Path, Optional[Set[str]]] = {}
+        for path in self.paths:
+            if path.is_dir():
+                targets[path] = None
+            else:
+                names = targets.setdefault(path.parent, set())
+                if names is not None:
+                    names.add(path.name)
+        return targets
+
+    # --- inotify ---
+
+    def _init_inotify(self) -> bool:
+        """inotifyを初期化（失敗時はFalse）"""
+        try:
+            import ctypes
+            import ctypes.util
+
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                return False
+
+            self._wd_map = {}
+            for directory, names in self._watch_targets().items():
+                if not directory.exists():
+                    continue
+                wd = libc.inotify_add_watch(fd, os.fsencode(str(directory)), self.WATCH_MASK)
+                if wd >= 0:
+                    self._wd_map[wd] = (directory, names)
+
+            if not self._wd_map:
+                os.close(fd)
+                return False
+
+            self._inotify_fd = fd
+            return True
+        except Exception as e:
+            print(f"inotifyの初期化に失敗しました（ポーリングに切り替えます）: {e}")
+            return False
+
+    def _inotify_loop(self):
+        """inotifyイベントを読み取るループ"""
+        fd = self._inotify_fd
+        header_size = self._EVENT_HEADER.size
+
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([fd], [], [], 0.5)
+            except (OSError, ValueError):
+                break
+            if not ready:
+                continue
+
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+
+            offset = 0
+            while offset + header_size <= len(data):
+                wd, _mask, _cookie, length = self._EVENT_HEADER.unpack_from(data, offset)
+                raw_name = data[offset + header_size:offset + header_size + length]
+                offset += header_size + length
+
+                target = self._wd_map.get(wd)
+                if target is None:
+                    continue
+                directory, names = target
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                if not name:
+                    continue
+                if names is not None and name not in names:
+                    continue
+                self._notify(directory / name)
+
+    # --- ポーリング ---
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """監視対象の (mtime_ns, size) を取得"""
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for directory, names in self._watch_targets().items():
+            if names is None:
+                try:
+                    entries: List[Path] = list(directory.iterdir())
+                except OSError:
+                    continue
+            else:
+                entries = [directory / name for name in names]
+
+            for entry in entries:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _polling_loop(self):
+        """mtimeを定期的に比較するループ"""
+        previous = self._snapshot()
+
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    self._notify(path)
+            previous = current
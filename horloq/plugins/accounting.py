@@ -0,0 +1,347 @@
+"""
+プラグインごとのリソース使用量の集計
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+
+# プラグインのモジュール名の接頭辞（PluginLoader が付ける）
+MODULE_PREFIX = "horloq_plugin_"
+
+# 直近の使用量を集計する期間（秒）
+WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class _Usage:
+    """プラグイン1件分の集計"""
+
+    cpu_seconds: float = 0.0
+    calls: int = 0
+    # 直近の呼び出し（時刻, CPU時間, ウェイクアップかどうか）
+    recent: Deque[Tuple[float, float, bool]] = field(default_factory=deque)
+    # 予約中の after のID
+    jobs: Set[str] = field(default_factory=set)
+
+
+class ResourceMonitor:
+    """
+    プラグインごとのCPU時間・メモリ・タイマー・リスナー・スレッドの集計
+
+    コールバックの持ち主はコールバックが定義されたモジュール名（horloq_plugin_<名前>）で
+    判定する。EventManager・Ticker のコールバックと Tk の after で予約した関数を
+    call() 経由で呼び、呼び出し中のCPU時間（スレッドのCPU時間）をプラグインに加算する。
+    入れ子の呼び出しは内側のプラグインの分を外側から差し引く。
+    """
+
+    STATS_FILENAME = "plugin_stats.json"
+
+    def __init__(self, index=None):
+        """
+        初期化
+
+        Args:
+            index: PluginIndex（メモリの集計でプラグインのファイルの場所を調べる）
+        """
+        self.index = index
+        self.started_at = time.time()
+
+        self._usage: Dict[str, _Usage] = {}
+        self._lock = threading.Lock()
+        # スレッドごとの呼び出し中のスタック [持ち主, 開始時のCPU時間, 内側の呼び出しのCPU時間]
+        self._local = threading.local()
+        # after のID → 持ち主
+        self._jobs: Dict[str, str] = {}
+        self._tk_originals: Optional[Dict[str, Callable]] = None
+
+    # --- 持ち主の判定 ---
+
+    @staticmethod
+    def owner_of(callback: Any) -> Optional[str]:
+        """
+        コールバックを定義したプラグインの名前
+
+        Args:
+            callback: 関数・メソッド・functools.partial など
+
+        Returns:
+            プラグイン名（プラグインのものでない場合はNone）
+        """
+        while isinstance(callback, functools.partial):
+            callback = callback.func
+        owner = getattr(callback, "__self__", None)
+        func = getattr(callback, "__func__", callback)
+        for candidate in (func, owner, type(owner) if owner is not None else None):
+            module = getattr(candidate, "__module__", None)
+            if isinstance(module, str) and module.startswith(MODULE_PREFIX):
+                return module[len(MODULE_PREFIX):].split(".", 1)[0]
+        return None
+
+    # --- 計測 ---
+
+    def call(self, callback: Callable, *args, owner: Optional[str] = None, wakeup: bool = False):
+        """
+        コールバックを呼び出し、プラグインのものならCPU時間を集計する
+
+        Args:
+            callback: 呼び出す関数
+            *args: 引数
+            owner: 持ち主のプラグイン名（Noneの場合はコールバックから判定）
+            wakeup: タイマーによる呼び出しの場合True
+
+        Returns:
+            コールバックの戻り値
+        """
+        if owner is None:
+            owner = self.owner_of(callback)
+        if owner is None:
+            return callback(*args)
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [owner, time.thread_time(), 0.0]
+        stack.append(frame)
+        try:
+            return callback(*args)
+        finally:
+            stack.pop()
+            elapsed = time.thread_time() - frame[1]
+            if stack:
+                stack[-1][2] += elapsed
+            self._record(owner, max(0.0, elapsed - frame[2]), wakeup)
+
+    def _record(self, owner: str, cpu: float, wakeup: bool):
+        """呼び出し1回分を記録"""
+        now = time.monotonic()
+        with self._lock:
+            usage = self._usage.setdefault(owner, _Usage())
+            usage.cpu_seconds += cpu
+            usage.calls += 1
+            usage.recent.append((now, cpu, wakeup))
+            self._trim(usage, now)
+
+    @staticmethod
+    def _trim(usage: _Usage, now: float):
+        """集計期間より古い呼び出しを捨てる"""
+        while usage.recent and now - usage.recent[0][0] > WINDOW_SECONDS:
+            usage.recent.popleft()
+
+    # --- Tk の after ---
+
+    def install_tk_hooks(self):
+        """
+        tkinter の after / after_cancel を差し替え、プラグインが予約した関数を集計する
+
+        プラグインは自分のウィジェットの after を直接呼ぶため、Misc のメソッドを差し替える。
+        プラグインのものでない関数はそのまま元のメソッドに渡す。
+        """
+        if self._tk_originals is not None:
+            return
+        import tkinter
+
+        original_after = tkinter.Misc.after
+        original_cancel = tkinter.Misc.after_cancel
+        self._tk_originals = {"after": original_after, "after_cancel": original_cancel}
+        monitor = self
+
+        def after(widget, ms, func=None, *args):
+            owner = monitor.owner_of(func) if func is not None else None
+            if owner is None:
+                return original_after(widget, ms, func, *args)
+
+            job: Dict[str, Optional[str]] = {"id": None}
+
+            def callit(*call_args):
+                monitor._job_done(owner, job["id"])
+                return monitor.call(func, *call_args, owner=owner, wakeup=True)
+
+            callit.__name__ = getattr(func, "__name__", "callit")
+            job["id"] = original_after(widget, ms, callit, *args)
+            monitor._job_added(owner, job["id"])
+            return job["id"]
+
+        def after_cancel(widget, job_id):
+            monitor._job_done(None, job_id)
+            return original_cancel(widget, job_id)
+
+        tkinter.Misc.after = after
+        tkinter.Misc.after_cancel = after_cancel
+
+    def uninstall_tk_hooks(self):
+        """install_tk_hooks() の差し替えを元に戻す"""
+        if self._tk_originals is None:
+            return
+        import tkinter
+
+        tkinter.Misc.after = self._tk_originals["after"]
+        tkinter.Misc.after_cancel = self._tk_originals["after_cancel"]
+        self._tk_originals = None
+
+    def _job_added(self, owner: str, job_id: Optional[str]):
+        """予約中の after を記録"""
+        if job_id is None:
+            return
+        with self._lock:
+            self._jobs[job_id] = owner
+            self._usage.setdefault(owner, _Usage()).jobs.add(job_id)
+
+    def _job_done(self, owner: Optional[str], job_id: Optional[str]):
+        """実行・取り消しされた after を記録から外す"""
+        if job_id is None:
+            return
+        with self._lock:
+            owner = self._jobs.pop(job_id, owner)
+            usage = self._usage.get(owner) if owner else None
+            if usage is not None:
+                usage.jobs.discard(job_id)
+
+    # --- 集計 ---
+
+    def forget(self, plugin_name: str):
+        """
+        プラグインの集計を破棄（アンロード時）
+
+        Args:
+            plugin_name: プラグイン名
+        """
+        with self._lock:
+            usage = self._usage.pop(plugin_name, None)
+            if usage is not None:
+                for job_id in usage.jobs:
+                    self._jobs.pop(job_id, None)
+
+    def stats(
+        self,
+        plugin_names: List[str],
+        events=None,
+        ticker=None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        プラグインごとの使用量
+
+        Args:
+            plugin_names: 集計するプラグイン名のリスト
+            events: EventManager（リスナー数の集計に使う）
+            ticker: Ticker（購読数の集計に使う）
+
+        Returns:
+            プラグイン名 → {cpu_ms, cpu_percent, calls, memory_bytes, after_jobs,
+            wakeups_per_min, listeners, threads}
+        """
+        now = time.monotonic()
+        window = min(WINDOW_SECONDS, max(1.0, time.time() - self.started_at))
+        listeners = self._count_listeners(events, ticker)
+        threads = self._count_threads()
+        memory = self._measure_memory(plugin_names)
+
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for name in plugin_names:
+                usage = self._usage.get(name) or _Usage()
+                self._trim(usage, now)
+                recent_cpu = sum(cpu for _t, cpu, _w in usage.recent)
+                result[name] = {
+                    "cpu_ms": round(usage.cpu_seconds * 1000, 3),
+                    "cpu_percent": round(recent_cpu / window * 100, 3),
+                    "calls": usage.calls,
+                    "memory_bytes": memory.get(name),
+                    "after_jobs": len(usage.jobs),
+                    "wakeups_per_min": sum(1 for _t, _c, wakeup in usage.recent if wakeup),
+                    "listeners": listeners.get(name, 0),
+                    "threads": threads.get(name, 0),
+                }
+        return result
+
+    def _count_listeners(self, events, ticker) -> Dict[str, int]:
+        """イベントリスナーとティックの購読の数"""
+        counts: Dict[str, int] = {}
+        callbacks: List[Any] = []
+        if events is not None:
+            for event_name in events.list_events():
+                callbacks.extend(events.listeners(event_name))
+        if ticker is not None:
+            callbacks.extend(ticker.callbacks())
+        for callback in callbacks:
+            owner = self.owner_of(callback)
+            if owner is not None:
+                counts[owner] = counts.get(owner, 0) + 1
+        return counts
+
+    def _count_threads(self) -> Dict[str, int]:
+        """動作中のスレッドの数（スレッドの target またはクラスの定義元で判定）"""
+        counts: Dict[str, int] = {}
+        for thread in threading.enumerate():
+            owner = self.owner_of(getattr(thread, "_target", None)) or self.owner_of(thread.run)
+            if owner is not None:
+                counts[owner] = counts.get(owner, 0) + 1
+        return counts
+
+    def _measure_memory(self, plugin_names: List[str]) -> Dict[str, int]:
+        """
+        プラグインのファイルで確保されたメモリ（tracemalloc が動作中の場合のみ）
+
+        Returns:
+            プラグイン名 → バイト数
+        """
+        if not tracemalloc.is_tracing() or self.index is None:
+            return {}
+
+        snapshot = tracemalloc.take_snapshot()
+        memory: Dict[str, int] = {}
+        for name in plugin_names:
+            entry = self.index.get(name)
+            if entry is None:
+                continue
+            pattern = entry.path if entry.kind == "module" else os.path.join(entry.path, "*")
+            filtered = snapshot.filter_traces([tracemalloc.Filter(True, pattern)])
+            memory[name] = sum(stat.size for stat in filtered.statistics("filename"))
+        return memory
+
+    # --- 書き出し ---
+
+    @staticmethod
+    def write_stats(path: Path, stats: Dict[str, Dict[str, Any]]):
+        """
+        集計結果をJSONファイルに書き出す（CLI の plugin stats が読む）
+
+        Args:
+            path: 書き出し先
+            stats: stats() の戻り値
+        """
+        data = {"updated_at": time.time(), "pid": os.getpid(), "plugins": stats}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"プラグインの使用量の書き出しに失敗しました: {e}")
+
+    @staticmethod
+    def read_stats(path: Path) -> Optional[Dict[str, Any]]:
+        """
+        write_stats() で書き出したファイルを読み込む
+
+        Args:
+            path: ファイルのパス
+
+        Returns:
+            {updated_at, pid, plugins}（ない場合や壊れている場合はNone）
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
@@ -0,0 +1,291 @@
+"""
+プラグインの起動トリガー（activation）
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+# plugin.yaml の activation を省略した場合の起動トリガー
+DEFAULT_TRIGGERS = ["onStartup"]
+
+TRIGGER_KINDS = ("onStartup", "onEvent", "onTime", "onWidgetVisible", "onCommand")
+
+# onCommand のトリガーを発火させるイベント（data は {"plugin_id": プラグイン名}）
+COMMAND_EVENT = "plugin_command"
+
+
+@dataclass(frozen=True)
+class ActivationTrigger:
+    """起動トリガー1件（"onEvent:theme_changed" など）"""
+
+    kind: str
+    argument: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.argument}" if self.argument else self.kind
+
+
+def parse_triggers(metadata: Optional[Dict[str, Any]]) -> List[ActivationTrigger]:
+    """
+    plugin.yaml の activation を解析
+
+    Args:
+        metadata: plugin.yaml の内容
+
+    Returns:
+        起動トリガーのリスト（不正なものは無視し、何も残らなければ onStartup）
+    """
+    raw = (metadata or {}).get("activation", DEFAULT_TRIGGERS)
+    if isinstance(raw, str):
+        raw = [raw]
+    if not isinstance(raw, list):
+        raw = DEFAULT_TRIGGERS
+
+    triggers: List[ActivationTrigger] = []
+    for item in raw:
+        kind, _, argument = str(item).partition(":")
+        kind = kind.strip()
+        argument = argument.strip() or None
+        if kind not in TRIGGER_KINDS:
+            print(f"不明な起動トリガーを無視します: {item}")
+            continue
+        if kind in ("onEvent", "onTime") and argument is None:
+            print(f"起動トリガーに引数がありません: {item}")
+            continue
+        if kind == "onTime":
+            try:
+                CronSchedule(argument)
+            except ValueError as e:
+                print(f"起動トリガーの時刻指定が不正です ({item}): {e}")
+                continue
+        triggers.append(ActivationTrigger(kind, argument))
+
+    return triggers or [ActivationTrigger("onStartup")]
+
+
+class CronSchedule:
+    """
+    cron形式（分 時 日 月 曜日）の時刻指定
+
+    各フィールドは * / 数値 / 範囲（1-5）/ リスト（0,30）/ 間隔（*/15）に対応する。
+    曜日は 0 と 7 が日曜日。
+    """
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        """
+        初期化
+
+        Args:
+            expression: cron形式の文字列（例: "0 7 * * 1-5"）
+
+        Raises:
+            ValueError: 形式が不正な場合
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("分 時 日 月 曜日 の5つのフィールドが必要です")
+        self.expression = expression
+        self._fields = [
+            self._parse_field(value, low, high)
+            for value, (low, high) in zip(fields, self._RANGES)
+        ]
+        # 日曜日は 0 と 7 のどちらでも指定できる
+        if 7 in self._fields[4]:
+            self._fields[4].add(0)
+
+    @staticmethod
+    def _parse_field(value: str, low: int, high: int) -> Set[int]:
+        """フィールド1つを値の集合に変換"""
+        result: Set[int] = set()
+        for part in value.split(","):
+            base, _, step_text = part.partition("/")
+            step = int(step_text) if step_text else 1
+            if step < 1:
+                raise ValueError(f"間隔が不正です: {part}")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start_text, end_text = base.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(base)
+                end = high if step_text else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"範囲外の値です: {part}")
+            result.update(range(start, end + 1, step))
+        return result
+
+    def matches(self, moment: datetime) -> bool:
+        """
+        指定時刻（分単位）が条件に一致するか
+
+        Args:
+            moment: 判定する時刻
+
+        Returns:
+            一致する場合True
+        """
+        minutes, hours, days, months, weekdays = self._fields
+        weekday = (moment.weekday() + 1) % 7  # 日曜日を0にする
+        return (
+            moment.minute in minutes
+            and moment.hour in hours
+            and moment.day in days
+            and moment.month in months
+            and weekday in weekdays
+        )
+
+
+@dataclass
+class PluginStub:
+    """
+    起動トリガーを待っているプラグイン
+
+    モジュールは読み込まず、plugin.yaml の内容だけを持つ。起動後は plugin に
+    インスタンスが入る（ウィジェットのスロットを作り直さないために同じスタブを使い続ける）。
+    """
+
+    name: str
+    metadata: Dict[str, Any]
+    triggers: List[ActivationTrigger]
+    plugin: Optional[Any] = None
+    # 起動時に発火したトリガー
+    fired: Optional[ActivationTrigger] = None
+
+    @property
+    def activated(self) -> bool:
+        """起動済みかどうか"""
+        return self.plugin is not None
+
+    def has_trigger(self, kind: str) -> bool:
+        """
+        指定した種類のトリガーを持つか
+
+        Args:
+            kind: トリガーの種類（onWidgetVisible など）
+
+        Returns:
+            持っている場合True
+        """
+        return any(trigger.kind == kind for trigger in self.triggers)
+
+    def describe(self) -> str:
+        """プレースホルダーに表示する起動条件の説明"""
+        parts = []
+        for trigger in self.triggers:
+            if trigger.kind == "onTime":
+                parts.append(f"時刻 {trigger.argument}")
+            elif trigger.kind == "onEvent":
+                parts.append(f"イベント {trigger.argument}")
+        return "、".join(parts)
+
+
+class ActivationWatcher:
+    """
+    スタブの起動トリガーを監視し、発火したら on_fire を呼ぶ
+
+    onEvent はイベントリスナー、onTime は共有Tickerの1分ごとの通知、onCommand は
+    COMMAND_EVENT で監視する。onWidgetVisible はウィジェットのスロットが表示範囲に
+    入ったときにアプリ側から発火させる。
+    """
+
+    def __init__(
+        self,
+        events,
+        ticker,
+        on_fire: Callable[[str, ActivationTrigger, Any], None],
+    ):
+        """
+        初期化
+
+        Args:
+            events: EventManager
+            ticker: 共有のTicker（onTime に使う）
+            on_fire: (プラグイン名, 発火したトリガー, イベント) で呼ばれる
+        """
+        self.events = events
+        self.ticker = ticker
+        self.on_fire = on_fire
+
+        self._stubs: Dict[str, PluginStub] = {}
+        # プラグイン名 → [(イベント名, リスナー)]
+        self._listeners: Dict[str, List[tuple]] = {}
+        self._schedules: Dict[str, List[tuple]] = {}
+        self._tick_token: Optional[int] = None
+        self._last_minute: Optional[datetime] = None
+
+        if self.events is not None:
+            self.events.on(COMMAND_EVENT, self._on_command)
+
+    def watch(self, stub: PluginStub):
+        """
+        スタブのトリガーの監視を開始
+
+        Args:
+            stub: 起動を待つプラグインのスタブ
+        """
+        self.unwatch(stub.name)
+        self._stubs[stub.name] = stub
+
+        for trigger in stub.triggers:
+            if trigger.kind == "onEvent" and self.events is not None:
+                listener = self._make_listener(stub.name, trigger)
+                self.events.on(trigger.argument, listener)
+                self._listeners.setdefault(stub.name, []).append((trigger.argument, listener))
+            elif trigger.kind == "onTime":
+                schedule = CronSchedule(trigger.argument)
+                self._schedules.setdefault(stub.name, []).append((trigger, schedule))
+
+        if self._schedules and self._tick_token is None and self.ticker is not None:
+            self._tick_token = self.ticker.subscribe(self._on_tick, 60 * 1000)
+
+    def unwatch(self, name: str):
+        """
+        スタブのトリガーの監視を終了
+
+        Args:
+            name: プラグイン名
+        """
+        self._stubs.pop(name, None)
+        for event_name, listener in self._listeners.pop(name, []):
+            self.events.off(event_name, listener)
+        self._schedules.pop(name, None)
+
+        if not self._schedules and self._tick_token is not None:
+            self.ticker.unsubscribe(self._tick_token)
+            self._tick_token = None
+
+    def clear(self):
+        """すべての監視を終了"""
+        for name in list(self._stubs):
+            self.unwatch(name)
+
+    def _make_listener(self, name: str, trigger: ActivationTrigger) -> Callable:
+        """onEvent のリスナーを作成"""
+        def listener(event):
+            self.on_fire(name, trigger, event)
+        return listener
+
+    def _on_command(self, event):
+        """COMMAND_EVENT で onCommand を持つスタブを起動"""
+        name = (event.data or {}).get("plugin_id")
+        stub = self._stubs.get(name)
+        if stub is not None and stub.has_trigger("onCommand"):
+            self.on_fire(name, ActivationTrigger("onCommand"), event)
+
+    def _on_tick(self, now: float):
+        """1分ごとに onTime の時刻指定を確認"""
+        moment = datetime.fromtimestamp(now).replace(second=0, microsecond=0)
+        if moment == self._last_minute:
+            return
+        self._last_minute = moment
+
+        for name, schedules in list(self._schedules.items()):
+            for trigger, schedule in schedules:
+                if schedule.matches(moment):
+                    self.on_fire(name, trigger, None)
+                    break
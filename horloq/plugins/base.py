@@ -2,8 +2,10 @@
 プラグインベースクラス
 """
 
+import importlib.resources
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
 from pathlib import Path
 import customtkinter as ctk
 import yaml
@@ -12,6 +14,22 @@ import yaml
 class PluginBase(ABC):
     """プラグインの基底クラス"""
     
+    # ウィジェットを破棄して作り直しても状態を失わない場合True
+    # （スクロールで表示範囲から大きく外れたときにウィジェットが破棄される）
+    rebuildable = False
+    
+    # 追加の時計ウィンドウにもウィジェットを表示できる場合True
+    # （create_widget がウィンドウごとに呼ばれるため、呼ばれるたびに新しいウィジェットを返し、
+    #   状態の変化を作成したすべてのウィジェットに反映すること）
+    multi_window = False
+    
+    # plugin.yaml の内容（読み込み時にローダーがインデックスから設定する）
+    plugin_metadata: Optional[Dict[str, Any]] = None
+    
+    # プラグインのディレクトリ名（読み込み時にローダーが設定する）。
+    # 設定・状態のストアのキーに使う（plugin.yaml の name とは異なる場合がある）
+    plugin_id: Optional[str] = None
+    
     def __init__(
         self, 
         app_context: Dict[str, Any],
@@ -28,23 +46,33 @@ class PluginBase(ABC):
                 - config: ConfigManager
                 - events: EventManager
                 - themes: ThemeManager
+                - plugin_store: PluginConfigStore
+                - styles: StyleRegistry
+                - scheduler: Scheduler
             name: プラグイン名（省略可：plugin.yamlから自動読み込み）
             version: バージョン（省略可：plugin.yamlから自動読み込み）
             author: 作者（省略可：plugin.yamlから自動読み込み）
             description: 説明（省略可：plugin.yamlから自動読み込み）
         """
-        # plugin.yamlからメタデータを読み込む（ハードコーディングよりも優先）
-        metadata = self._load_plugin_metadata()
+        # plugin.yamlのメタデータを使う（ハードコーディングよりも優先）
+        metadata = type(self).plugin_metadata
+        if metadata is None:
+            metadata = self._load_plugin_metadata()
         
         self.name = metadata.get('name', name)
         self.version = metadata.get('version', version)
         self.author = metadata.get('author', author)
         self.description = metadata.get('description', description)
+        # ローダーを経由せずにインスタンス化された場合は name を使う
+        self.plugin_id = type(self).plugin_id or self.name
         
         self.app_context = app_context
         self.config = app_context.get("config")
         self.events = app_context.get("events")
         self.themes = app_context.get("themes")
+        self.store = app_context.get("plugin_store")
+        self.styles = app_context.get("styles")
+        self.scheduler = app_context.get("scheduler")
         
         self._widget: Optional[ctk.CTkFrame] = None
         self._enabled = False
@@ -53,6 +81,8 @@ class PluginBase(ABC):
         """
         plugin.yamlからメタデータを読み込む
         
+        ローダーを経由せずにインスタンス化された場合のフォールバック。
+        
         Returns:
             メタデータの辞書
         """
@@ -74,6 +104,18 @@ class PluginBase(ABC):
         
         return {}
     
+    def resources(self):
+        """
+        プラグインに同梱したファイルのルートを取得
+        
+        パッケージファイル形式（.hpz）でインストールされた場合も展開せずに読めるため、
+        画像などのファイルは __file__ からのパスではなくこれを使って読み込む。
+        
+        Returns:
+            importlib.resources の Traversable（例: self.resources().joinpath("icon.png").read_bytes()）
+        """
+        return importlib.resources.files(type(self).__module__.split(".")[0])
+    
     @abstractmethod
     def initialize(self) -> bool:
         """
@@ -101,6 +143,95 @@ class PluginBase(ABC):
         """
         return None
     
+    def describe_widget(self) -> Optional[Dict[str, Any]]:
+        """
+        ウィジェットの記述ツリーを返す（別プロセスで動かす場合に create_widget の代わりに使う）
+        
+        ノードは {"type": "frame" | "label" | "button" | "progress", "key": ..., "children": [...]}
+        とプロパティ（text, font, text_color, command, value, direction など）の辞書。
+        前回との差分だけが本体に送られて描画される。
+        
+        Returns:
+            記述ツリー（ウィジェットがない場合はNone）
+        """
+        return None
+    
+    def handle_command(self, command: str, value: Any = None):
+        """
+        記述ツリーのボタンなどが操作されたときの処理
+        
+        Args:
+            command: ノードの command
+            value: 値
+        """
+        pass
+    
+    def schedule_periodic(self, interval: float, fn: Callable[[], Any], align: bool = True) -> Optional[int]:
+        """
+        定期処理を予約（widget.after のループの代わりに使う）
+        
+        本体がほかの処理とまとめて実行し、CPU時間が予算を超えた場合は間隔を延ばす。
+        予約はプラグインの終了時に自動で取り消される。
+        
+        Args:
+            interval: 間隔（秒）
+            fn: 引数なしで呼ばれる関数
+            align: 時計の間隔の境界（毎秒0ミリ秒、毎分0秒など）に揃える場合True
+            
+        Returns:
+            cancel_scheduled に渡すID（スケジューラーがない場合はNone）
+        """
+        if self.scheduler is None:
+            print(f"スケジューラーがないため定期処理を予約できません ({self.name})")
+            return None
+        return self.scheduler.schedule_periodic(self, interval, fn, align)
+    
+    def schedule_at(self, when: Union[datetime, float], fn: Callable[[], Any]) -> Optional[int]:
+        """
+        指定した時刻に1回だけ実行する処理を予約
+        
+        Args:
+            when: 実行する時刻（datetime または time.time() の値）
+            fn: 引数なしで呼ばれる関数
+            
+        Returns:
+            cancel_scheduled に渡すID（スケジューラーがない場合はNone）
+        """
+        if self.scheduler is None:
+            print(f"スケジューラーがないため処理を予約できません ({self.name})")
+            return None
+        return self.scheduler.schedule_at(self, when, fn)
+    
+    def run_in_background(
+        self,
+        fn: Callable[[], Any],
+        on_done: Optional[Callable[[Any, Optional[Exception]], None]] = None,
+    ) -> Optional[int]:
+        """
+        ネットワーク通信などの時間のかかる処理をスレッドで実行
+        
+        Args:
+            fn: スレッドで実行する引数なしの関数（ウィジェットには触れないこと）
+            on_done: UIスレッドで (戻り値, 例外) を受け取る関数（成功時の例外はNone）
+            
+        Returns:
+            cancel_scheduled に渡すID（スケジューラーがない場合はNone）
+        """
+        if self.scheduler is None:
+            print(f"スケジューラーがないためバックグラウンド処理を実行できません ({self.name})")
+            return None
+        return self.scheduler.run_in_background(self, fn, on_done)
+    
+    def cancel_scheduled(self, job_id: Optional[int]):
+        """
+        schedule_periodic・schedule_at・run_in_background の予約を取り消す
+        
+        Args:
+            job_id: 予約したときのID
+        """
+        if self.scheduler is not None and job_id is not None:
+            self.scheduler.cancel(job_id)
+    
     def get_config(self, key: str, default: Any = None) -> Any:
         """
         プラグイン設定を取得
@@ -112,7 +243,10 @@ class PluginBase(ABC):
         Returns:
             設定値
         """
-        plugin_config = self.config.get(f"plugins.configs.{self.name}", {})
+        if self.store is not None:
+            return self.store.get(self.plugin_id, key, default)
+        
+        plugin_config = self.config.get(f"plugins.configs.{self.plugin_id}", {})
         return plugin_config.get(key, default)
     
     def set_config(self, key: str, value: Any):
@@ -123,14 +257,44 @@ class PluginBase(ABC):
             key: 設定キー
             value: 設定値
         """
+        if self.store is not None:
+            self.store.set(self.plugin_id, key, value)
+            return
+        
         plugin_configs = self.config.get("plugins.configs", {})
-        if self.name not in plugin_configs:
-            plugin_configs[self.name] = {}
+        if self.plugin_id not in plugin_configs:
+            plugin_configs[self.plugin_id] = {}
         
-        plugin_configs[self.name][key] = value
+        plugin_configs[self.plugin_id][key] = value
         self.config.set("plugins.configs", plugin_configs)
         self.config.save()
     
+    def get_state(self, key: str, default: Any = None) -> Any:
+        """
+        プラグインの状態を取得（設定とは別に保存される実行時データ）
+        
+        Args:
+            key: キー
+            default: デフォルト値
+            
+        Returns:
+            値
+        """
+        if self.store is None:
+            return default
+        return self.store.get(self.plugin_id, key, default, section="state")
+    
+    def set_state(self, key: str, value: Any):
+        """
+        プラグインの状態を保存
+        
+        Args:
+            key: キー
+            value: 値
+        """
+        if self.store is not None:
+            self.store.set(self.plugin_id, key, value, section="state")
+    
     @property
     def enabled(self) -> bool:
         """プラグインが有効かどうか"""
@@ -148,3 +312,24 @@ class PluginBase(ABC):
     def on_disable(self):
         """プラグインが無効化されたときの処理"""
         pass
+    
+    def snapshot(self) -> Any:
+        """
+        ホットリロードの前に引き継ぐ状態を書き出す
+        
+        戻り値はJSONに変換できる値にする（古いモジュールのクラスのインスタンスなどは
+        新しいコードに渡せないため）。
+        
+        Returns:
+            引き継ぐ状態（引き継ぐものがない場合はNone）
+        """
+        return None
+    
+    def restore(self, state: Any):
+        """
+        ホットリロードの後に状態を受け取る（initialize の後、on_enable の前に呼ばれる）
+        
+        Args:
+            state: 古いインスタンスの snapshot() が返した値
+        """
+        pass
@@ -0,0 +1,244 @@
+"""
+プラグインのバイトコードキャッシュ
+"""
+
+import _imp
+import hashlib
+import importlib.machinery
+import importlib.util
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class BytecodeCache:
+    """
+    Horloqが管理するプラグインのバイトコードキャッシュ
+
+    ソースのSHA-256とインタープリタ（cache_tag とマジックナンバー）をキーに
+    コンパイル済みのコードを保存する（ファイル名は読み込み時に書き換える）。プラグインのディレクトリには書き込まないため、
+    読み取り専用の場所やビルド版（sys.frozen）でも同じように動く。
+    """
+
+    DIRNAME = "bytecode"
+
+    def __init__(self, cache_dir: Path):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュディレクトリ（インタープリタごとのサブディレクトリを作る）
+        """
+        self.cache_dir = Path(cache_dir)
+        tag = sys.implementation.cache_tag or "python"
+        self.tag_dir = self.cache_dir / tag
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_source(data: bytes) -> str:
+        """ソースのSHA-256"""
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, source_hash: str) -> Path:
+        """
+        キャッシュファイルのパス
+
+        Args:
+            source_hash: ソースのSHA-256
+
+        Returns:
+            キャッシュファイルのパス
+        """
+        return self.tag_dir / source_hash[:2] / f"{source_hash}.pyc"
+
+    def get_code(self, source_path: Path, data: bytes):
+        """
+        ソースに対応するコードを取得（キャッシュになければコンパイルして保存）
+
+        Args:
+            source_path: ソースファイルのパス（トレースバックに表示される）
+            data: ソースの内容
+
+        Returns:
+            コードオブジェクト
+        """
+        source_hash = self.hash_source(data)
+        code = self._read(source_hash)
+        if code is not None:
+            self.hits += 1
+            # 同じ内容の別のファイル（空の __init__.py など）とキャッシュを共有するため、
+            # importlib と同じくファイル名を読み込み元のパスに書き換える
+            _imp._fix_co_filename(code, str(source_path))
+            return code
+
+        self.misses += 1
+        code = compile(data, str(source_path), "exec", dont_inherit=True)
+        self._write(source_hash, code)
+        return code
+
+    def compile_file(self, source_path: Path) -> Optional[str]:
+        """
+        ソースファイルをコンパイルしてキャッシュに保存
+
+        Args:
+            source_path: ソースファイルのパス
+
+        Returns:
+            ソースのハッシュ（コンパイルに失敗した場合はNone）
+        """
+        try:
+            data = Path(source_path).read_bytes()
+            source_hash = self.hash_source(data)
+            if not self.path_for(source_hash).exists():
+                code = compile(data, str(source_path), "exec", dont_inherit=True)
+                self._write(source_hash, code)
+            return source_hash
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"バイトコードのコンパイルに失敗しました ({source_path}): {e}")
+            return None
+
+    def compile_plugin(self, plugin_path: Path) -> int:
+        """
+        プラグインのすべての .py ファイルをコンパイル
+
+        Args:
+            plugin_path: プラグインのディレクトリ（または単一ファイル）
+
+        Returns:
+            コンパイルしたファイル数
+        """
+        plugin_path = Path(plugin_path)
+        if plugin_path.is_file():
+            files = [plugin_path]
+        else:
+            files = [
+                path for path in sorted(plugin_path.rglob("*.py"))
+                if "__pycache__" not in path.parts
+            ]
+        return sum(1 for path in files if self.compile_file(path) is not None)
+
+    def prune(self, keep_hashes: Iterable[str]) -> int:
+        """
+        使われなくなったキャッシュを削除（現在のインタープリタの分のみ）
+
+        Args:
+            keep_hashes: 残すソースのハッシュ
+
+        Returns:
+            削除したファイル数
+        """
+        keep = set(keep_hashes)
+        removed = 0
+        if not self.tag_dir.exists():
+            return 0
+        for path in self.tag_dir.glob("*/*.pyc"):
+            if path.stem in keep:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _read(self, source_hash: str):
+        """キャッシュからコードを読み込む（ない場合や別のインタープリタのものはNone）"""
+        try:
+            with open(self.path_for(source_hash), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        magic = importlib.util.MAGIC_NUMBER
+        if data[:len(magic)] != magic:
+            return None
+        try:
+            return marshal.loads(data[len(magic):])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def _write(self, source_hash: str, code):
+        """コードをキャッシュに書き込む（一時ファイル経由で置き換え、失敗しても無視）"""
+        path = self.path_for(source_hash)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                f.write(marshal.dumps(code))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"バイトコードキャッシュの保存に失敗しました: {e}")
+
+
+class CachedSourceLoader(importlib.machinery.SourceFileLoader):
+    """
+    BytecodeCache からコードを読み込むローダー
+
+    __pycache__ への読み書きは行わない。
+    """
+
+    def __init__(self, fullname: str, path: str, cache: Optional[BytecodeCache]):
+        """
+        初期化
+
+        Args:
+            fullname: モジュール名
+            path: ソースファイルのパス
+            cache: バイトコードキャッシュ（Noneの場合は毎回ソースからコンパイル）
+        """
+        super().__init__(fullname, path)
+        self.cache = cache
+
+    def get_code(self, fullname):
+        """コードオブジェクトを取得"""
+        path = self.get_filename(fullname)
+        data = self.get_data(path)
+        if self.cache is None:
+            return compile(data, path, "exec", dont_inherit=True)
+        return self.cache.get_code(Path(path), data)
+
+
+class PluginModuleFinder:
+    """
+    プラグインのサブモジュール（horloq_plugin_<名前>.xxx）を BytecodeCache 経由で読み込む
+
+    sys.meta_path に登録する。プラグイン本体のモジュールは PluginLoader が直接
+    読み込むため、ここではその配下のモジュールだけを扱う。
+    """
+
+    PREFIX = "horloq_plugin_"
+
+    def __init__(self, cache: Optional[BytecodeCache]):
+        """
+        初期化
+
+        Args:
+            cache: バイトコードキャッシュ
+        """
+        self.cache = cache
+
+    def find_spec(self, fullname, path=None, target=None):
+        """サブモジュールのスペックを返す（対象外の場合はNone）"""
+        if not fullname.startswith(self.PREFIX) or "." not in fullname or not path:
+            return None
+
+        leaf = fullname.rpartition(".")[2]
+        for directory in path:
+            package_init = Path(directory) / leaf / "__init__.py"
+            if package_init.is_file():
+                loader = CachedSourceLoader(fullname, str(package_init), self.cache)
+                return importlib.util.spec_from_file_location(
+                    fullname,
+                    package_init,
+                    loader=loader,
+                    submodule_search_locations=[str(package_init.parent)],
+                )
+            module_file = Path(directory) / f"{leaf}.py"
+            if module_file.is_file():
+                loader = CachedSourceLoader(fullname, str(module_file), self.cache)
+                return importlib.util.spec_from_file_location(fullname, module_file, loader=loader)
+        return None
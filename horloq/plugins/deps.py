@@ -0,0 +1,236 @@
+"""
+プラグインの依存ライブラリの配置と解決
+"""
+
+import importlib
+import importlib.machinery
+import os
+import shutil
+import site
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# 依存ライブラリのディレクトリで、インポート名として扱わないもの
+_IGNORED_SUFFIXES = (".dist-info", ".egg-info", ".data")
+_IGNORED_NAMES = {"__pycache__", "bin", "Scripts", "share", "include"}
+
+_user_site_resolved = False
+
+
+def ensure_user_site_packages():
+    """
+    ユーザーsite-packagesを一度だけ sys.path の末尾に追加する
+
+    以前のバージョンで --user にインストールされた依存ライブラリのためのもの。
+    先頭に挿入するとプロセス全体のインポートの検索が遅くなるため末尾に追加する。
+    """
+    global _user_site_resolved
+    if _user_site_resolved:
+        return
+    _user_site_resolved = True
+
+    try:
+        user_site = _user_site_path()
+        if user_site and os.path.isdir(user_site) and user_site not in sys.path:
+            sys.path.append(user_site)
+    except Exception as e:
+        print(f"ユーザーsite-packagesの設定中にエラー: {e}")
+
+
+def _user_site_path() -> Optional[str]:
+    """ユーザーsite-packagesのパス"""
+    if getattr(sys, "frozen", False):
+        # PyInstallerでビルドされた場合は site が使えないため手動で構築
+        if sys.platform == "win32":
+            appdata = os.environ.get("APPDATA")
+            if appdata:
+                py_version = f"Python{sys.version_info.major}{sys.version_info.minor}"
+                return str(Path(appdata) / "Python" / py_version / "site-packages")
+        return None
+    return site.getusersitepackages()
+
+
+class DependencyRoots:
+    """
+    プラグインごとの依存ライブラリのディレクトリ
+
+    依存ライブラリは pip install --target でプラグインごとのディレクトリにインストールし、
+    sys.path には追加しない。プラグインを読み込むときに activate() で
+    トップレベルのパッケージ名を登録し、本体の sys.path で見つからない名前だけを
+    DependencyFinder がプラグインのディレクトリから探す。
+
+    プラグインごとの分離ではない（制限）: 登録した名前はプロセス全体で共有され、
+    同じ名前を持つプラグインが複数ある場合は先に登録したプラグインのものが使われる。
+    本体や sys.path にあるパッケージは常にそちらが使われる。
+    """
+
+    DIRNAME = "plugin_deps"
+
+    def __init__(self, root_dir: Path):
+        """
+        初期化
+
+        Args:
+            root_dir: 依存ライブラリのディレクトリをまとめる親ディレクトリ
+        """
+        self.root_dir = Path(root_dir)
+        self.finder = DependencyFinder.install()
+
+    def path_for(self, plugin_name: str) -> Path:
+        """
+        プラグインの依存ライブラリのディレクトリ
+
+        Args:
+            plugin_name: プラグイン名
+
+        Returns:
+            ディレクトリのパス（存在するとは限らない）
+        """
+        return self.root_dir / plugin_name
+
+    def activate(self, plugin_name: str) -> List[str]:
+        """
+        プラグインの依存ライブラリをインポートできるようにする
+
+        Args:
+            plugin_name: プラグイン名
+
+        Returns:
+            登録したトップレベルのパッケージ名
+        """
+        root = self.path_for(plugin_name)
+        if not root.is_dir():
+            return []
+        return self.finder.add_root(plugin_name, root)
+
+    def remove(self, plugin_name: str):
+        """
+        プラグインの依存ライブラリを削除
+
+        Args:
+            plugin_name: プラグイン名
+        """
+        self.finder.remove_root(plugin_name)
+        root = self.path_for(plugin_name)
+        if root.exists():
+            shutil.rmtree(root, ignore_errors=True)
+
+
+class DependencyFinder:
+    """
+    プラグインの依存ライブラリのトップレベルのパッケージを、そのプラグインの
+    ディレクトリから探す sys.meta_path のファインダー
+
+    サブモジュールは見つかったパッケージの __path__ から通常どおり探される。
+    sys.meta_path の PathFinder の後ろに登録し、標準ライブラリや sys.path で見つかる
+    名前は登録しない（pip install --target は推移的な依存も入れるため、本体や他の
+    プラグインが使う Pillow などのインポートを横取りしないように）。
+    1つのプロセスには同じ名前のモジュールを1つしか読み込めないため、
+    複数のプラグインが同じパッケージを持つ場合は先に登録したものが使われる
+    （別のバージョンが必要なプラグインにも先のものが使われる）。
+    """
+
+    def __init__(self):
+        """初期化"""
+        # トップレベルのパッケージ名 → (プラグイン名, ディレクトリ)
+        self._names: Dict[str, tuple] = {}
+
+    @classmethod
+    def install(cls) -> "DependencyFinder":
+        """
+        sys.meta_path の PathFinder の後ろに登録（登録済みの場合はそれを返す）
+
+        Returns:
+            ファインダー
+        """
+        for finder in sys.meta_path:
+            if isinstance(finder, cls):
+                return finder
+        finder = cls()
+        index = len(sys.meta_path)
+        for i, existing in enumerate(sys.meta_path):
+            if existing is importlib.machinery.PathFinder:
+                index = i + 1
+                break
+        sys.meta_path.insert(index, finder)
+        return finder
+
+    def add_root(self, plugin_name: str, root: Path) -> List[str]:
+        """
+        プラグインのディレクトリのトップレベルの名前を登録
+
+        Args:
+            plugin_name: プラグイン名
+            root: 依存ライブラリのディレクトリ
+
+        Returns:
+            登録した名前
+        """
+        # インストール直後のディレクトリも見つかるように
+        importlib.invalidate_caches()
+
+        names = []
+        for name in self._scan(root):
+            if self._resolves_elsewhere(name):
+                continue
+            owner = self._names.get(name)
+            if owner is not None and owner[0] != plugin_name:
+                print(f"依存ライブラリ '{name}' は {owner[0]} のものを使います ({plugin_name})")
+                continue
+            self._names[name] = (plugin_name, str(root))
+            names.append(name)
+        return names
+
+    def remove_root(self, plugin_name: str):
+        """
+        プラグインの登録を解除
+
+        Args:
+            plugin_name: プラグイン名
+        """
+        for name, (owner, _root) in list(self._names.items()):
+            if owner == plugin_name:
+                del self._names[name]
+
+    def find_spec(self, fullname, path=None, target=None):
+        """登録されたトップレベルの名前だけをプラグインのディレクトリから探す"""
+        if path is not None or "." in fullname:
+            return None
+        entry = self._names.get(fullname)
+        if entry is None:
+            return None
+        return importlib.machinery.PathFinder.find_spec(fullname, [entry[1]], target)
+
+    @staticmethod
+    def _resolves_elsewhere(name: str) -> bool:
+        """標準ライブラリ・組み込み・sys.path で見つかる名前かどうか"""
+        if name in sys.builtin_module_names or name in getattr(sys, "stdlib_module_names", ()):
+            return True
+        try:
+            return importlib.machinery.PathFinder.find_spec(name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @staticmethod
+    def _scan(root: Path) -> List[str]:
+        """ディレクトリ直下のインポート可能な名前"""
+        names = set()
+        try:
+            with os.scandir(root) as it:
+                for item in it:
+                    name = item.name
+                    if name.startswith(".") or name in _IGNORED_NAMES or name.endswith(_IGNORED_SUFFIXES):
+                        continue
+                    if item.is_dir():
+                        if name.isidentifier():
+                            names.add(name)
+                    elif name.endswith(".py"):
+                        names.add(name[:-3])
+                    elif name.endswith((".so", ".pyd")):
+                        # 拡張モジュール（foo.cpython-311-x86_64-linux-gnu.so など）
+                        names.add(name.split(".", 1)[0])
+        except OSError:
+            pass
+        return sorted(n for n in names if n.isidentifier())
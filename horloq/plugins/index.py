@@ -0,0 +1,382 @@
+"""
+プラグインの検出インデックス
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+import yaml
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class PluginIndexEntry:
+    """インデックスに記録されたプラグイン1件"""
+
+    name: str
+    path: str
+    kind: str  # "package"（ディレクトリ形式）、"zip"（パッケージファイル形式）または "module"（単一ファイル形式）
+    entry: Optional[str] = None  # 読み込むファイル（__init__.py がない場合はNone）
+    metadata: Optional[Dict[str, Any]] = None  # plugin.yaml の内容（ない場合はNone）
+    hashes: Dict[str, str] = field(default_factory=dict)  # 相対パス → SHA-256
+    signature: List[Optional[int]] = field(default_factory=list)
+
+    @property
+    def digest(self) -> str:
+        """ファイルのハッシュ全体をまとめたハッシュ"""
+        h = hashlib.sha256()
+        for rel_path in sorted(self.hashes):
+            h.update(rel_path.encode("utf-8"))
+            h.update(self.hashes[rel_path].encode("ascii"))
+        return h.hexdigest()
+
+
+class PluginIndex:
+    """
+    プラグインディレクトリの永続インデックス
+
+    プラグインごとの名前・パス・読み込むファイル・plugin.yaml の内容・ファイルの
+    ハッシュをJSONファイルに保存する。ディレクトリのmtimeが変わっていなければ
+    再走査せず、変更のあったエントリだけを作り直す。
+    検証は refresh()（検出時やファイルの変更の通知時）でだけ行い、get() は前回の
+    検証の結果を返す。
+    """
+
+    INDEX_FILENAME = "plugin_index.json"
+    VERSION = 1
+
+    # パッケージファイル形式のプラグインの拡張子（PluginInstaller.pack_plugin で作成）
+    PACKAGE_SUFFIX = ".hpz"
+
+    def __init__(self, plugin_dirs: List[Path], index_path: Optional[Path] = None, read_only: bool = False):
+        """
+        初期化
+
+        Args:
+            plugin_dirs: プラグインディレクトリのリスト
+            index_path: インデックスファイルのパス（Noneの場合は最初のディレクトリの親に作成）
+            read_only: インデックスファイルを読むだけで書き込まない（別プロセスのプラグインホスト用）
+        """
+        self.plugin_dirs = [Path(d) for d in plugin_dirs]
+        if index_path is None and self.plugin_dirs:
+            index_path = self.plugin_dirs[0].parent / self.INDEX_FILENAME
+        self.index_path = index_path
+        self.read_only = read_only
+
+        # ディレクトリのパス → {"mtime_ns": int, "entries": {名前: PluginIndexEntry}}
+        self._roots: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        # 前回の refresh() でまとめた プラグイン名 → エントリ（未検証の場合はNone）
+        self._merged: Optional[Dict[str, PluginIndexEntry]] = None
+
+    def refresh(self) -> Dict[str, PluginIndexEntry]:
+        """
+        インデックスを検証し、変更のあったエントリだけを作り直す
+
+        Returns:
+            プラグイン名 → エントリ（先に指定したディレクトリのものが優先）
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+            changed = False
+            for plugin_dir in self.plugin_dirs:
+                changed |= self._refresh_root(plugin_dir)
+
+            if changed:
+                self._save()
+
+            merged: Dict[str, PluginIndexEntry] = {}
+            for plugin_dir in self.plugin_dirs:
+                root = self._roots.get(str(plugin_dir))
+                if root is None:
+                    continue
+                for name, entry in root["entries"].items():
+                    merged.setdefault(name, entry)
+            self._merged = merged
+            return dict(merged)
+
+    def get(self, name: str) -> Optional[PluginIndexEntry]:
+        """
+        プラグインのエントリを取得（前回の refresh() の結果から引く）
+
+        プラグインごとのループから呼ばれるため、ファイルの検証は行わない。
+
+        Args:
+            name: プラグイン名
+
+        Returns:
+            エントリ（見つからない場合はNone）
+        """
+        with self._lock:
+            if self._merged is None:
+                self.refresh()
+            return self._merged.get(name)
+
+    def entries_in(self, plugin_dir: Path) -> List[PluginIndexEntry]:
+        """
+        指定したディレクトリのエントリを取得
+
+        Args:
+            plugin_dir: プラグインディレクトリ
+
+        Returns:
+            エントリのリスト（名前順）
+        """
+        self.refresh()
+        with self._lock:
+            root = self._roots.get(str(Path(plugin_dir)))
+            if root is None:
+                return []
+            return [root["entries"][name] for name in sorted(root["entries"])]
+
+    def refresh_entry(self, name: str) -> Optional[PluginIndexEntry]:
+        """
+        プラグイン1件のエントリを必ず作り直す
+
+        エントリの変更検出はディレクトリ・plugin.yaml・__init__.py のmtimeだけを見るため、
+        サブモジュールの編集を確実に反映したい場合（ホットリロード）に使う。
+
+        Args:
+            name: プラグイン名
+
+        Returns:
+            作り直したエントリ（見つからない場合はNone）
+        """
+        with self._lock:
+            if self._merged is None:
+                self.refresh()
+            for plugin_dir in self.plugin_dirs:
+                root = self._roots.get(str(plugin_dir))
+                if root is None or name not in root["entries"]:
+                    continue
+                entry = root["entries"][name]
+                rebuilt = self._build_entry(name, entry.kind, Path(entry.path))
+                root["entries"][name] = rebuilt
+                if self._merged.get(name) is entry:
+                    self._merged[name] = rebuilt
+                if rebuilt.hashes != entry.hashes or rebuilt.metadata != entry.metadata:
+                    self._save()
+                return rebuilt
+            return None
+
+    def invalidate(self):
+        """インデックスを破棄して次回すべて作り直す"""
+        with self._lock:
+            self._roots.clear()
+            self._merged = None
+
+    # --- 検証と再構築 ---
+
+    def _refresh_root(self, plugin_dir: Path) -> bool:
+        """ディレクトリ1つ分を検証（変更があればTrue）"""
+        key = str(plugin_dir)
+        mtime = self._mtime(plugin_dir)
+        if mtime is None:
+            return self._roots.pop(key, None) is not None
+
+        root = self._roots.get(key)
+        changed = False
+
+        if root is None or root["mtime_ns"] != mtime:
+            # エントリの追加・削除があったため一覧だけを作り直す（既存エントリは再利用）
+            old_entries = root["entries"] if root else {}
+            entries: Dict[str, PluginIndexEntry] = {}
+            for name, kind, path in self._scan(plugin_dir):
+                old = old_entries.get(name)
+                if old is not None and old.kind == kind:
+                    entries[name] = old
+                else:
+                    entries[name] = self._build_entry(name, kind, path)
+            root = {"mtime_ns": mtime, "entries": entries}
+            self._roots[key] = root
+            changed = True
+
+        # 各エントリの中身の変更を確認
+        entries = root["entries"]
+        for name, entry in list(entries.items()):
+            path = Path(entry.path)
+            if self._signature(entry.kind, path) != entry.signature:
+                entries[name] = self._build_entry(name, entry.kind, path)
+                changed = True
+
+        return changed
+
+    @staticmethod
+    def _scan(plugin_dir: Path) -> List[Tuple[str, str, Path]]:
+        """ディレクトリ内のプラグイン候補を列挙"""
+        found: List[Tuple[str, str, Path]] = []
+        names = set()
+
+        with os.scandir(plugin_dir) as it:
+            items = sorted(it, key=lambda e: e.name)
+
+        for item in items:
+            if item.name.startswith("."):
+                continue
+            if item.is_dir():
+                found.append((item.name, "package", Path(item.path)))
+                names.add(item.name)
+
+        # パッケージファイル形式（同名のディレクトリがあればそちらを優先）
+        for item in items:
+            if item.name.startswith(".") or not item.name.endswith(PluginIndex.PACKAGE_SUFFIX):
+                continue
+            name = item.name[:-len(PluginIndex.PACKAGE_SUFFIX)]
+            if name not in names and item.is_file():
+                found.append((name, "zip", Path(item.path)))
+                names.add(name)
+
+        # レガシー形式: 単一Pythonファイル
+        for item in items:
+            if not item.name.endswith(".py") or item.name.startswith("_") or not item.is_file():
+                continue
+            name = item.name[:-3]
+            if name not in names:
+                found.append((name, "module", Path(item.path)))
+
+        return found
+
+    def _signature(self, kind: str, path: Path) -> List[Optional[int]]:
+        """エントリの変更検出に使う値（ディレクトリ・plugin.yaml・読み込むファイルのmtime）"""
+        if kind in ("module", "zip"):
+            return [self._mtime(path)]
+        return [
+            self._mtime(path),
+            self._mtime(path / "plugin.yaml"),
+            self._mtime(path / "__init__.py"),
+        ]
+
+    def _build_entry(self, name: str, kind: str, path: Path) -> PluginIndexEntry:
+        """エントリを作成（plugin.yaml の解析とハッシュの計算）"""
+        entry = PluginIndexEntry(
+            name=name,
+            path=str(path),
+            kind=kind,
+            signature=self._signature(kind, path),
+        )
+
+        if kind == "module":
+            entry.entry = str(path)
+            entry.hashes = {path.name: self._hash_file(path)}
+            return entry
+
+        if kind == "zip":
+            return self._build_zip_entry(entry, path)
+
+        init_file = path / "__init__.py"
+        if init_file.exists():
+            entry.entry = str(init_file)
+
+        metadata_path = path / "plugin.yaml"
+        if metadata_path.exists():
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as f:
+                    metadata = yaml.safe_load(f)
+                entry.metadata = metadata if isinstance(metadata, dict) else None
+            except Exception as e:
+                print(f"plugin.yamlの読み込みに失敗しました ({name}): {e}")
+
+        for file_path in sorted(path.rglob("*")):
+            if "__pycache__" in file_path.parts or not file_path.is_file():
+                continue
+            if file_path.suffix == ".py" or file_path.name == "plugin.yaml":
+                rel_path = file_path.relative_to(path).as_posix()
+                entry.hashes[rel_path] = self._hash_file(file_path)
+
+        return entry
+
+    def _build_zip_entry(self, entry: PluginIndexEntry, path: Path) -> PluginIndexEntry:
+        """パッケージファイルのエントリを作成（展開せずに plugin.yaml を読む）"""
+        entry.hashes = {path.name: self._hash_file(path)}
+        try:
+            with zipfile.ZipFile(path) as archive:
+                metadata = yaml.safe_load(archive.read("plugin.yaml"))
+            entry.metadata = metadata if isinstance(metadata, dict) else None
+            entry.entry = str(path)
+        except (OSError, KeyError, zipfile.BadZipFile, yaml.YAMLError) as e:
+            print(f"プラグインパッケージの読み込みに失敗しました ({entry.name}): {e}")
+        return entry
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """ファイルのSHA-256"""
+        h = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    h.update(chunk)
+        except OSError:
+            return ""
+        return h.hexdigest()
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        """mtime（ナノ秒、存在しない場合はNone）"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    # --- 永続化 ---
+
+    def _load(self):
+        """インデックスファイルを読み込む（壊れている場合は空から作り直す）"""
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return
+            for key, root in data.get("roots", {}).items():
+                self._roots[key] = {
+                    "mtime_ns": root["mtime_ns"],
+                    "entries": {
+                        name: PluginIndexEntry(**entry)
+                        for name, entry in root["entries"].items()
+                    },
+                }
+        except Exception as e:
+            print(f"プラグインインデックスを作り直します: {e}")
+            self._roots.clear()
+
+    def _save(self):
+        """インデックスファイルを書き込む（一時ファイル経由で置き換え）"""
+        if self.index_path is None or self.read_only:
+            return
+
+        # 他のディレクトリ構成で作られたエントリも残す
+        data: Dict[str, Any] = {"version": self.VERSION, "roots": {}}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing.get("version") == self.VERSION:
+                data["roots"].update(existing.get("roots", {}))
+        except Exception:
+            pass
+
+        for key, root in self._roots.items():
+            data["roots"][key] = {
+                "mtime_ns": root["mtime_ns"],
+                "entries": {name: asdict(entry) for name, entry in root["entries"].items()},
+            }
+        for plugin_dir in self.plugin_dirs:
+            if str(plugin_dir) not in self._roots:
+                data["roots"].pop(str(plugin_dir), None)
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"プラグインインデックスの保存に失敗しました: {e}")
@@ -7,25 +7,47 @@ import sys
 import shutil
 import subprocess
 import tempfile
+import py_compile
+import zipfile
 import yaml
 import urllib.request
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse
+from .bytecode import BytecodeCache
+from .deps import DependencyRoots
+from .index import PluginIndex
 
 
 class PluginInstaller:
     """プラグインのインストール・管理"""
     
-    def __init__(self, plugin_dir: Path):
+    def __init__(
+        self,
+        plugin_dir: Path,
+        index: Optional[PluginIndex] = None,
+        bytecode_cache: Optional[BytecodeCache] = None,
+        dependency_roots: Optional[DependencyRoots] = None,
+        install_format: str = "directory",
+    ):
         """
         初期化
         
         Args:
             plugin_dir: プラグインディレクトリ
+            index: 共有のプラグインインデックス（Noneの場合は新しく作成）
+            bytecode_cache: インストール時にコンパイルするバイトコードキャッシュ（Noneの場合はコンパイルしない）
+            dependency_roots: 依存ライブラリのインストール先（Noneの場合はプラグインディレクトリの隣）
+            install_format: GitHub・ローカルディレクトリからのインストール形式（"directory" または "package"）
         """
         self.plugin_dir = plugin_dir
         self.plugin_dir.mkdir(parents=True, exist_ok=True)
+        self.index = index if index is not None else PluginIndex([plugin_dir])
+        self.bytecode_cache = bytecode_cache
+        if dependency_roots is None:
+            dependency_roots = DependencyRoots(plugin_dir.parent / DependencyRoots.DIRNAME)
+        self.dependency_roots = dependency_roots
+        self.install_format = install_format
     
     def install_from_github(self, repo_url: str, subdir: str = None) -> tuple[bool, str]:
         """
@@ -83,26 +105,18 @@ class PluginInstaller:
                 if not plugin_name:
                     return False, "plugin.yamlにnameが指定されていません"
                 
-                # インストール先
-                install_path = self.plugin_dir / plugin_name
-                
                 # 既存のプラグインを確認
-                if install_path.exists():
+                if self._installed_path(plugin_name) is not None:
                     return False, f"プラグイン '{plugin_name}' は既にインストールされています"
                 
-                # プラグインをコピー
-                shutil.copytree(plugin_path, install_path, dirs_exist_ok=True)
-                
-                # .gitディレクトリを削除
-                git_dir = install_path / ".git"
-                if git_dir.exists():
-                    shutil.rmtree(git_dir)
+                # プラグインを配置（.gitディレクトリは含めない）
+                self._place_plugin(plugin_path, plugin_name)
                 
                 # 依存関係をインストール
-                requirements_path = install_path / "requirements.txt"
+                requirements_path = plugin_path / "requirements.txt"
                 dep_message = ""
                 if requirements_path.exists():
-                    success, message = self._install_dependencies(requirements_path)
+                    success, message = self._install_dependencies(requirements_path, plugin_name)
                     if not success:
                         # 依存関係のインストールに失敗してもプラグイン自体はインストール
                         dep_message = f"\n警告: {message}"
@@ -117,14 +131,18 @@ class PluginInstaller:
     
     def install_from_local(self, plugin_path: Path) -> tuple[bool, str]:
         """
-        ローカルディレクトリからプラグインをインストール
+        ローカルディレクトリ（またはパッケージファイル）からプラグインをインストール
         
         Args:
-            plugin_path: プラグインディレクトリのパス
+            plugin_path: プラグインディレクトリ（またはパッケージファイル）のパス
         
         Returns:
             (成功フラグ, メッセージ)
         """
+        plugin_path = Path(plugin_path)
+        if plugin_path.is_file():
+            return self.install_from_package(plugin_path)
+        
         try:
             # plugin.yamlを読み込む
             metadata_path = plugin_path / "plugin.yaml"
@@ -138,21 +156,18 @@ class PluginInstaller:
             if not plugin_name:
                 return False, "plugin.yamlにnameが指定されていません"
             
-            # インストール先
-            install_path = self.plugin_dir / plugin_name
-            
             # 既存のプラグインを確認
-            if install_path.exists():
+            if self._installed_path(plugin_name) is not None:
                 return False, f"プラグイン '{plugin_name}' は既にインストールされています"
             
-            # プラグインをコピー
-            shutil.copytree(plugin_path, install_path, dirs_exist_ok=True)
+            # プラグインを配置
+            self._place_plugin(plugin_path, plugin_name)
             
             # 依存関係をインストール
-            requirements_path = install_path / "requirements.txt"
+            requirements_path = plugin_path / "requirements.txt"
             dep_message = ""
             if requirements_path.exists():
-                success, message = self._install_dependencies(requirements_path)
+                success, message = self._install_dependencies(requirements_path, plugin_name)
                 if not success:
                     # 依存関係のインストールに失敗してもプラグイン自体はインストール
                     dep_message = f"\n警告: {message}"
@@ -176,43 +191,264 @@ class PluginInstaller:
             (成功フラグ, メッセージ)
         """
         try:
-            plugin_path = self.plugin_dir / plugin_name
+            plugin_path = self._installed_path(plugin_name)
             
-            if not plugin_path.exists():
+            if plugin_path is None:
                 return False, f"プラグイン '{plugin_name}' が見つかりません"
             
-            # ディレクトリを削除
-            shutil.rmtree(plugin_path)
+            # ディレクトリ（またはパッケージファイル）を削除
+            if plugin_path.is_dir():
+                shutil.rmtree(plugin_path)
+            else:
+                plugin_path.unlink()
+            self.dependency_roots.remove(plugin_name)
+            self._prune_bytecode()
             
             return True, f"プラグイン '{plugin_name}' をアンインストールしました"
         
         except Exception as e:
             return False, f"エラー: {str(e)}"
     
-    def get_plugin_info(self, plugin_name: str) -> Optional[Dict[str, Any]]:
+    def install_from_package(self, package_path: Path) -> tuple[bool, str]:
         """
-        プラグイン情報を取得
+        パッケージファイル（pack_plugin で作成した .hpz）からプラグインをインストール
+        
+        ファイルは展開せず、一時ファイルにコピーしてから置き換えるため、
+        途中で失敗しても中途半端なプラグインは残らない。
         
         Args:
-            plugin_name: プラグイン名
+            package_path: パッケージファイルのパス
         
         Returns:
-            プラグイン情報（存在しない場合はNone）
+            (成功フラグ, メッセージ)
         """
         try:
-            plugin_path = self.plugin_dir / plugin_name
-            metadata_path = plugin_path / "plugin.yaml"
+            package_path = Path(package_path)
+            if not zipfile.is_zipfile(package_path):
+                return False, "プラグインパッケージではありません"
+            
+            with zipfile.ZipFile(package_path) as archive:
+                names = set(archive.namelist())
+                if "plugin.yaml" not in names:
+                    return False, "plugin.yamlが見つかりません"
+                metadata = yaml.safe_load(archive.read("plugin.yaml")) or {}
+                
+                plugin_name = metadata.get("name")
+                if not plugin_name:
+                    return False, "plugin.yamlにnameが指定されていません"
+                
+                package_dir = self.package_module_name(plugin_name)
+                if f"{package_dir}/__init__.py" not in names:
+                    return False, f"パッケージに {package_dir}/__init__.py がありません"
+                
+                requirements = None
+                if f"{package_dir}/requirements.txt" in names:
+                    requirements = archive.read(f"{package_dir}/requirements.txt")
+            
+            # 既存のプラグインを確認
+            if self._installed_path(plugin_name) is not None:
+                return False, f"プラグイン '{plugin_name}' は既にインストールされています"
+            
+            install_path = self.plugin_dir / f"{plugin_name}{PluginIndex.PACKAGE_SUFFIX}"
+            tmp_path = self.plugin_dir / f".{install_path.name}.tmp"
+            shutil.copyfile(package_path, tmp_path)
+            os.replace(tmp_path, install_path)
+            
+            # 依存関係をインストール
+            dep_message = ""
+            if requirements:
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    requirements_path = Path(tmpdir) / "requirements.txt"
+                    requirements_path.write_bytes(requirements)
+                    success, message = self._install_dependencies(requirements_path, plugin_name)
+                dep_message = f"\n{message}" if success else f"\n警告: {message}"
             
+            version = metadata.get("version", "不明")
+            return True, f"プラグイン '{plugin_name}' (v{version}) をインストールしました{dep_message}"
+        
+        except Exception as e:
+            return False, f"エラー: {str(e)}"
+    
+    def pack_plugin(self, plugin_path: Path, output_dir: Optional[Path] = None) -> tuple[bool, str]:
+        """
+        プラグインのディレクトリをパッケージファイル（.hpz）にまとめる
+        
+        Args:
+            plugin_path: プラグインディレクトリのパス
+            output_dir: 出力先（Noneの場合はカレントディレクトリ）
+        
+        Returns:
+            (成功フラグ, 作成したファイルのパスまたはエラーメッセージ)
+        """
+        try:
+            plugin_path = Path(plugin_path)
+            metadata_path = plugin_path / "plugin.yaml"
             if not metadata_path.exists():
-                return None
+                return False, "plugin.yamlが見つかりません"
             
             with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = yaml.safe_load(f)
+                metadata = yaml.safe_load(f) or {}
             
-            return metadata
+            plugin_name = metadata.get("name")
+            if not plugin_name:
+                return False, "plugin.yamlにnameが指定されていません"
+            if not (plugin_path / "__init__.py").exists():
+                return False, "__init__.pyが見つかりません"
+            
+            output_dir = Path(output_dir) if output_dir else Path.cwd()
+            output_dir.mkdir(parents=True, exist_ok=True)
+            package_path = output_dir / f"{plugin_name}{PluginIndex.PACKAGE_SUFFIX}"
+            self._write_package(plugin_path, plugin_name, package_path)
+            return True, str(package_path)
         
-        except Exception:
-            return None
+        except Exception as e:
+            return False, f"エラー: {str(e)}"
+    
+    @staticmethod
+    def package_module_name(plugin_name: str) -> str:
+        """
+        パッケージファイル内のモジュールのディレクトリ名（PluginLoader が読み込むモジュール名）
+        
+        Args:
+            plugin_name: プラグイン名
+        
+        Returns:
+            ディレクトリ名
+        """
+        return f"horloq_plugin_{plugin_name}"
+    
+    def _write_package(self, plugin_path: Path, plugin_name: str, package_path: Path):
+        """
+        パッケージファイルを書き込む（一時ファイル経由で置き換え）
+        
+        ルートに plugin.yaml、モジュールのディレクトリにソース・リソースと
+        コンパイル済みのバイトコード（.pyc）を格納する。
+        
+        Args:
+            plugin_path: プラグインディレクトリのパス
+            plugin_name: プラグイン名
+            package_path: 出力するファイルのパス
+        """
+        package_dir = self.package_module_name(plugin_name)
+        tmp_path = package_path.with_name(f".{package_path.name}.tmp")
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.write(plugin_path / "plugin.yaml", "plugin.yaml")
+                
+                for file_path in sorted(plugin_path.rglob("*")):
+                    rel_parts = file_path.relative_to(plugin_path).parts
+                    if not file_path.is_file() or any(
+                        part in (".git", "__pycache__") for part in rel_parts
+                    ) or file_path.suffix == ".pyc":
+                        continue
+                    
+                    arcname = "/".join((package_dir,) + rel_parts)
+                    archive.write(file_path, arcname)
+                    
+                    if file_path.suffix == ".py":
+                        # zipimport は .py と同じ場所の .pyc を使う
+                        cfile = Path(tmpdir) / f"{len(archive.namelist())}.pyc"
+                        py_compile.compile(
+                            str(file_path),
+                            cfile=str(cfile),
+                            dfile=f"{package_path.name}/{arcname}",
+                            doraise=True,
+                            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                        )
+                        archive.write(cfile, arcname[:-3] + ".pyc")
+        
+        os.replace(tmp_path, package_path)
+    
+    def _installed_path(self, plugin_name: str) -> Optional[Path]:
+        """
+        インストール済みのプラグインのパス
+        
+        Args:
+            plugin_name: プラグイン名
+        
+        Returns:
+            ディレクトリまたはパッケージファイルのパス（インストールされていない場合はNone）
+        """
+        for path in (
+            self.plugin_dir / plugin_name,
+            self.plugin_dir / f"{plugin_name}{PluginIndex.PACKAGE_SUFFIX}",
+        ):
+            if path.exists():
+                return path
+        return None
+    
+    def _place_plugin(self, plugin_path: Path, plugin_name: str) -> Path:
+        """
+        プラグインをプラグインディレクトリに配置
+        
+        一時的な名前で作成してから置き換えるため、途中で失敗しても
+        中途半端なプラグインは残らない。
+        
+        Args:
+            plugin_path: プラグインのソースディレクトリ
+            plugin_name: プラグイン名
+        
+        Returns:
+            インストール先
+        """
+        if self.install_format == "package":
+            install_path = self.plugin_dir / f"{plugin_name}{PluginIndex.PACKAGE_SUFFIX}"
+            self._write_package(plugin_path, plugin_name, install_path)
+            return install_path
+        
+        install_path = self.plugin_dir / plugin_name
+        tmp_path = self.plugin_dir / f".{plugin_name}.tmp"
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        shutil.copytree(
+            plugin_path,
+            tmp_path,
+            ignore=shutil.ignore_patterns(".git", "__pycache__"),
+        )
+        os.replace(tmp_path, install_path)
+        self._compile_bytecode(install_path)
+        return install_path
+    
+    def _compile_bytecode(self, install_path: Path):
+        """
+        インストールしたプラグインをバイトコードキャッシュにコンパイル
+        
+        Args:
+            install_path: インストール先
+        """
+        if self.bytecode_cache is None:
+            return
+        count = self.bytecode_cache.compile_plugin(install_path)
+        print(f"バイトコードをコンパイルしました: {install_path.name} ({count}ファイル)")
+        self._prune_bytecode()
+    
+    def _prune_bytecode(self):
+        """インストール済みのどのプラグインにも使われていないバイトコードを削除"""
+        if self.bytecode_cache is None:
+            return
+        keep = [
+            source_hash
+            for entry in self.index.refresh().values()
+            for rel_path, source_hash in entry.hashes.items()
+            if rel_path.endswith(".py")
+        ]
+        self.bytecode_cache.prune(keep)
+    
+    def get_plugin_info(self, plugin_name: str) -> Optional[Dict[str, Any]]:
+        """
+        プラグイン情報を取得
+        
+        Args:
+            plugin_name: プラグイン名
+        
+        Returns:
+            プラグイン情報（存在しない場合はNone）
+        """
+        for entry in self.index.entries_in(self.plugin_dir):
+            if entry.name == plugin_name:
+                return dict(entry.metadata) if entry.metadata is not None else None
+        return None
     
     def list_installed_plugins(self) -> list[Dict[str, Any]]:
         """
@@ -223,15 +459,11 @@ class PluginInstaller:
         """
         plugins = []
         
-        if not self.plugin_dir.exists():
-            return plugins
-        
-        for item in self.plugin_dir.iterdir():
-            if item.is_dir() and not item.name.startswith("."):
-                info = self.get_plugin_info(item.name)
-                if info:
-                    info["directory"] = item.name
-                    plugins.append(info)
+        for entry in self.index.entries_in(self.plugin_dir):
+            if entry.kind in ("package", "zip") and entry.metadata:
+                info = dict(entry.metadata)
+                info["directory"] = entry.name
+                plugins.append(info)
         
         return plugins
     
@@ -277,17 +509,21 @@ class PluginInstaller:
         except Exception as e:
             return False, None
     
-    def _install_dependencies(self, requirements_path: Path) -> tuple[bool, str]:
+    def _install_dependencies(self, requirements_path: Path, plugin_name: str) -> tuple[bool, str]:
         """
-        依存関係をインストール
+        依存関係をプラグインごとのディレクトリにインストール（pip install --target）
         
         Args:
             requirements_path: requirements.txtのパス
+            plugin_name: プラグイン名
         
         Returns:
             (成功フラグ, メッセージ)
         """
         try:
+            # プラグイン専用のディレクトリにインストール（sys.pathには追加しない）
+            target_dir = self.dependency_roots.path_for(plugin_name)
+            
             # Python実行可能ファイルのパスを取得
             python_exe = sys.executable
             
@@ -313,7 +549,7 @@ class PluginInstaller:
                                 return False, (
                                     "Pythonが見つかりません。\n"
                                     "依存関係を手動でインストールしてください:\n"
-                                    f"python -m pip install -r {requirements_path.name}"
+                                    f"python -m pip install -r {requirements_path.name} --target \"{target_dir}\""
                                 )
                 else:
                     # Linux/macOSの場合
@@ -332,19 +568,15 @@ class PluginInstaller:
             if not installed_packages:
                 return True, "インストールする依存関係がありません"
             
-            # Windowsでの特別な処理
-            extra_args = []
-            if sys.platform == 'win32':
-                # --user オプションで権限エラーを回避
-                extra_args.append('--user')
-                # site.USER_SITEを有効化するため
-                if not hasattr(sys, 'frozen'):
-                    import site
-                    site.ENABLE_USER_SITE = True
+            target_dir.mkdir(parents=True, exist_ok=True)
             
             # pipコマンドを構築
-            pip_cmd = [python_exe, "-m", "pip", "install", "-r", str(requirements_path)]
-            pip_cmd.extend(extra_args)
+            pip_cmd = [
+                python_exe, "-m", "pip", "install",
+                "-r", str(requirements_path),
+                "--target", str(target_dir),
+                "--upgrade",
+            ]
             
             # 環境変数を設定（文字エンコーディング問題を回避）
             env = os.environ.copy()
@@ -382,27 +614,21 @@ class PluginInstaller:
                         "依存関係のインストールに失敗しました（権限エラー）。\n\n"
                         "以下の方法をお試しください：\n"
                         "1. コマンドプロンプトを管理者として実行し、以下を実行:\n"
-                        f"   python -m pip install -r {requirements_path}\n\n"
+                        f"   python -m pip install -r {requirements_path} --target \"{target_dir}\"\n\n"
                         "2. または手動でパッケージをインストール:\n"
-                        f"   python -m pip install {' '.join(installed_packages)}\n\n"
+                        f"   python -m pip install {' '.join(installed_packages)} --target \"{target_dir}\"\n\n"
                         f"詳細: {error_msg}"
                     )
                 
                 return False, (
                     "依存関係のインストールに失敗しました。\n\n"
                     "手動でインストールしてください:\n"
-                    f"python -m pip install -r {requirements_path.name}\n\n"
+                    f"python -m pip install -r {requirements_path.name} --target \"{target_dir}\"\n\n"
                     f"詳細: {error_msg}"
                 )
             
-            # インストール成功後、site-packagesを再読み込み
-            if sys.platform == 'win32':
-                try:
-                    import site
-                    import importlib
-                    importlib.reload(site)
-                except Exception:
-                    pass  # リロードに失敗しても続行
+            # 読み込み中のプラグインの場合は新しいパッケージを登録
+            self.dependency_roots.activate(plugin_name)
             
             pkg_list = ', '.join(installed_packages)
             return True, f"依存関係をインストールしました: {pkg_list}"
@@ -0,0 +1,789 @@
+"""
+別プロセスで動かすプラグイン（分離モード）
+
+プラグインはホストプロセス（spawn）で読み込まれ、本体とはパイプで通信する。
+ウィジェットは describe_widget() が返す記述ツリーで表し、ホストが前回との差分を
+送り、本体が RemoteWidget で描画する。プラグインがブロックしても落ちても
+本体のメインループには影響しない。
+
+メッセージはタプル（種類, 引数...）:
+
+本体 → ホスト
+    ("init", 設定)            プラグインを読み込んで初期化
+    ("event", 名前, データ)    購読中のイベント
+    ("config", 設定全体)       設定の変更
+    ("command", 名前, 値)      ウィジェットのボタンなどの操作
+    ("enable", 有効か)         on_enable / on_disable
+    ("stop",)                 終了
+ホスト → 本体
+    ("ready", 成功か, エラー)  初期化の完了
+    ("ui", パッチのリスト)     ウィジェットの記述ツリーの差分
+    ("emit", 名前, データ)     イベントの発行
+    ("on", 名前) / ("off", 名前)  イベントの購読の開始・終了
+    ("config_set", キー, 値)   設定の変更
+    ("store", キー, 値, セクション)  プラグインの設定・状態の保存
+
+記述ツリーのノードは {"type": ..., "key": ..., "children": [...], その他のプロパティ} の辞書。
+ノードのIDは親のIDに "/" と key（省略時は子の位置）をつなげたもの（ルートは "root"）。
+"""
+
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+import traceback
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.scheduler import Scheduler
+from .base import PluginBase
+
+
+ROOT_ID = "root"
+
+
+# --- 記述ツリーの差分 ---
+
+def _child_id(node_id: str, child: Dict[str, Any], index: int) -> str:
+    """子ノードのID"""
+    return f"{node_id}/{child.get('key', index)}"
+
+
+def _child_keys(node: Dict[str, Any]) -> List[Any]:
+    """子ノードのキーの並び"""
+    return [child.get("key", index) for index, child in enumerate(node.get("children") or [])]
+
+
+def diff_tree(
+    old: Optional[Dict[str, Any]],
+    new: Optional[Dict[str, Any]],
+    node_id: str = ROOT_ID,
+) -> List[Tuple]:
+    """
+    記述ツリーの差分
+
+    種類か子の並びが変わったノードは丸ごと置き換え、それ以外は変わったプロパティだけを送る。
+
+    Args:
+        old: 前回のツリー
+        new: 今回のツリー
+        node_id: 比較するノードのID
+
+    Returns:
+        パッチのリスト（("replace", ID, ノード) または ("update", ID, {プロパティ: 値})）
+    """
+    if new is None:
+        return [] if old is None else [("replace", node_id, None)]
+    if old is None or old.get("type") != new.get("type") or _child_keys(old) != _child_keys(new):
+        return [("replace", node_id, new)]
+
+    patches: List[Tuple] = []
+    changed = {key: value for key, value in new.items() if key != "children" and old.get(key) != value}
+    changed.update({key: None for key in old if key != "children" and key not in new})
+    if changed:
+        patches.append(("update", node_id, changed))
+
+    for index, (old_child, new_child) in enumerate(zip(old.get("children") or [], new.get("children") or [])):
+        patches.extend(diff_tree(old_child, new_child, _child_id(node_id, new_child, index)))
+    return patches
+
+
+def find_node(tree: Optional[Dict[str, Any]], node_id: str) -> Optional[Dict[str, Any]]:
+    """
+    IDでノードを探す
+
+    Args:
+        tree: 記述ツリー
+        node_id: ノードのID
+
+    Returns:
+        ノード（見つからない場合はNone）
+    """
+    if tree is None or node_id == ROOT_ID:
+        return tree
+    parent_id, _, _segment = node_id.rpartition("/")
+    parent = find_node(tree, parent_id)
+    if parent is None:
+        return None
+    for index, child in enumerate(parent.get("children") or []):
+        if _child_id(parent_id, child, index) == node_id:
+            return child
+    return None
+
+
+def apply_patches(tree: Optional[Dict[str, Any]], patches: List[Tuple]) -> Optional[Dict[str, Any]]:
+    """
+    記述ツリーにパッチを適用
+
+    Args:
+        tree: 記述ツリー（変更される）
+        patches: diff_tree() のパッチ
+
+    Returns:
+        適用後のツリー
+    """
+    for op, node_id, value in patches:
+        if op == "replace":
+            if node_id == ROOT_ID:
+                tree = value
+                continue
+            parent_id = node_id.rpartition("/")[0]
+            parent = find_node(tree, parent_id)
+            if parent is None:
+                continue
+            for index, child in enumerate(parent.get("children") or []):
+                if _child_id(parent_id, child, index) == node_id:
+                    parent["children"][index] = value
+                    break
+        elif op == "update":
+            node = find_node(tree, node_id)
+            if node is None:
+                continue
+            for key, prop in value.items():
+                if prop is None:
+                    node.pop(key, None)
+                else:
+                    node[key] = prop
+    return tree
+
+
+def _picklable(data: Any) -> Any:
+    """パイプで送れない値は文字列にする"""
+    try:
+        pickle.dumps(data)
+        return data
+    except Exception:
+        return repr(data)
+
+
+# --- 本体側 ---
+
+class IsolatedPlugin(PluginBase):
+    """
+    ホストプロセスで動くプラグインの本体側の代理
+
+    PluginManager からは通常のプラグインと同じように扱われる。initialize() は
+    ホストプロセスを起動するだけですぐに戻り、プラグインの初期化はホストで行われる。
+    ホストからのメッセージは受信スレッドで受け取り、Tkのスレッドでまとめて処理する。
+    """
+
+    # ウィジェットは記述ツリーからいつでも作り直せる
+    rebuildable = True
+
+    # 作成したすべてのウィジェットに差分を適用する
+    multi_window = True
+
+    # メタデータは __init__ でインデックスから設定する
+    plugin_metadata: Optional[Dict[str, Any]] = {}
+
+    # 終了を待つ時間（秒）
+    STOP_TIMEOUT = 2.0
+
+    # 受け取ったメッセージをTkのスレッドで処理する間隔（ミリ秒）
+    POLL_INTERVAL_MS = 50
+
+    def __init__(self, app_context: Dict[str, Any], plugin_name: str, loader):
+        """
+        初期化
+
+        Args:
+            app_context: アプリケーションコンテキスト
+            plugin_name: プラグイン名
+            loader: PluginLoader（プラグインの場所とキャッシュの設定を使う）
+        """
+        metadata = loader.get_metadata(plugin_name) or {}
+        super().__init__(
+            app_context,
+            name=metadata.get("name", plugin_name),
+            version=metadata.get("version", "0.0.0"),
+            author=metadata.get("author", "Unknown"),
+            description=metadata.get("description", ""),
+        )
+        self.plugin_name = plugin_name
+        self.plugin_id = plugin_name
+        self.loader = loader
+        self.ticker = app_context.get("ticker")
+
+        # "stopped" / "starting" / "running" / "failed" / "crashed"
+        self.status = "stopped"
+        self.error: Optional[str] = None
+
+        self._process = None
+        self._conn = None
+        self._reader: Optional[threading.Thread] = None
+        # (受信した Connection, メッセージ)
+        self._inbox: "queue.SimpleQueue[Tuple]" = queue.SimpleQueue()
+        # _inbox を取り出すティックの購読
+        self._poll_token: Optional[int] = None
+        self._stopping = False
+        self._tree: Optional[Dict[str, Any]] = None
+        self._widgets: List[Any] = []
+        # 購読中のイベント名 → 転送用のリスナー
+        self._forwarders: Dict[str, Callable] = {}
+
+    def initialize(self) -> bool:
+        """ホストプロセスを起動"""
+        self._start()
+        return True
+
+    def shutdown(self):
+        """ホストプロセスを終了"""
+        self._stop()
+
+    def on_enable(self):
+        """有効化をホストに伝える"""
+        self._send(("enable", True))
+
+    def on_disable(self):
+        """無効化をホストに伝える"""
+        self._send(("enable", False))
+
+    def restart(self):
+        """ホストプロセスを起動し直す（新しいコードを読み込む）"""
+        self._stop()
+        self._tree = None
+        self._render_all()
+        self._start()
+        if self.enabled:
+            self._send(("enable", True))
+
+    def create_widget(self, parent):
+        """
+        記述ツリーを描画するウィジェットを作成
+
+        Args:
+            parent: 親ウィジェット
+
+        Returns:
+            RemoteWidget
+        """
+        from ..ui.remote import RemoteWidget
+
+        self._drain()
+        widget = RemoteWidget(parent, self.styles, on_command=self.send_command)
+        self._widgets.append(widget)
+        self._render(widget)
+        return widget
+
+    def send_command(self, command: str, value: Any = None):
+        """
+        ウィジェットの操作をホストに送る
+
+        Args:
+            command: 記述ツリーの command
+            value: 値
+        """
+        self._send(("command", command, value))
+
+    # --- プロセスと通信 ---
+
+    def _start(self):
+        """ホストプロセスを起動して初期化を依頼"""
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=host_main,
+            args=(child_conn,),
+            name=f"horloq-plugin-{self.plugin_name}",
+            daemon=True,
+        )
+        self._stopping = False
+        self.status = "starting"
+        self.error = None
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        self.loader.track(self.plugin_name)
+        index = self.loader.index
+        bytecode_cache = self.loader.bytecode_cache
+        dependency_roots = self.loader.dependency_roots
+        store = None
+        if self.store is not None:
+            # name が別のプラグインのディレクトリ名と同じ場合はそのプラグインのものなので移行しない
+            former_names = () if self.loader.get_metadata(self.name) is not None else (self.name,)
+            store = self.store.load(self.plugin_id, former_names=former_names)
+        self._send(("init", {
+            "plugin_name": self.plugin_name,
+            "plugin_dirs": [str(path) for path in self.loader.plugin_dirs],
+            "index_path": str(index.index_path) if index.index_path else None,
+            "bytecode_dir": str(bytecode_cache.cache_dir) if bytecode_cache else None,
+            "deps_dir": str(dependency_roots.root_dir) if dependency_roots else None,
+            "config": self.config.as_dict() if self.config is not None else {},
+            "store": deepcopy(store),
+        }))
+
+        if self.events is not None:
+            self._forward("config_changed", self._on_config_changed)
+
+        # Tk は他のスレッドから予約できないため、受信スレッドはキューに入れるだけにして
+        # Tkのスレッドのティックで取り出す（UIの作成前は create_widget() でまとめて処理する）
+        if self.ticker is not None and self._poll_token is None:
+            self._poll_token = self.ticker.subscribe(self._drain, self.POLL_INTERVAL_MS)
+
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            name=f"horloq-plugin-reader-{self.plugin_name}",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _stop(self):
+        """ホストプロセスを終了"""
+        self._stopping = True
+        self._stop_polling()
+        for event_name in list(self._forwarders):
+            self._unforward(event_name)
+        self._send(("stop",))
+        if self._process is not None:
+            self._process.join(self.STOP_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(self.STOP_TIMEOUT)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+        self.status = "stopped"
+
+    def _send(self, message: Tuple):
+        """ホストにメッセージを送る（送れない場合は無視）"""
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(message)
+        except (OSError, EOFError, ValueError):
+            pass
+        except pickle.PicklingError as e:
+            print(f"プラグインに送れないメッセージです ({self.plugin_name}): {e}")
+
+    def _read_loop(self):
+        """ホストからのメッセージを受け取る（受信スレッド）"""
+        conn = self._conn
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                self._inbox.put((conn, ("exit",)))
+                return
+            self._inbox.put((conn, message))
+
+    def _stop_polling(self):
+        """_inbox を取り出すティックの購読を解除"""
+        if self._poll_token is not None:
+            self.ticker.unsubscribe(self._poll_token)
+            self._poll_token = None
+
+    def _drain(self, now: Optional[float] = None):
+        """受け取ったメッセージを処理（Tkのスレッドのティックから呼ばれる）"""
+        while True:
+            try:
+                conn, message = self._inbox.get_nowait()
+            except queue.Empty:
+                return
+            # 起動し直す前のプロセスからのメッセージは捨てる
+            if conn is not self._conn:
+                continue
+            try:
+                self._handle(message)
+            except Exception as e:
+                print(f"プラグインのメッセージの処理エラー ({self.plugin_name}): {e}")
+
+    def _handle(self, message: Tuple):
+        """メッセージ1件を処理"""
+        kind = message[0]
+        if kind == "ui":
+            self._tree = apply_patches(self._tree, message[1])
+            self._widgets = [w for w in self._widgets if w.winfo_exists()]
+            for widget in self._widgets:
+                widget.apply(message[1])
+        elif kind == "emit":
+            if self.events is not None:
+                self.events.emit(message[1], message[2])
+        elif kind == "on":
+            self._forward(message[1])
+        elif kind == "off":
+            self._unforward(message[1])
+        elif kind == "config_set":
+            if self.config is not None:
+                self.config.set(message[1], message[2])
+                self.config.save_later()
+        elif kind == "store":
+            if self.store is not None:
+                self.store.set(self.plugin_id, message[1], message[2], section=message[3])
+        elif kind == "ready":
+            if message[1]:
+                self.status = "running"
+            else:
+                self.status = "failed"
+                self.error = message[2]
+                print(f"プラグインの初期化に失敗 ({self.plugin_name}): {message[2]}")
+                self._render_all()
+        elif kind == "exit":
+            if not self._stopping:
+                self._conn = None
+                self._stop_polling()
+                self.status = "crashed"
+                print(f"プラグインのプロセスが終了しました: {self.plugin_name}")
+                self._render_all()
+
+    def _forward(self, event_name: str, listener: Optional[Callable] = None):
+        """イベントをホストに転送する"""
+        if self.events is None or event_name in self._forwarders:
+            return
+        if listener is None:
+            def listener(event, name=event_name):
+                self._send(("event", name, _picklable(event.data)))
+        self._forwarders[event_name] = listener
+        self.events.on(event_name, listener)
+
+    def _unforward(self, event_name: str):
+        """イベントの転送を止める"""
+        listener = self._forwarders.pop(event_name, None)
+        if listener is not None and self.events is not None:
+            self.events.off(event_name, listener)
+
+    def _on_config_changed(self, event):
+        """設定の変更をホストに送る"""
+        self._send(("config", self.config.as_dict()))
+        self._send(("event", "config_changed", _picklable(event.data)))
+
+    # --- 描画 ---
+
+    def _render(self, widget):
+        """ウィジェットに現在の状態を描画"""
+        if self.status in ("failed", "crashed"):
+            reason = "初期化に失敗しました" if self.status == "failed" else "プロセスが終了しました"
+            widget.show_status(f"{self.name}: {reason}", action=("再起動", self.restart))
+        elif self._tree is None:
+            widget.show_status(f"{self.name} を起動しています…")
+        else:
+            widget.render(self._tree)
+
+    def _render_all(self):
+        """すべてのウィジェットを描画し直す"""
+        self._widgets = [w for w in self._widgets if w.winfo_exists()]
+        for widget in self._widgets:
+            self._render(widget)
+
+
+# --- ホスト側 ---
+
+class _HostEvents:
+    """ホストプロセスの EventManager の代わり（購読はパイプで本体に伝える）"""
+
+    def __init__(self, host: "_PluginHost"):
+        self.host = host
+        self._listeners: Dict[str, List[Callable]] = {}
+
+    def on(self, event_name: str, callback: Callable):
+        listeners = self._listeners.setdefault(event_name, [])
+        if callback in listeners:
+            return
+        listeners.append(callback)
+        if len(listeners) == 1:
+            self.host.send(("on", event_name))
+
+    def off(self, event_name: str, callback: Callable):
+        listeners = self._listeners.get(event_name, [])
+        if callback in listeners:
+            listeners.remove(callback)
+            if not listeners:
+                del self._listeners[event_name]
+                self.host.send(("off", event_name))
+
+    def emit(self, event_name: str, data: Any = None):
+        self.host.send(("emit", event_name, _picklable(data)))
+
+    def dispatch(self, event_name: str, data: Any):
+        """本体から届いたイベントをリスナーに渡す"""
+        from ..core.events import Event
+
+        event = Event(name=event_name, data=data, timestamp=datetime.now())
+        for callback in list(self._listeners.get(event_name, [])):
+            self.host.guard(callback, event)
+
+    def listeners(self, event_name: str) -> List[Callable]:
+        return list(self._listeners.get(event_name, []))
+
+    def listener_count(self, event_name: str) -> int:
+        return len(self._listeners.get(event_name, []))
+
+    def list_events(self) -> List[str]:
+        return list(self._listeners)
+
+
+class _HostConfig:
+    """ホストプロセスの ConfigManager の代わり（本体から受け取った設定全体を持つ）"""
+
+    def __init__(self, host: "_PluginHost", data: Dict[str, Any]):
+        self.host = host
+        self.data = data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value: Any = self.data
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return deepcopy(value)
+
+    def set(self, key: str, value: Any, layer: Optional[str] = None):
+        target = self.data
+        parts = key.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+        self.host.send(("config_set", key, _picklable(value)))
+
+    def save(self):
+        """保存は本体が行う"""
+
+    def save_later(self, delay: Optional[float] = None):
+        """保存は本体が行う"""
+
+    def as_dict(self) -> Dict[str, Any]:
+        return deepcopy(self.data)
+
+
+class _HostStore:
+    """ホストプロセスの PluginConfigStore の代わり（1プラグイン分の名前空間を持つ）"""
+
+    SECTIONS = ("config", "state")
+
+    def __init__(self, host: "_PluginHost", namespace: Optional[Dict[str, Dict[str, Any]]]):
+        self.host = host
+        self.namespace = namespace or {section: {} for section in self.SECTIONS}
+
+    def load(self, plugin_name: str, former_names=()) -> Dict[str, Dict[str, Any]]:
+        return self.namespace
+
+    def release(self, plugin_name: str):
+        """書き出しは本体が行う"""
+
+    def get(self, plugin_name: str, key: str, default: Any = None, section: str = "config") -> Any:
+        return self.namespace.setdefault(section, {}).get(key, default)
+
+    def set(self, plugin_name: str, key: str, value: Any, section: str = "config"):
+        values = self.namespace.setdefault(section, {})
+        if key in values and values[key] == value:
+            return
+        values[key] = value
+        self.host.send(("store", key, _picklable(value), section))
+
+    def flush(self):
+        """書き出しは本体が行う"""
+
+
+class _HostTicker:
+    """ホストプロセスの Ticker の代わり（ホストのループから通知する）"""
+
+    def __init__(self, host: "_PluginHost"):
+        self.host = host
+        self.root = None
+        self._subscriptions: Dict[int, List[Any]] = {}
+        self._next_token = 0
+
+    def subscribe(self, callback: Callable[[float], None], interval_ms: int = 1000) -> int:
+        self._next_token += 1
+        self._subscriptions[self._next_token] = [callback, max(1, int(interval_ms)), -1]
+        return self._next_token
+
+    def unsubscribe(self, token: Optional[int]):
+        self._subscriptions.pop(token, None)
+
+    def callbacks(self) -> List[Callable[[float], None]]:
+        return [sub[0] for sub in self._subscriptions.values()]
+
+    def timeout(self) -> Optional[float]:
+        """次の通知までの秒数（購読がない場合はNone）"""
+        if not self._subscriptions:
+            return None
+        now_ms = time.time() * 1000
+        return min(
+            (interval - now_ms % interval) / 1000
+            for _callback, interval, _bucket in self._subscriptions.values()
+        )
+
+    def tick(self):
+        """間隔の境界を越えた購読者に通知"""
+        now = time.time()
+        now_ms = int(now * 1000)
+        for sub in list(self._subscriptions.values()):
+            bucket = now_ms // sub[1]
+            if bucket == sub[2]:
+                continue
+            sub[2] = bucket
+            self.host.guard(sub[0], now)
+
+
+class _PluginHost:
+    """ホストプロセスでプラグインを動かすループ"""
+
+    # 記述ツリーを確認する最大の間隔（秒、プラグインのスレッドからの変更を拾う）
+    RENDER_INTERVAL = 0.5
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.plugin: Optional[PluginBase] = None
+        self.events = _HostEvents(self)
+        self.ticker = _HostTicker(self)
+        # 別プロセスのためUIスレッドを止めることはなく、CPU時間の予算は設けない
+        self.scheduler = Scheduler(budget_percent=0)
+        self.config: Optional[_HostConfig] = None
+        self.tree: Optional[Dict[str, Any]] = None
+        self.running = True
+
+    def send(self, message: Tuple):
+        try:
+            self.conn.send(message)
+        except (OSError, EOFError, ValueError):
+            self.running = False
+
+    def guard(self, callback: Callable, *args):
+        """プラグインのコールバックを呼ぶ（例外はホストを止めずに表示する）"""
+        try:
+            return callback(*args)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def run(self):
+        while self.running:
+            timeouts = [t for t in (self.ticker.timeout(), self.scheduler.timeout()) if t is not None]
+            timeout = min(timeouts + [self.RENDER_INTERVAL])
+            try:
+                if self.conn.poll(timeout):
+                    self.handle(self.conn.recv())
+            except (EOFError, OSError):
+                break
+            self.ticker.tick()
+            self.scheduler.run_pending()
+            self.render()
+        self.stop_plugin()
+
+    def handle(self, message: Tuple):
+        kind = message[0]
+        if kind == "init":
+            self.start_plugin(message[1])
+        elif kind == "event":
+            self.events.dispatch(message[1], message[2])
+        elif kind == "config":
+            if self.config is not None:
+                self.config.data = message[1]
+        elif kind == "command":
+            if self.plugin is not None:
+                self.guard(self.plugin.handle_command, message[1], message[2])
+        elif kind == "enable":
+            if self.plugin is not None and self.plugin.enabled != message[1]:
+                self.plugin.enabled = message[1]
+                self.guard(self.plugin.on_enable if message[1] else self.plugin.on_disable)
+        elif kind == "stop":
+            self.running = False
+
+    def start_plugin(self, options: Dict[str, Any]):
+        from .bytecode import BytecodeCache
+        from .deps import DependencyRoots
+        from .index import PluginIndex
+        from .loader import PluginLoader
+
+        plugin_name = options["plugin_name"]
+        plugin_dirs = [Path(path) for path in options["plugin_dirs"]]
+        # インデックスは本体が保存するため、ホストでは読むだけにする
+        index = PluginIndex(
+            plugin_dirs,
+            Path(options["index_path"]) if options["index_path"] else None,
+            read_only=True,
+        )
+        loader = PluginLoader(
+            plugin_dirs,
+            index,
+            BytecodeCache(Path(options["bytecode_dir"])) if options["bytecode_dir"] else None,
+            DependencyRoots(Path(options["deps_dir"])) if options["deps_dir"] else None,
+        )
+
+        self.config = _HostConfig(self, options["config"])
+        context = {
+            "config": self.config,
+            "events": self.events,
+            "ticker": self.ticker,
+            "scheduler": self.scheduler,
+            "plugin_store": _HostStore(self, options["store"]),
+            "themes": None,
+            "styles": None,
+        }
+        try:
+            plugin_class = loader.load_plugin(plugin_name)
+            if plugin_class is None:
+                raise RuntimeError("プラグインを読み込めませんでした")
+            plugin = plugin_class(context)
+            result = plugin.initialize()
+            if inspect.isawaitable(result):
+                result = asyncio.run(_await(result))
+            if not result:
+                raise RuntimeError("initialize() が False を返しました")
+        except Exception as e:
+            traceback.print_exc()
+            self.send(("ready", False, str(e)))
+            return
+        self.plugin = plugin
+        self.send(("ready", True, None))
+
+    def stop_plugin(self):
+        if self.plugin is None:
+            return
+        if self.plugin.enabled:
+            self.plugin.enabled = False
+            self.guard(self.plugin.on_disable)
+        self.guard(self.plugin.shutdown)
+        self.scheduler.shutdown()
+        self.plugin = None
+
+    def render(self):
+        """記述ツリーの差分を送る"""
+        if self.plugin is None:
+            return
+        tree = self.guard(self.plugin.describe_widget)
+        patches = diff_tree(self.tree, tree)
+        if patches:
+            self.tree = deepcopy(tree)
+            self.send(("ui", patches))
+
+
+async def _await(awaitable):
+    """コルーチンを待機"""
+    return await awaitable
+
+
+def host_main(conn):
+    """
+    ホストプロセスのエントリーポイント（multiprocessing の spawn で起動）
+
+    Args:
+        conn: 本体との Connection
+    """
+    host = _PluginHost(conn)
+    try:
+        host.run()
+    finally:
+        conn.close()
+
+
+def isolated_factory(plugin_name: str, loader) -> Callable[[Dict[str, Any]], IsolatedPlugin]:
+    """
+    PluginManager がプラグインクラスの代わりに使うファクトリ
+
+    Args:
+        plugin_name: プラグイン名
+        loader: PluginLoader
+
+    Returns:
+        app_context を受け取って IsolatedPlugin を返す関数
+    """
+    return functools.partial(IsolatedPlugin, plugin_name=plugin_name, loader=loader)
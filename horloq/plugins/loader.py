@@ -5,25 +5,52 @@
 import importlib
 import importlib.util
 import sys
-import site
+import threading
+import time
+import zipimport
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Type, Optional
+from typing import Any, Dict, List, Type, Optional
 from .base import PluginBase
+from .bytecode import BytecodeCache, CachedSourceLoader, PluginModuleFinder
+from .deps import DependencyRoots, ensure_user_site_packages
+from .index import PluginIndex
 
 
 class PluginLoader:
     """プラグインローダー"""
     
-    def __init__(self, plugin_dirs: List[Path]):
+    # 並列に読み込むモジュール数の上限
+    MAX_WORKERS = 4
+    
+    def __init__(
+        self,
+        plugin_dirs: List[Path],
+        index: Optional[PluginIndex] = None,
+        bytecode_cache: Optional[BytecodeCache] = None,
+        dependency_roots: Optional[DependencyRoots] = None,
+    ):
         """
         初期化
         
         Args:
             plugin_dirs: プラグインディレクトリのリスト
+            index: 共有のプラグインインデックス（Noneの場合は新しく作成）
+            bytecode_cache: バイトコードキャッシュ（Noneの場合は毎回ソースからコンパイル）
+            dependency_roots: プラグインごとの依存ライブラリのディレクトリ
         """
         self.plugin_dirs = plugin_dirs
+        self.index = index if index is not None else PluginIndex(plugin_dirs)
+        self.bytecode_cache = bytecode_cache
+        self._module_finder = self._install_module_finder()
         self._loaded_plugins: Dict[str, Type[PluginBase]] = {}
-        self._ensure_user_site_packages()
+        # プラグイン名 → モジュールの読み込みにかかった時間（ミリ秒）
+        self.import_times: Dict[str, float] = {}
+        # プラグイン名 → 読み込んだときのファイルのハッシュ（PluginIndexEntry.digest）
+        self.loaded_digests: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.dependency_roots = dependency_roots
+        ensure_user_site_packages()
     
     def discover_plugins(self) -> List[str]:
         """
@@ -32,36 +59,49 @@ class PluginLoader:
         Returns:
             検出されたプラグイン名のリスト
         """
-        discovered = []
+        return [
+            name for name, entry in self.index.refresh().items()
+            if entry.entry is not None and not name.startswith("_")
+        ]
+    
+    def get_metadata(self, plugin_name: str) -> Optional[Dict[str, Any]]:
+        """
+        プラグインのメタデータを取得（プラグインのコードは読み込まない）
         
-        for plugin_dir in self.plugin_dirs:
-            if not plugin_dir.exists():
-                continue
+        Args:
+            plugin_name: プラグイン名
             
-            # ディレクトリ形式のプラグインを検索（__init__.pyを含む）
-            for dir_path in plugin_dir.iterdir():
-                if not dir_path.is_dir():
-                    continue
-                if dir_path.name.startswith("_"):
-                    continue
-                
-                # __init__.pyがあればプラグインとして認識
-                init_file = dir_path / "__init__.py"
-                if init_file.exists():
-                    plugin_name = dir_path.name
-                    discovered.append(plugin_name)
-                    continue
+        Returns:
+            plugin.yaml の内容（プラグインがない場合はNone、plugin.yaml がない場合は空の辞書）
+        """
+        entry = self.index.get(plugin_name)
+        if entry is None or entry.entry is None:
+            return None
+        return dict(entry.metadata or {})
+    
+    def load_plugins(self, plugin_names: List[str]) -> Dict[str, Optional[Type[PluginBase]]]:
+        """
+        複数のプラグインをスレッドプールで並列に読み込む
+        
+        モジュールの実行（ファイルの読み込みや依存ライブラリのインポート）は
+        I/O待ちの間GILを手放すため、重いプラグインの読み込みを重ねられる。
+        
+        Args:
+            plugin_names: プラグイン名のリスト
             
-            # レガシー形式: 単一Pythonファイル
-            for file_path in plugin_dir.glob("*.py"):
-                if file_path.name.startswith("_"):
-                    continue
-                
-                plugin_name = file_path.stem
-                if plugin_name not in discovered:
-                    discovered.append(plugin_name)
+        Returns:
+            プラグイン名 → プラグインクラス（失敗時はNone）
+        """
+        pending = [name for name in plugin_names if name not in self._loaded_plugins]
+        if len(pending) > 1:
+            workers = min(self.MAX_WORKERS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plugin-loader") as executor:
+                list(executor.map(self._import_plugin, pending))
+        else:
+            for name in pending:
+                self._import_plugin(name)
         
-        return discovered
+        return {name: self._loaded_plugins.get(name) for name in plugin_names}
     
     def load_plugin(self, plugin_name: str) -> Optional[Type[PluginBase]]:
         """
@@ -77,22 +117,47 @@ class PluginLoader:
         if plugin_name in self._loaded_plugins:
             return self._loaded_plugins[plugin_name]
         
-        # ユーザーsite-packagesが確実にパスに含まれているか再確認
-        # （プラグインロード時に再度確認することで、後からインストールされたパッケージも利用可能に）
-        self._ensure_user_site_packages()
+        return self._import_plugin(plugin_name)
+    
+    def _import_plugin(self, plugin_name: str) -> Optional[Type[PluginBase]]:
+        """
+        プラグインのモジュールを実行してクラスを取得（ワーカースレッドからも呼ばれる）
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            プラグインクラス（失敗時はNone）
+        """
+        start = time.perf_counter()
         
         # プラグインファイルを検索
-        plugin_file = self._find_plugin_file(plugin_name)
-        if plugin_file is None:
+        entry = self.index.get(plugin_name)
+        if entry is None or entry.entry is None:
             print(f"プラグインファイルが見つかりません: {plugin_name}")
             return None
+        plugin_file = Path(entry.entry)
+        
+        # プラグインの依存ライブラリのディレクトリをインポート先に登録
+        if self.dependency_roots is not None:
+            self.dependency_roots.activate(plugin_name)
         
         try:
             # モジュールを動的に読み込む
-            spec = importlib.util.spec_from_file_location(
-                f"horloq_plugin_{plugin_name}",
-                plugin_file
-            )
+            module_name = f"horloq_plugin_{plugin_name}"
+            if entry.kind == "zip":
+                # パッケージファイルは展開せずに zipimport で読み込む（同梱のバイトコードを使う）
+                # 更新で置き換えられたファイルの古い目次を使わないようにキャッシュを捨てる
+                importer = zipimport.zipimporter(str(plugin_file))
+                importer.invalidate_caches()
+                importlib.invalidate_caches()
+                spec = importer.find_spec(module_name)
+            else:
+                spec = importlib.util.spec_from_file_location(
+                    module_name,
+                    plugin_file,
+                    loader=CachedSourceLoader(module_name, str(plugin_file), self.bytecode_cache),
+                )
             if spec is None or spec.loader is None:
                 print(f"プラグインの読み込みに失敗: {plugin_name}")
                 return None
@@ -107,14 +172,23 @@ class PluginLoader:
                 print(f"プラグインクラスが見つかりません: {plugin_name}")
                 return None
             
-            self._loaded_plugins[plugin_name] = plugin_class
+            # インデックスに記録済みの plugin.yaml の内容をクラスに渡す
+            # （インスタンスごとにファイルを開き直さない）
+            plugin_class.plugin_metadata = dict(entry.metadata or {})
+            plugin_class.plugin_id = plugin_name
+            
+            with self._lock:
+                self._loaded_plugins[plugin_name] = plugin_class
+                self.import_times[plugin_name] = (time.perf_counter() - start) * 1000
+                self.loaded_digests[plugin_name] = entry.digest
             return plugin_class
             
         except ImportError as e:
             print(f"プラグインの依存関係エラー ({plugin_name}): {e}")
             print(f"  モジュール名: {e.name if hasattr(e, 'name') else '不明'}")
             print(f"  ヒント: プラグインの依存ライブラリがインストールされていない可能性があります")
-            print(f"  sys.path: {sys.path[:3]}...") # 最初の3つだけ表示
+            if self.dependency_roots is not None:
+                print(f"  依存ライブラリのディレクトリ: {self.dependency_roots.path_for(plugin_name)}")
             return None
         except Exception as e:
             import traceback
@@ -131,37 +205,141 @@ class PluginLoader:
         """
         if plugin_name in self._loaded_plugins:
             del self._loaded_plugins[plugin_name]
+        self.import_times.pop(plugin_name, None)
+        self.loaded_digests.pop(plugin_name, None)
         
-        # sys.modulesからも削除
-        module_name = f"horloq_plugin_{plugin_name}"
-        if module_name in sys.modules:
-            del sys.modules[module_name]
+        # sys.modulesからも削除（サブモジュールを含む）
+        self._purge_modules(plugin_name)
     
-    def _find_plugin_file(self, plugin_name: str) -> Optional[Path]:
+    def reload_plugin(self, plugin_name: str) -> Optional[Type[PluginBase]]:
         """
-        プラグインファイルを検索
+        プラグインのモジュールを読み込み直す
+        
+        古いモジュールを sys.modules から外してから読み込み、失敗した場合は
+        古いモジュールとクラスを元に戻す（動作中のプラグインはそのまま使える）。
         
         Args:
             plugin_name: プラグイン名
             
         Returns:
-            プラグインファイルのパス（見つからない場合はNone）
+            新しいプラグインクラス（失敗時はNone）
         """
-        for plugin_dir in self.plugin_dirs:
-            # ディレクトリ形式（優先）
-            plugin_package = plugin_dir / plugin_name
-            if plugin_package.is_dir():
-                init_file = plugin_package / "__init__.py"
-                if init_file.exists():
-                    return init_file
-            
-            # 単一ファイル形式（レガシー）
-            plugin_file = plugin_dir / f"{plugin_name}.py"
-            if plugin_file.exists():
-                return plugin_file
+        old_class = self._loaded_plugins.pop(plugin_name, None)
+        old_digest = self.loaded_digests.pop(plugin_name, None)
+        old_modules = self._purge_modules(plugin_name)
+        
+        importlib.invalidate_caches()
+        self.index.refresh_entry(plugin_name)
+        plugin_class = self._import_plugin(plugin_name)
+        if plugin_class is not None:
+            return plugin_class
         
+        # 途中まで読み込まれた新しいモジュールを捨てて元に戻す
+        self._purge_modules(plugin_name)
+        sys.modules.update(old_modules)
+        if old_class is not None:
+            self._loaded_plugins[plugin_name] = old_class
+        if old_digest is not None:
+            self.loaded_digests[plugin_name] = old_digest
         return None
     
+    def track(self, plugin_name: str):
+        """
+        モジュールをこのプロセスで読み込まずにファイルの変更を追跡する（別プロセスで動かす場合）
+        
+        Args:
+            plugin_name: プラグイン名
+        """
+        entry = self.index.refresh_entry(plugin_name)
+        if entry is not None:
+            self.loaded_digests[plugin_name] = entry.digest
+    
+    def is_modified(self, plugin_name: str) -> bool:
+        """
+        読み込んだ後にプラグインのファイルが変更されたか
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            変更された場合True（読み込んでいない場合はFalse）
+        """
+        digest = self.loaded_digests.get(plugin_name)
+        if digest is None:
+            return False
+        entry = self.index.refresh_entry(plugin_name)
+        return entry is not None and entry.entry is not None and entry.digest != digest
+    
+    def _purge_modules(self, plugin_name: str) -> Dict[str, Any]:
+        """
+        プラグインのモジュールとサブモジュールを sys.modules から取り除く
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            取り除いたモジュール名 → モジュール
+        """
+        module_name = f"horloq_plugin_{plugin_name}"
+        removed = {}
+        for name in list(sys.modules):
+            if name == module_name or name.startswith(module_name + "."):
+                removed[name] = sys.modules.pop(name)
+        return removed
+    
+    def benchmark_import(self, plugin_name: str, repeat: int = 5) -> Optional[Dict[str, float]]:
+        """
+        プラグインのモジュールの読み込み時間を計測
+        
+        最初の1回は依存ライブラリの読み込みを済ませるために捨て、以降はソースからの
+        コンパイル（コールド）とバイトコードキャッシュからの読み込み（ウォーム）を
+        交互に計測する。
+        
+        Args:
+            plugin_name: プラグイン名
+            repeat: 計測回数
+            
+        Returns:
+            {"cold_ms": 中央値, "warm_ms": 中央値}（読み込みに失敗した場合はNone）
+        """
+        cache = self.bytecode_cache
+        
+        def measure(use_cache: bool) -> Optional[float]:
+            self.unload_plugin(plugin_name)
+            self.bytecode_cache = self._module_finder.cache = cache if use_cache else None
+            try:
+                if self.load_plugin(plugin_name) is None:
+                    return None
+                return self.import_times[plugin_name]
+            finally:
+                self.bytecode_cache = self._module_finder.cache = cache
+        
+        if measure(True) is None:
+            return None
+        
+        cold, warm = [], []
+        for _ in range(max(1, repeat)):
+            cold.append(measure(False))
+            warm.append(measure(True))
+        self.unload_plugin(plugin_name)
+        
+        if None in cold or None in warm:
+            return None
+        return {
+            "cold_ms": sorted(cold)[len(cold) // 2],
+            "warm_ms": sorted(warm)[len(warm) // 2],
+        }
+    
+    def _install_module_finder(self) -> PluginModuleFinder:
+        """プラグインのサブモジュールもバイトコードキャッシュ経由で読み込むようにする"""
+        for finder in sys.meta_path:
+            if isinstance(finder, PluginModuleFinder):
+                finder.cache = self.bytecode_cache
+                return finder
+        finder = PluginModuleFinder(self.bytecode_cache)
+        sys.meta_path.insert(0, finder)
+        return finder
+    
     def _find_plugin_class(self, module) -> Optional[Type[PluginBase]]:
         """
         モジュールからプラグインクラスを検索
@@ -192,70 +370,6 @@ class PluginLoader:
         
         return None
     
-    def _ensure_user_site_packages(self):
-        """
-        ユーザーsite-packagesディレクトリがsys.pathに含まれていることを確認
-        Windowsでの--userインストールされたパッケージを読み込むために必要
-        """
-        try:
-            import os
-            
-            # PyInstallerでビルドされた場合の特別処理
-            if getattr(sys, 'frozen', False):
-                # Windowsの場合、手動でパスを構築
-                if sys.platform == 'win32':
-                    # ユーザープロファイルから直接パスを構築
-                    appdata = os.environ.get('APPDATA')
-                    if appdata:
-                        # Pythonのバージョンを取得
-                        py_version = f"Python{sys.version_info.major}{sys.version_info.minor}"
-                        user_site = Path(appdata) / "Python" / py_version / "site-packages"
-                        
-                        if user_site.exists() and str(user_site) not in sys.path:
-                            sys.path.insert(0, str(user_site))
-                            print(f"[ビルド版] ユーザーsite-packagesをパスに追加: {user_site}")
-                            
-                            # パッケージ一覧を表示
-                            try:
-                                packages = [item.name for item in user_site.iterdir() 
-                                          if item.is_dir() and not item.name.startswith('.') 
-                                          and not item.name.endswith('.dist-info')]
-                                if packages:
-                                    print(f"  検出されたパッケージ: {', '.join(sorted(packages)[:5])}...")
-                            except Exception:
-                                pass
-                return
-            
-            # 通常のPython環境の場合
-            user_site = site.getusersitepackages()
-            
-            # sys.pathに追加されていなければ追加
-            if user_site and user_site not in sys.path:
-                sys.path.insert(0, user_site)
-                print(f"ユーザーsite-packagesをパスに追加: {user_site}")
-            
-            # Windowsの場合、さらにScriptsディレクトリも確認
-            if sys.platform == 'win32':
-                user_base = site.getuserbase()
-                if user_base:
-                    scripts_dir = Path(user_base) / "Scripts"
-                    if scripts_dir.exists() and str(scripts_dir) not in sys.path:
-                        sys.path.insert(0, str(scripts_dir))
-                        print(f"ユーザーScriptsディレクトリをパスに追加: {scripts_dir}")
-                    
-                    # デバッグ情報: 実際にパッケージがインストールされているか確認
-                    if user_site and Path(user_site).exists():
-                        print(f"ユーザーsite-packages内のパッケージ:")
-                        try:
-                            for item in Path(user_site).iterdir():
-                                if item.is_dir() and not item.name.startswith('.'):
-                                    print(f"  - {item.name}")
-                        except Exception as e:
-                            print(f"  パッケージ一覧の取得エラー: {e}")
-        
-        except Exception as e:
-            print(f"ユーザーsite-packagesの設定中にエラー: {e}")
-    
     @property
     def loaded_plugins(self) -> Dict[str, Type[PluginBase]]:
         """読み込まれたプラグインのリスト"""
@@ -2,9 +2,15 @@
 プラグインマネージャー
 """
 
+import asyncio
+import inspect
+import json
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
+from .activation import ActivationTrigger, ActivationWatcher, PluginStub, parse_triggers
 from .base import PluginBase
+from .isolation import IsolatedPlugin, isolated_factory
 from .loader import PluginLoader
 
 
@@ -20,9 +26,31 @@ class PluginManager:
             plugin_dirs: プラグインディレクトリのリスト
         """
         self.app_context = app_context
-        self.loader = PluginLoader(plugin_dirs)
+        self.loader = PluginLoader(
+            plugin_dirs,
+            app_context.get("plugin_index"),
+            app_context.get("bytecode_cache"),
+            app_context.get("plugin_deps"),
+        )
+        self.store = app_context.get("plugin_store")
+        # プラグインごとのリソース使用量の集計（Noneの場合は集計しない）
+        self.monitor = app_context.get("resource_monitor")
+        # プラグインが予約した処理（終了時にまとめて取り消す）
+        self.scheduler = app_context.get("scheduler")
         
         self._active_plugins: Dict[str, PluginBase] = {}
+        # 非同期の initialize の完了を待っているプラグイン（完了後に _active_plugins に移す）
+        self._initializing: Dict[str, PluginBase] = {}
+        # プラグイン名 → 読み込みの各段階の所要時間（import_ms, initialize_ms, enable_ms）
+        self.load_times: Dict[str, Dict[str, float]] = {}
+        
+        # 起動トリガーを待っているプラグイン（起動後もウィジェットのスロットのために残す）
+        self._stubs: Dict[str, PluginStub] = {}
+        self.activation = ActivationWatcher(
+            app_context.get("events"),
+            app_context.get("ticker"),
+            self._on_trigger_fired,
+        )
     
     def discover_plugins(self) -> List[str]:
         """
@@ -33,6 +61,163 @@ class PluginManager:
         """
         return self.loader.discover_plugins()
     
+    def get_metadata(self, plugin_name: str) -> Optional[Dict[str, Any]]:
+        """
+        プラグインのメタデータを取得（プラグインのモジュールは読み込まない）
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            plugin.yaml の内容（プラグインがない場合はNone）
+        """
+        return self.loader.get_metadata(plugin_name)
+    
+    def list_plugin_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        検出されたすべてのプラグインのメタデータを取得（プラグインのモジュールは読み込まない）
+        
+        Returns:
+            プラグイン名 → plugin.yaml の内容
+        """
+        return {
+            name: self.loader.get_metadata(name) or {}
+            for name in self.loader.discover_plugins()
+        }
+    
+    def defer_plugins(self, plugin_names: List[str]) -> List[str]:
+        """
+        起動トリガーに従ってプラグインを振り分ける
+        
+        onStartup を持たないプラグインはモジュールを読み込まずにスタブとして登録し、
+        トリガーの監視を始める。
+        
+        Args:
+            plugin_names: プラグイン名のリスト
+            
+        Returns:
+            すぐに読み込むプラグイン名のリスト
+        """
+        immediate = []
+        for plugin_name in plugin_names:
+            if plugin_name in self._active_plugins or plugin_name in self._stubs:
+                continue
+            
+            metadata = self.loader.get_metadata(plugin_name)
+            triggers = parse_triggers(metadata)
+            if metadata is None or any(t.kind == "onStartup" for t in triggers):
+                immediate.append(plugin_name)
+                continue
+            
+            stub = PluginStub(plugin_name, metadata, triggers)
+            self._stubs[plugin_name] = stub
+            self.activation.watch(stub)
+            print(f"プラグインの起動を待機: {plugin_name} ({', '.join(map(str, triggers))})")
+        
+        return immediate
+    
+    def start_plugins(self, plugin_names: List[str]) -> Dict[str, bool]:
+        """
+        起動トリガーに従ってプラグインを開始
+        
+        onStartup のプラグインはすぐに読み込み、それ以外はスタブとして登録する。
+        
+        Args:
+            plugin_names: プラグイン名のリスト
+            
+        Returns:
+            プラグイン名 → 成功時True（スタブとして登録したものもTrue）
+        """
+        immediate = self.defer_plugins(plugin_names)
+        loaded = self.load_plugins(immediate)
+        return {name: loaded.get(name, True) for name in plugin_names}
+    
+    def activate(
+        self,
+        plugin_name: str,
+        trigger: Optional[ActivationTrigger] = None,
+        on_activated: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        待機中のプラグインを起動（モジュールを読み込んで初期化）
+        
+        initialize がコルーチンを返した場合は完了を待たずに戻り、完了後に
+        plugin_activated を発行する。
+        
+        Args:
+            plugin_name: プラグイン名
+            trigger: 発火したトリガー（Noneの場合は直接の呼び出し）
+            on_activated: 起動の完了後に呼ぶ関数（非同期の初期化の場合は完了後）
+            
+        Returns:
+            成功時True（待機中でない場合も読み込み済みならTrue、非同期の初期化中もTrue）
+        """
+        stub = self._stubs.get(plugin_name)
+        if stub is None or stub.activated:
+            return plugin_name in self._active_plugins or plugin_name in self._initializing
+        
+        def finish(name: str, ok: bool):
+            if not ok:
+                return
+            stub.plugin = self._active_plugins[name]
+            stub.fired = trigger
+            
+            events = self.app_context.get("events")
+            if events is not None:
+                events.emit("plugin_activated", {
+                    "plugin_id": name,
+                    "trigger": str(trigger) if trigger else None,
+                })
+            if on_activated is not None:
+                on_activated()
+        
+        self.activation.unwatch(plugin_name)
+        if not self.load_plugins([plugin_name], on_ready=finish).get(plugin_name, False):
+            return False
+        if plugin_name in self._active_plugins:
+            finish(plugin_name, True)
+        return True
+    
+    def get_stub(self, plugin_name: str) -> Optional[PluginStub]:
+        """
+        プラグインのスタブを取得
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            スタブ（起動トリガーを持たないプラグインの場合はNone）
+        """
+        return self._stubs.get(plugin_name)
+    
+    def list_pending_plugins(self) -> List[str]:
+        """
+        起動トリガーを待っているプラグイン名のリストを取得
+        
+        Returns:
+            プラグイン名のリスト
+        """
+        return [name for name, stub in self._stubs.items() if not stub.activated]
+    
+    def _on_trigger_fired(self, plugin_name: str, trigger: ActivationTrigger, event):
+        """
+        起動トリガーの発火
+        
+        onEvent の場合は、起動したプラグインが登録したリスナーにも発火元のイベントを渡す
+        （非同期の初期化の場合は完了後に渡す）。
+        """
+        events = self.app_context.get("events")
+        before = events.listeners(trigger.argument) if events and event is not None else []
+        
+        def replay():
+            if trigger.kind != "onEvent" or event is None:
+                return
+            # emit と同じ経路で渡し、CPU時間と停止を起動したプラグインに計上する
+            added = [callback for callback in events.listeners(trigger.argument) if callback not in before]
+            events.deliver(event, added)
+        
+        self.activate(plugin_name, trigger, on_activated=replay)
+    
     def load_plugin(self, plugin_name: str) -> bool:
         """
         プラグインを読み込んで初期化
@@ -43,34 +228,309 @@ class PluginManager:
         Returns:
             成功時True
         """
-        # すでにアクティブの場合
-        if plugin_name in self._active_plugins:
+        return self.load_plugins([plugin_name]).get(plugin_name, False)
+    
+    def load_plugins(
+        self,
+        plugin_names: List[str],
+        on_ready: Optional[Callable[[str, bool], None]] = None,
+    ) -> Dict[str, bool]:
+        """
+        複数のプラグインをまとめて読み込んで初期化
+        
+        モジュールの読み込みはスレッドプールで並列に行う。コルーチンを返す
+        initialize はスケジューラーのイベントループで実行し、完了を待たずに戻る
+        （完了後に on_ready を呼ぶ）。インスタンスの作成と on_enable は
+        呼び出し元のスレッド（Tkのスレッド）で行う。
+        
+        Args:
+            plugin_names: プラグイン名のリスト
+            on_ready: 非同期の初期化の完了時に (プラグイン名, 成功か) を受け取る関数
+                （Noneの場合は plugin_ready イベントを発行する）
+            
+        Returns:
+            プラグイン名 → 成功時True（非同期の初期化中のものもTrue）
+        """
+        results: Dict[str, bool] = {}
+        pending = []
+        for plugin_name in plugin_names:
+            if plugin_name in self._active_plugins or plugin_name in self._initializing:
+                results[plugin_name] = True
+            elif plugin_name not in results:
+                results[plugin_name] = False
+                pending.append(plugin_name)
+        
+        if not pending:
+            return results
+        
+        # プラグインクラスを読み込む（並列、別プロセスで動かすものはこのプロセスでは読み込まない）
+        isolated = [name for name in pending if self.is_isolated(name)]
+        classes = self.loader.load_plugins([name for name in pending if name not in isolated])
+        for plugin_name in isolated:
+            classes[plugin_name] = isolated_factory(plugin_name, self.loader)
+        results.update(self._instantiate(pending, classes, on_ready=on_ready))
+        
+        for plugin_name in pending:
+            if plugin_name in self.loader.import_times:
+                self.load_times.setdefault(plugin_name, {})["import_ms"] = self.loader.import_times[plugin_name]
+        
+        return results
+    
+    def is_isolated(self, plugin_name: str) -> bool:
+        """
+        プラグインを別プロセスで動かすか
+        
+        設定の plugins.isolated に挙げたもの、または plugin.yaml に isolation: process を
+        書いたものが対象。
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            別プロセスで動かす場合True
+        """
+        config = self.app_context.get("config")
+        if config is not None and plugin_name in (config.get("plugins.isolated", []) or []):
             return True
+        metadata = self.loader.get_metadata(plugin_name) or {}
+        return metadata.get("isolation") == "process"
+    
+    def _instantiate(
+        self,
+        pending: List[str],
+        classes: Dict[str, Any],
+        states: Optional[Dict[str, Any]] = None,
+        on_ready: Optional[Callable[[str, bool], None]] = None,
+    ) -> Dict[str, bool]:
+        """
+        プラグインインスタンスを作成して初期化し、有効化する
         
-        # プラグインクラスを読み込む
-        plugin_class = self.loader.load_plugin(plugin_name)
-        if plugin_class is None:
-            return False
+        Args:
+            pending: プラグイン名のリスト
+            classes: プラグイン名 → プラグインクラス
+            states: プラグイン名 → restore() に渡す状態（ホットリロードの場合）
+            on_ready: 非同期の初期化の完了時に (プラグイン名, 成功か) を受け取る関数
+            
+        Returns:
+            プラグイン名 → 成功時True（非同期の初期化中のものもTrue）
+        """
+        states = states or {}
+        results = {plugin_name: False for plugin_name in pending}
         
-        try:
-            # プラグインインスタンスを作成
-            plugin = plugin_class(self.app_context)
+        # プラグインインスタンスを作成して初期化
+        plugins: Dict[str, PluginBase] = {}
+        coroutines = {}
+        for plugin_name in pending:
+            plugin_class = classes.get(plugin_name)
+            if plugin_class is None:
+                continue
             
-            # 初期化
-            if not plugin.initialize():
-                print(f"プラグインの初期化に失敗: {plugin_name}")
-                return False
+            plugin = None
+            try:
+                plugin = plugin_class(self.app_context)
+                
+                # プラグインの設定名前空間を読み込む
+                if self.store is not None:
+                    self.store.load(plugin.plugin_id, former_names=self._former_store_names(plugin))
+                
+                start = time.perf_counter()
+                result = plugin.initialize()
+                if inspect.isawaitable(result):
+                    if self.scheduler is not None:
+                        # Tkのスレッドを止めないようイベントループで待ち、完了後に有効化する
+                        self._initialize_async(plugin_name, plugin, result, states.get(plugin_name), on_ready)
+                        results[plugin_name] = True
+                        continue
+                    coroutines[plugin_name] = result
+                else:
+                    self._record_time(plugin_name, "initialize_ms", start)
+                    if not result:
+                        print(f"プラグインの初期化に失敗: {plugin_name}")
+                        self._cancel_scheduled(plugin)
+                        continue
+                plugins[plugin_name] = plugin
+                
+            except Exception as e:
+                print(f"プラグインの読み込みエラー ({plugin_name}): {e}")
+                self._cancel_scheduled(plugin)
+        
+        # スケジューラーがない場合（CLI など）は非同期の初期化を並行に待機
+        if coroutines:
+            for plugin_name, ok in self._await_initializers(coroutines).items():
+                if not ok:
+                    print(f"プラグインの初期化に失敗: {plugin_name}")
+                    self._cancel_scheduled(plugins.pop(plugin_name, None))
+        
+        # 有効化（UIに触れる可能性があるため呼び出し元のスレッドで順番に行う）
+        for plugin_name in pending:
+            plugin = plugins.get(plugin_name)
+            if plugin is not None:
+                results[plugin_name] = self._enable(plugin_name, plugin, states.get(plugin_name))
+        
+        return results
+    
+    def _enable(self, plugin_name: str, plugin: PluginBase, state: Any = None) -> bool:
+        """
+        初期化の済んだプラグインを有効化してアクティブリストに追加
+        
+        Args:
+            plugin_name: プラグイン名
+            plugin: プラグインインスタンス
+            state: restore() に渡す状態（ホットリロードの場合）
             
+        Returns:
+            成功時True
+        """
+        if state is not None:
+            try:
+                plugin.restore(state)
+            except Exception as e:
+                print(f"プラグインの状態の復元エラー ({plugin_name}): {e}")
+        
+        start = time.perf_counter()
+        ok = False
+        try:
             # アクティブリストに追加
             self._active_plugins[plugin_name] = plugin
             plugin.enabled = True
             plugin.on_enable()
-            
-            return True
-            
+            ok = True
         except Exception as e:
             print(f"プラグインの読み込みエラー ({plugin_name}): {e}")
-            return False
+        self._record_time(plugin_name, "enable_ms", start)
+        return ok
+    
+    def _initialize_async(
+        self,
+        plugin_name: str,
+        plugin: PluginBase,
+        coroutine: Any,
+        state: Any,
+        on_ready: Optional[Callable[[str, bool], None]],
+    ):
+        """
+        コルーチンを返した initialize をスケジューラーのイベントループで実行
+        
+        完了の通知はTkのスレッドで受け取り、成功していれば有効化する。
+        
+        Args:
+            plugin_name: プラグイン名
+            plugin: プラグインインスタンス
+            coroutine: initialize が返したコルーチン
+            state: restore() に渡す状態（ホットリロードの場合）
+            on_ready: 完了時に (プラグイン名, 成功か) を受け取る関数（Noneの場合は plugin_ready を発行）
+        """
+        # initialize の実行時間（イベントループのスレッドで計り、Tkのスレッドで記録する）
+        elapsed: Dict[str, float] = {}
+        
+        async def run():
+            start = time.perf_counter()
+            try:
+                return await coroutine
+            finally:
+                elapsed["initialize_ms"] = (time.perf_counter() - start) * 1000
+        
+        def on_done(result, error: Optional[Exception]):
+            # 完了前にアンロードされた場合
+            if self._initializing.get(plugin_name) is not plugin:
+                return
+            del self._initializing[plugin_name]
+            self.load_times.setdefault(plugin_name, {}).update(elapsed)
+            
+            ok = error is None and bool(result)
+            if error is not None:
+                print(f"プラグインの初期化エラー ({plugin_name}): {error}")
+            if ok:
+                ok = self._enable(plugin_name, plugin, state)
+            else:
+                print(f"プラグインの初期化に失敗: {plugin_name}")
+                self._cancel_scheduled(plugin)
+            
+            if on_ready is not None:
+                on_ready(plugin_name, ok)
+            else:
+                self._emit_ready(plugin_name, ok)
+        
+        self._initializing[plugin_name] = plugin
+        self.scheduler.run_coroutine(plugin, run(), on_done)
+    
+    def _emit_ready(self, plugin_name: str, success: bool):
+        """
+        非同期の初期化の完了を通知
+        
+        Args:
+            plugin_name: プラグイン名
+            success: 有効化まで成功したかどうか
+        """
+        events = self.app_context.get("events")
+        if events is not None:
+            events.emit("plugin_ready", {"plugin_id": plugin_name, "success": success})
+    
+    def _await_initializers(self, coroutines: Dict[str, Any]) -> Dict[str, bool]:
+        """
+        コルーチンを返した initialize を並行に待機
+        
+        Args:
+            coroutines: プラグイン名 → initialize が返したコルーチン
+            
+        Returns:
+            プラグイン名 → 初期化成功時True
+        """
+        async def run_one(plugin_name, coroutine):
+            start = time.perf_counter()
+            try:
+                return bool(await coroutine)
+            except Exception as e:
+                print(f"プラグインの初期化エラー ({plugin_name}): {e}")
+                return False
+            finally:
+                self._record_time(plugin_name, "initialize_ms", start)
+        
+        async def run_all():
+            names = list(coroutines)
+            results = await asyncio.gather(
+                *(run_one(name, coroutines[name]) for name in names)
+            )
+            return dict(zip(names, results))
+        
+        return asyncio.run(run_all())
+    
+    def _former_store_names(self, plugin: PluginBase) -> tuple:
+        """
+        ストアの以前のキー（plugin.yaml の name で保存していたもの）
+        
+        name が別のプラグインのディレクトリ名と同じ場合はそのプラグインのものなので移行しない。
+        
+        Args:
+            plugin: プラグインインスタンス
+            
+        Returns:
+            以前のキーのタプル
+        """
+        if plugin.name == plugin.plugin_id or self.loader.get_metadata(plugin.name) is not None:
+            return ()
+        return (plugin.name,)
+    
+    def _cancel_scheduled(self, plugin: Optional[PluginBase]):
+        """
+        プラグインが予約した処理をすべて取り消す
+        
+        Args:
+            plugin: プラグインインスタンス
+        """
+        if self.scheduler is not None and plugin is not None:
+            self.scheduler.cancel_owner(plugin)
+    
+    def _record_time(self, plugin_name: str, key: str, start: float):
+        """
+        読み込みの各段階の所要時間を記録
+        
+        Args:
+            plugin_name: プラグイン名
+            key: 段階（import_ms, initialize_ms, enable_ms）
+            start: 開始時刻（time.perf_counter()）
+        """
+        self.load_times.setdefault(plugin_name, {})[key] = (time.perf_counter() - start) * 1000
     
     def unload_plugin(self, plugin_name: str) -> bool:
         """
@@ -82,8 +542,28 @@ class PluginManager:
         Returns:
             成功時True
         """
+        # 起動前のスタブは監視を止めるだけ
+        stub = self._stubs.pop(plugin_name, None)
+        if stub is not None:
+            self.activation.unwatch(plugin_name)
+        
+        # 非同期の初期化中のものは初期化を取り消して終了する
+        plugin = self._initializing.pop(plugin_name, None)
+        if plugin is not None:
+            try:
+                plugin.shutdown()
+            except Exception as e:
+                print(f"プラグインの終了処理エラー ({plugin_name}): {e}")
+            finally:
+                self._cancel_scheduled(plugin)
+            if self.store is not None:
+                self.store.release(plugin.plugin_id)
+            self.loader.unload_plugin(plugin_name)
+            self.load_times.pop(plugin_name, None)
+            return True
+        
         if plugin_name not in self._active_plugins:
-            return False
+            return stub is not None
         
         try:
             plugin = self._active_plugins[plugin_name]
@@ -92,14 +572,24 @@ class PluginManager:
             plugin.on_disable()
             plugin.enabled = False
             
-            # 終了処理
-            plugin.shutdown()
+            # 終了処理（予約した処理は after を残さないよう必ず取り消す）
+            try:
+                plugin.shutdown()
+            finally:
+                self._cancel_scheduled(plugin)
+            
+            # 設定を書き出して名前空間を解放
+            if self.store is not None:
+                self.store.release(plugin.plugin_id)
             
             # アクティブリストから削除
             del self._active_plugins[plugin_name]
             
             # ローダーからもアンロード
             self.loader.unload_plugin(plugin_name)
+            self.load_times.pop(plugin_name, None)
+            if self.monitor is not None:
+                self.monitor.forget(plugin_name)
             
             return True
             
@@ -107,6 +597,133 @@ class PluginManager:
             print(f"プラグインのアンロードエラー ({plugin_name}): {e}")
             return False
     
+    def reload_plugin(self, plugin_name: str) -> bool:
+        """
+        プラグインを新しいコードで読み込み直す（ホットリロード）
+        
+        新しいモジュールの読み込みに成功してから古いインスタンスを終了するため、
+        読み込みに失敗した場合は古いインスタンスがそのまま動き続ける。
+        古いインスタンスの snapshot() を新しいインスタンスの restore() に渡す。
+        設定の名前空間は解放せずに引き継ぐ。
+        
+        Args:
+            plugin_name: プラグイン名
+            
+        Returns:
+            成功時True（起動前のスタブは次の起動で新しいコードを読むためTrue）
+        """
+        old = self._active_plugins.get(plugin_name)
+        if old is None:
+            return plugin_name in self._stubs
+        
+        start = time.perf_counter()
+        if isinstance(old, IsolatedPlugin):
+            # ホストプロセスを起動し直して新しいコードを読み込む
+            old.restart()
+            self._emit_reloaded(plugin_name, True, start)
+            return True
+        
+        plugin_class = self.loader.reload_plugin(plugin_name)
+        if plugin_class is None:
+            print(f"プラグインの再読み込みに失敗したため以前のコードで動作を続けます: {plugin_name}")
+            return False
+        
+        state = None
+        try:
+            state = json.loads(json.dumps(old.snapshot()))
+        except Exception as e:
+            print(f"プラグインの状態を引き継げません ({plugin_name}): {e}")
+        
+        try:
+            if old.enabled:
+                old.on_disable()
+            old.enabled = False
+            old.shutdown()
+        except Exception as e:
+            print(f"プラグインの終了処理エラー ({plugin_name}): {e}")
+        self._cancel_scheduled(old)
+        del self._active_plugins[plugin_name]
+        
+        self.load_times.pop(plugin_name, None)
+        
+        def finish(name: str, ok: bool):
+            stub = self._stubs.get(name)
+            if stub is not None:
+                stub.plugin = self._active_plugins.get(name)
+            self._emit_reloaded(name, ok, start)
+        
+        ok = self._instantiate(
+            [plugin_name],
+            {plugin_name: plugin_class},
+            {plugin_name: state},
+            on_ready=finish,
+        )[plugin_name]
+        if plugin_name in self.loader.import_times:
+            self.load_times.setdefault(plugin_name, {})["import_ms"] = self.loader.import_times[plugin_name]
+        
+        # 非同期の初期化の場合は完了後に通知する
+        if plugin_name not in self._initializing:
+            finish(plugin_name, ok)
+        return ok
+    
+    def _emit_reloaded(self, plugin_name: str, success: bool, start: float):
+        """
+        ホットリロードの完了を通知
+        
+        Args:
+            plugin_name: プラグイン名
+            success: 成功したかどうか
+            start: 開始時刻（time.perf_counter()）
+        """
+        duration_ms = (time.perf_counter() - start) * 1000
+        print(f"プラグインを再読み込みしました: {plugin_name} ({duration_ms:.1f}ms)")
+        
+        events = self.app_context.get("events")
+        if events is not None:
+            events.emit("plugin_reloaded", {
+                "plugin_id": plugin_name,
+                "success": success,
+                "duration_ms": duration_ms,
+            })
+    
+    def reload_modified_plugins(self, plugin_names: List[str]) -> List[str]:
+        """
+        読み込んだ後にファイルが変更されたプラグインだけを再読み込み
+        
+        Args:
+            plugin_names: 確認するプラグイン名のリスト
+            
+        Returns:
+            再読み込みしたプラグイン名のリスト
+        """
+        reloaded = []
+        for plugin_name in plugin_names:
+            if plugin_name in self._active_plugins and self.loader.is_modified(plugin_name):
+                if self.reload_plugin(plugin_name):
+                    reloaded.append(plugin_name)
+        return reloaded
+    
+    def resource_usage(self) -> Dict[str, Dict[str, Any]]:
+        """
+        読み込み済みのプラグインごとのリソース使用量を取得
+        
+        Returns:
+            プラグイン名 → 使用量（ResourceMonitor.stats() を参照、集計していない場合は空）。
+            スケジューラーがある場合は予約中の処理の数（scheduled）と間引きの倍率（backoff）を含む
+        """
+        if self.monitor is None:
+            return {}
+        usage = self.monitor.stats(
+            self.list_active_plugins(),
+            self.app_context.get("events"),
+            self.app_context.get("ticker"),
+        )
+        if self.scheduler is not None:
+            for plugin_name, plugin in self._active_plugins.items():
+                usage[plugin_name]["scheduled"] = self.scheduler.jobs(plugin)
+                usage[plugin_name]["backoff"] = self.scheduler.backoff(plugin)
+        return usage
+    
     def get_plugin(self, plugin_name: str) -> Optional[PluginBase]:
         """
         プラグインインスタンスを取得
@@ -131,10 +748,14 @@ class PluginManager:
         """
         plugin = self.get_plugin(plugin_name)
         if plugin is None:
+            if plugin_name in self._stubs:
+                return self.activate(plugin_name)
             return self.load_plugin(plugin_name)
         
         if not plugin.enabled:
             plugin.enabled = True
+            if self.scheduler is not None:
+                self.scheduler.resume_owner(plugin)
             plugin.on_enable()
         
         return True
@@ -156,6 +777,9 @@ class PluginManager:
         if plugin.enabled:
             plugin.on_disable()
             plugin.enabled = False
+            # 無効の間は予約した処理を実行しない
+            if self.scheduler is not None:
+                self.scheduler.pause_owner(plugin)
         
         return True
     
@@ -170,7 +794,7 @@ class PluginManager:
     
     def list_enabled_plugins(self) -> List[str]:
         """
-        有効なプラグイン名のリストを取得
+        有効なプラグイン名のリストを取得（起動トリガーを待っているものを含む）
         
         Returns:
             プラグイン名のリスト
@@ -178,9 +802,11 @@ class PluginManager:
         return [
             name for name, plugin in self._active_plugins.items()
             if plugin.enabled
-        ]
+        ] + self.list_pending_plugins()
     
     def shutdown_all(self):
         """すべてのプラグインを終了"""
-        for plugin_name in list(self._active_plugins.keys()):
+        for plugin_name in list(self._active_plugins.keys()) + list(self._initializing.keys()):
             self.unload_plugin(plugin_name)
+        self._stubs.clear()
+        self.activation.clear()
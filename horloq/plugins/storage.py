@@ -0,0 +1,243 @@
+"""
+プラグイン設定ストア
+"""
+
+import os
+import re
+import threading
+import yaml
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+
+class PluginConfigStore:
+    """
+    プラグインごとの設定・状態ストア
+
+    各プラグインの設定（config）と状態（state）をプラグインごとのYAMLファイルに
+    保存する。名前空間はプラグインが最初に読み込まれた時点で遅延ロードされ、
+    書き込みはflush_delay秒の間まとめてから変更のあった名前空間だけを書き出す。
+    """
+
+    SECTIONS = ("config", "state")
+
+    def __init__(self, store_dir: Path, config_manager=None, flush_delay: float = 1.0):
+        """
+        初期化
+
+        Args:
+            store_dir: 保存先ディレクトリ
+            config_manager: 旧形式（plugins.configs）からの移行元となるConfigManager
+            flush_delay: 書き込みをまとめる待ち時間（秒）
+        """
+        self.store_dir = store_dir
+        self.config_manager = config_manager
+        self.flush_delay = flush_delay
+
+        self._namespaces: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def load(self, plugin_name: str, former_names: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """
+        プラグインの名前空間を読み込む（読み込み済みの場合はキャッシュを返す）
+
+        Args:
+            plugin_name: プラグイン名（プラグインのディレクトリ名）
+            former_names: 以前のキー（plugin.yaml の name で保存していた場合の移行元）
+
+        Returns:
+            {"config": {...}, "state": {...}}
+        """
+        with self._lock:
+            namespace = self._namespaces.get(plugin_name)
+            if namespace is None:
+                namespace = self._read(plugin_name)
+            self._merge_former(plugin_name, namespace, former_names)
+            return namespace
+
+    def _read(self, plugin_name: str) -> Dict[str, Dict[str, Any]]:
+        """名前空間をファイル（ない場合は旧形式の設定）から読み込んで登録"""
+        with self._lock:
+            namespace = {section: {} for section in self.SECTIONS}
+            path = self._path_for(plugin_name)
+
+            if path.exists():
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        loaded = yaml.safe_load(f) or {}
+                    for section in self.SECTIONS:
+                        if isinstance(loaded.get(section), dict):
+                            namespace[section] = loaded[section]
+                except Exception as e:
+                    print(f"プラグイン設定の読み込みに失敗しました ({plugin_name}): {e}")
+            else:
+                self._migrate_legacy(plugin_name, namespace)
+
+            self._namespaces[plugin_name] = namespace
+            return namespace
+
+    def release(self, plugin_name: str):
+        """
+        プラグインの名前空間を書き出してメモリから解放
+
+        Args:
+            plugin_name: プラグイン名
+        """
+        with self._lock:
+            if plugin_name in self._dirty:
+                self._write(plugin_name)
+            self._namespaces.pop(plugin_name, None)
+
+    def get(self, plugin_name: str, key: str, default: Any = None, section: str = "config") -> Any:
+        """
+        値を取得
+
+        Args:
+            plugin_name: プラグイン名
+            key: キー
+            default: デフォルト値
+            section: "config" または "state"
+
+        Returns:
+            値
+        """
+        return self.load(plugin_name)[section].get(key, default)
+
+    def set(self, plugin_name: str, key: str, value: Any, section: str = "config"):
+        """
+        値を設定（書き込みはまとめて遅延実行）
+
+        Args:
+            plugin_name: プラグイン名
+            key: キー
+            value: 値
+            section: "config" または "state"
+        """
+        with self._lock:
+            namespace = self.load(plugin_name)
+            if key in namespace[section] and namespace[section][key] == value:
+                return
+            namespace[section][key] = value
+            self._mark_dirty(plugin_name)
+
+    def flush(self):
+        """変更のあった名前空間をすべて書き出す"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for plugin_name in list(self._dirty):
+                self._write(plugin_name)
+
+    def _mark_dirty(self, plugin_name: str):
+        """名前空間を変更済みにして書き込みを予約"""
+        self._dirty.add(plugin_name)
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write(self, plugin_name: str):
+        """名前空間をファイルへ書き出す（一時ファイル経由で置き換え）"""
+        self._dirty.discard(plugin_name)
+        namespace = self._namespaces.get(plugin_name)
+        if namespace is None:
+            return
+
+        data = {section: deepcopy(values) for section, values in namespace.items() if values}
+        path = self._path_for(plugin_name)
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".yaml.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"プラグイン設定の保存に失敗しました ({plugin_name}): {e}")
+
+    def _merge_former(
+        self,
+        plugin_name: str,
+        namespace: Dict[str, Dict[str, Any]],
+        former_names: Iterable[str],
+    ):
+        """
+        以前のキーで保存したファイルを新しいキーの名前空間に取り込んで削除
+
+        新しいキーにすでにある値を優先する。
+
+        Args:
+            plugin_name: 新しいキー
+            namespace: 新しいキーの名前空間
+            former_names: 以前のキー
+        """
+        for former_name in former_names:
+            if former_name == plugin_name or former_name in self._namespaces:
+                continue
+            former_path = self._path_for(former_name)
+            if former_path == self._path_for(plugin_name) or not former_path.exists():
+                continue
+            try:
+                with open(former_path, "r", encoding="utf-8") as f:
+                    former = yaml.safe_load(f) or {}
+                for section in self.SECTIONS:
+                    if isinstance(former.get(section), dict):
+                        namespace[section] = {**former[section], **namespace[section]}
+                self._write(plugin_name)
+                former_path.unlink()
+                print(f"プラグイン設定を移行しました: {former_name} → {plugin_name}")
+            except Exception as e:
+                print(f"プラグイン設定の移行に失敗しました ({former_name}): {e}")
+        for former_name in former_names:
+            if former_name != plugin_name:
+                self._migrate_legacy(former_name, namespace, plugin_name)
+
+    def _migrate_legacy(
+        self,
+        legacy_name: str,
+        namespace: Dict[str, Dict[str, Any]],
+        plugin_name: Optional[str] = None,
+    ) -> bool:
+        """
+        config.yaml の plugins.configs から設定を移行
+
+        Args:
+            legacy_name: plugins.configs のキー
+            namespace: 移行先の名前空間
+            plugin_name: 移行先のキー（Noneの場合は legacy_name）
+
+        Returns:
+            移行した場合True
+        """
+        if self.config_manager is None:
+            return False
+        plugin_name = plugin_name or legacy_name
+
+        legacy_configs = self.config_manager.get("plugins.configs", {})
+        if not isinstance(legacy_configs, dict) or legacy_name not in legacy_configs:
+            return False
+
+        legacy = legacy_configs.get(legacy_name)
+        if isinstance(legacy, dict):
+            namespace["config"].update(deepcopy(legacy))
+            self._write_now(plugin_name, namespace)
+
+        # 移行済みの設定は config.yaml から取り除く
+        remaining = {k: v for k, v in legacy_configs.items() if k != legacy_name}
+        self.config_manager.set("plugins.configs", remaining, layer="user")
+        self.config_manager.save()
+        print(f"プラグイン設定を移行しました: {legacy_name}")
+        return True
+
+    def _write_now(self, plugin_name: str, namespace: Dict[str, Dict[str, Any]]):
+        """名前空間を登録して即座に書き出す"""
+        self._namespaces[plugin_name] = namespace
+        self._write(plugin_name)
+
+    def _path_for(self, plugin_name: str) -> Path:
+        """プラグイン名から保存先ファイルのパスを取得"""
+        safe_name = re.sub(r"[^\w.-]", "_", plugin_name) or "_"
+        return self.store_dir / f"{safe_name}.yaml"
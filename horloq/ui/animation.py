@@ -0,0 +1,302 @@
+"""
+フレーム予算付きアニメーションエンジン
+"""
+
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from ..core.palette import mix
+
+
+def linear(t: float) -> float:
+    """等速"""
+    return t
+
+
+def ease_out_cubic(t: float) -> float:
+    """終わりに向けて減速"""
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out(t: float) -> float:
+    """始めと終わりで減速"""
+    return 4 * t ** 3 if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+
+@lru_cache(maxsize=256)
+def color_ramp(start: str, end: str, steps: int) -> Tuple[str, ...]:
+    """
+    2色の間の補間色を事前計算
+
+    Args:
+        start: 開始色
+        end: 終了色
+        steps: 色の数（開始色と終了色を含む）
+
+    Returns:
+        補間色のタプル（16進カラーでない色の場合は終了色のみ）
+    """
+    if start == end or steps < 2:
+        return (end,)
+    try:
+        return tuple(mix(start, end, i / (steps - 1)) for i in range(steps))
+    except (ValueError, AttributeError):
+        return (end,)
+
+
+@dataclass
+class Tween:
+    """
+    1本のアニメーション
+
+    進行度（0〜1、イージング適用済み）を毎フレーム on_frame に渡す。
+    """
+
+    duration: float
+    on_frame: Callable[[float], None]
+    easing: Callable[[float], float] = ease_out_cubic
+    on_done: Optional[Callable[[], None]] = None
+    start: float = field(default_factory=time.monotonic)
+
+    def progress(self, now: float) -> float:
+        """経過時間からの進行度（0〜1、イージング前）"""
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.start) / self.duration))
+
+
+class Animator:
+    """
+    アニメーションのタイムライン
+
+    実行中のアニメーションをすべて1つのフレームタイマー（Tkのafter）で駆動する。
+    タイマーはアニメーションがある間だけ動き、何もない時はコストがかからない。
+    進行度は経過時間から計算するため、時計の更新などでフレームが遅れても
+    アニメーションの長さは変わらない。1フレームの処理が予算を超えた場合は
+    次のフレームを間引く。
+    """
+
+    def __init__(self, root=None, fps: int = 60, frame_budget: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            root: Tkのルートウィンドウ（後から bind_root で設定可能）
+            fps: 目標フレームレート
+            frame_budget: 1フレームの処理時間の上限（秒、Noneの場合はフレーム間隔）
+        """
+        self._root = root
+        self.frame_interval = 1.0 / fps
+        self.frame_budget = frame_budget if frame_budget is not None else self.frame_interval
+
+        self._tweens: Dict[object, Tween] = {}
+        self._job: Optional[str] = None
+        self.skipped_frames = 0
+
+    def bind_root(self, root):
+        """
+        フレームタイマーに使うルートウィンドウを設定
+
+        Args:
+            root: Tkのルートウィンドウ
+        """
+        self._root = root
+
+    @property
+    def active(self) -> bool:
+        """実行中のアニメーションがあるかどうか"""
+        return bool(self._tweens)
+
+    def animate(
+        self,
+        duration: float,
+        on_frame: Callable[[float], None],
+        easing: Callable[[float], float] = ease_out_cubic,
+        on_done: Optional[Callable[[], None]] = None,
+        key: Optional[object] = None,
+    ) -> object:
+        """
+        アニメーションを開始
+
+        同じキーのアニメーションが実行中の場合は置き換える（完了時の処理は呼ばれない）。
+        ルートウィンドウがない場合や duration が0以下の場合は即座に最終状態にする。
+
+        Args:
+            duration: 長さ（秒）
+            on_frame: 進行度（0〜1）を受け取るコールバック
+            easing: イージング関数
+            on_done: 完了時のコールバック
+            key: アニメーションのキー（Noneの場合は新しいキーを発行）
+
+        Returns:
+            アニメーションのキー
+        """
+        if key is None:
+            key = object()
+        self._tweens.pop(key, None)
+
+        tween = Tween(duration, on_frame, easing, on_done)
+        if self._root is None or duration <= 0:
+            self._finish(tween)
+            return key
+
+        self._tweens[key] = tween
+        if self._job is None:
+            self._job = self._root.after(int(self.frame_interval * 1000), self._tick)
+        return key
+
+    def cancel(self, key: object, finish: bool = False):
+        """
+        アニメーションを中止
+
+        Args:
+            key: アニメーションのキー
+            finish: Trueの場合は最終状態にして完了時の処理を呼ぶ
+        """
+        tween = self._tweens.pop(key, None)
+        if tween is not None and finish:
+            self._finish(tween)
+        self._stop_if_idle()
+
+    def cancel_all(self):
+        """すべてのアニメーションを中止"""
+        self._tweens.clear()
+        self._stop_if_idle()
+
+    def slide_in(self, frame, duration: float = 0.25, key: Optional[object] = None) -> object:
+        """
+        パック済みのフレームを高さ0から本来の高さまで広げる
+
+        Args:
+            frame: 対象のフレーム（pack済み）
+            duration: 長さ（秒）
+            key: アニメーションのキー
+
+        Returns:
+            アニメーションのキー
+        """
+        frame.pack_propagate(False)
+        frame.configure(height=1)
+        target: List[int] = []
+
+        def on_frame(t: float):
+            if not target:
+                height = self._natural_height(frame)
+                if height <= 1:
+                    return  # まだ子ウィジェットの大きさが決まっていない
+                target.append(height)
+            frame.configure(height=max(1, round(target[0] * t)))
+
+        return self.animate(
+            duration, on_frame,
+            on_done=lambda: frame.pack_propagate(True),
+            key=key,
+        )
+
+    def slide_out(self, frame, duration: float = 0.2, on_done: Optional[Callable[[], None]] = None,
+                  key: Optional[object] = None) -> object:
+        """
+        フレームを現在の高さから0まで縮める
+
+        Args:
+            frame: 対象のフレーム（pack済み）
+            duration: 長さ（秒）
+            on_done: 完了時のコールバック（フレームの破棄など）
+            key: アニメーションのキー
+
+        Returns:
+            アニメーションのキー
+        """
+        start_height = frame.winfo_height()
+        frame.pack_propagate(False)
+        frame.configure(height=start_height)
+
+        return self.animate(
+            duration,
+            lambda t: frame.configure(height=max(1, round(start_height * (1 - t)))),
+            easing=ease_in_out,
+            on_done=on_done,
+            key=key,
+        )
+
+    @staticmethod
+    def _natural_height(frame) -> int:
+        """pack された子ウィジェットから、フレーム本来の高さを求める"""
+        height = 0
+        for child in frame.winfo_children():
+            try:
+                pady = [int(float(v)) for v in str(child.pack_info().get("pady", 0)).split()]
+            except Exception:
+                continue
+            padding = pady[0] * 2 if len(pady) == 1 else sum(pady)
+            height = max(height, child.winfo_reqheight() + padding)
+
+        try:
+            height += int(frame.cget("border_width")) * 2
+        except Exception:
+            pass
+        return height
+
+    def _tick(self):
+        """1フレームを進める"""
+        self._job = None
+        frame_start = time.monotonic()
+
+        for key, tween in list(self._tweens.items()):
+            if self._tweens.get(key) is not tween:
+                continue  # このフレーム内で置き換え・中止された
+            raw = tween.progress(frame_start)
+            try:
+                tween.on_frame(tween.easing(raw))
+            except Exception as e:
+                print(f"アニメーションエラー: {e}")
+                self._tweens.pop(key, None)
+                continue
+            if raw >= 1.0:
+                self._tweens.pop(key, None)
+                self._call_done(tween)
+
+        if not self._tweens or self._root is None:
+            return
+
+        # 予算を超えた場合は、超過分のフレームを飛ばす
+        cost = time.monotonic() - frame_start
+        frames = 1
+        if cost > self.frame_budget:
+            frames += int(cost / self.frame_interval)
+            self.skipped_frames += frames - 1
+
+        try:
+            self._job = self._root.after(int(self.frame_interval * frames * 1000), self._tick)
+        except Exception:
+            # ウィンドウが破棄された
+            self._tweens.clear()
+
+    def _finish(self, tween: Tween):
+        """最終状態にして完了時の処理を呼ぶ"""
+        try:
+            tween.on_frame(1.0)
+        except Exception as e:
+            print(f"アニメーションエラー: {e}")
+        self._call_done(tween)
+
+    @staticmethod
+    def _call_done(tween: Tween):
+        """完了時のコールバックを呼ぶ"""
+        if tween.on_done is None:
+            return
+        try:
+            tween.on_done()
+        except Exception as e:
+            print(f"アニメーションエラー: {e}")
+
+    def _stop_if_idle(self):
+        """アニメーションがなくなったらフレームタイマーを止める"""
+        if self._tweens or self._job is None:
+            return
+        try:
+            self._root.after_cancel(self._job)
+        except Exception:
+            pass
+        self._job = None
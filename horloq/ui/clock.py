@@ -23,6 +23,7 @@ class DigitalClock(ctk.CTkFrame):
         date_format: str = "%Y/%m/%d",
         font_size: int = 48,
         font_family: str = "Arial",
+        ticker=None,
         **kwargs
     ):
         """
@@ -36,6 +37,7 @@ class DigitalClock(ctk.CTkFrame):
             show_date: 日付を表示するかどうか
             date_format: 日付フォーマット
             font_size: フォントサイズ
+            ticker: 共有のTicker（Noneの場合は自前のタイマーで更新）
             **kwargs: その他のフレームオプション
         """
         super().__init__(master, **kwargs)
@@ -50,11 +52,37 @@ class DigitalClock(ctk.CTkFrame):
         self.font_size = font_size
         self.font_family = font_family
         
+        self.ticker = ticker
         self._update_job: Optional[str] = None
+        self._tick_token: Optional[int] = None
+        self._tick_interval: Optional[int] = None
         
         self._setup_ui()
         self._start_update()
     
+    @staticmethod
+    def options_from_config(settings: dict) -> dict:
+        """
+        設定の clock セクションからコンストラクタの引数を作成
+        
+        Args:
+            settings: clock セクションの辞書
+            
+        Returns:
+            DigitalClock に渡すキーワード引数
+        """
+        return {
+            "timezone": settings.get("timezone", "Asia/Tokyo"),
+            "format_24h": settings.get("format", "24h") == "24h",
+            "show_seconds": settings.get("show_seconds", True),
+            "show_milliseconds": settings.get("show_milliseconds", False),
+            "show_date": settings.get("show_date", True),
+            "show_weekday": settings.get("show_weekday", True),
+            "date_format": settings.get("date_format", "%Y/%m/%d"),
+            "font_size": settings.get("font_size", 48),
+            "font_family": settings.get("font_family", "Arial"),
+        }
+    
     def _setup_ui(self):
         """UIをセットアップ"""
         # 時刻ラベル
@@ -98,11 +126,27 @@ class DigitalClock(ctk.CTkFrame):
         
         # 日付ラベルの色を設定
         if self.show_date and hasattr(self, 'date_label'):
-            self.date_label.configure(text_color=theme.fg_secondary or theme.fg)
+            self.date_label.configure(text_color=theme.fg_secondary)
         
         # 曜日ラベルの色を設定
         if self.show_weekday and hasattr(self, 'weekday_label'):
-            self.weekday_label.configure(text_color=theme.fg_secondary or theme.fg)
+            self.weekday_label.configure(text_color=theme.fg_secondary)
+    
+    def bind_styles(self, styles):
+        """
+        ラベルのテーマロールを登録（テーマ切り替え時は差分のみ再設定される）
+        
+        Args:
+            styles: StyleRegistry
+        """
+        self.configure(fg_color="transparent")
+        styles.register(self.time_label, text_color="fg")
+        
+        if hasattr(self, 'date_label'):
+            styles.register(self.date_label, text_color="fg_secondary")
+        
+        if hasattr(self, 'weekday_label'):
+            styles.register(self.weekday_label, text_color="fg_secondary")
     
     def _update_time(self):
         """時刻を更新"""
@@ -133,19 +177,39 @@ class DigitalClock(ctk.CTkFrame):
             weekday_names = ["月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日"]
             weekday_str = weekday_names[now.weekday()]
             self.weekday_label.configure(text=weekday_str)
+        
+        # ミリ秒表示の切り替えに合わせて購読間隔を変更
+        if self._tick_token is not None and self._tick_interval != self._interval():
+            self._subscribe()
+    
+    def _interval(self) -> int:
+        """更新間隔（ミリ秒表示時は100ms、通常は1秒）"""
+        return 100 if self.show_milliseconds else 1000
     
     def _start_update(self):
         """更新を開始"""
+        if self.ticker is not None:
+            self._update_time()
+            self._subscribe()
+            return
+        
         self._update_time()
-        # ミリ秒表示時は100ms、通常は1秒ごとに更新
-        interval = 100 if self.show_milliseconds else 1000
-        self._update_job = self.after(interval, self._start_update)
+        self._update_job = self.after(self._interval(), self._start_update)
+    
+    def _subscribe(self):
+        """共有のTickerを購読（購読中の場合は間隔を更新）"""
+        self.ticker.unsubscribe(self._tick_token)
+        self._tick_interval = self._interval()
+        self._tick_token = self.ticker.subscribe(lambda now: self._update_time(), self._tick_interval)
     
     def stop_update(self):
         """更新を停止"""
         if self._update_job is not None:
             self.after_cancel(self._update_job)
             self._update_job = None
+        if self._tick_token is not None:
+            self.ticker.unsubscribe(self._tick_token)
+            self._tick_token = None
     
     def set_timezone(self, timezone: str):
         """
@@ -0,0 +1,159 @@
+"""
+追加の時計ウィンドウ
+"""
+
+import customtkinter as ctk
+from typing import Any, Callable, Dict, Optional
+from .clock import DigitalClock
+from .geometry import GeometryTracker
+
+
+class ClockWindow(ctk.CTkToplevel):
+    """
+    同じプロセス内で動く追加の時計ウィンドウ
+
+    設定の windows に並んだエントリごとに作成される。ティックソース、
+    イベントバス、テーマ（StyleRegistry）、プラグインのインスタンスは
+    メインウィンドウと共有し、ウィンドウと時計の設定だけを個別に持つ。
+    """
+
+    def __init__(
+        self,
+        master,
+        spec: Dict[str, Any],
+        clock_defaults: Dict[str, Any],
+        styles,
+        ticker,
+        plugins=None,
+        on_close: Optional[Callable[["ClockWindow"], None]] = None,
+        on_geometry: Optional[Callable[["ClockWindow", Dict[str, int]], None]] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            master: メインウィンドウ
+            spec: windows のエントリ（name, window, clock, plugins）
+            clock_defaults: 共通の clock セクション（spec の clock で上書きされる）
+            styles: StyleRegistry
+            ticker: 共有のTicker
+            plugins: PluginManager（spec の plugins に挙げたウィジェットを表示する場合）
+            on_close: ウィンドウを閉じたときのコールバック
+            on_geometry: 移動・リサイズが落ち着いたときに (ウィンドウ, 変化した値) で呼ばれる
+        """
+        super().__init__(master)
+
+        self.spec = spec
+        self.name = str(spec.get("name", "clock"))
+        self.styles = styles
+        self.on_close = on_close
+        # 作成時に増えたPythonオブジェクトのメモリ（バイト、HorloqApp が計測する）
+        self.memory_bytes: Optional[int] = None
+
+        self._setup_window(spec.get("window") or {})
+        self.styles.register(self, fg_color="bg")
+
+        clock_settings = {**clock_defaults, **(spec.get("clock") or {})}
+        self.clock_widget = DigitalClock(
+            self,
+            ticker=ticker,
+            fg_color="transparent",
+            **DigitalClock.options_from_config(clock_settings),
+        )
+        self.clock_widget.pack(fill="both", expand=True, padx=10, pady=10)
+        self.clock_widget.bind_styles(styles)
+
+        # プラグイン名 → 表示中のウィジェット
+        self.plugin_widgets: Dict[str, Any] = {}
+        if plugins is not None:
+            self._create_plugin_widgets(plugins, spec.get("plugins") or [])
+
+        self.geometry_tracker: Optional[GeometryTracker] = None
+        if on_geometry is not None:
+            self.geometry_tracker = GeometryTracker(self, lambda changed: on_geometry(self, changed))
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _setup_window(self, window_settings: Dict[str, Any]):
+        """ウィンドウをセットアップ"""
+        self.title(f"Horloq - {self.name}")
+
+        width = window_settings.get("width", 400)
+        height = window_settings.get("height", 200)
+        x = window_settings.get("x")
+        y = window_settings.get("y")
+        if x is not None and y is not None:
+            self.geometry(f"{width}x{height}+{x}+{y}")
+        else:
+            self.geometry(f"{width}x{height}")
+
+        if window_settings.get("always_on_top", True):
+            self.attributes("-topmost", True)
+        self.attributes("-alpha", window_settings.get("opacity", 1.0))
+
+    def _create_plugin_widgets(self, plugins, plugin_names):
+        """
+        プラグインのウィジェットを表示（プラグインのインスタンスはメインウィンドウと共有）
+
+        create_widget が1つのウィジェットだけを前提にしているプラグインは、2つ目を作ると
+        メインウィンドウのウィジェットが更新されなくなるため、multi_window のものだけを表示する。
+
+        Args:
+            plugins: PluginManager
+            plugin_names: 表示するプラグイン名のリスト
+        """
+        for plugin_name in plugin_names:
+            plugin = plugins.get_plugin(plugin_name)
+            if not plugin or not plugin.enabled:
+                continue
+            if not getattr(plugin, "multi_window", False):
+                print(f"複数のウィンドウに対応していないプラグインのため表示しません ({self.name}/{plugin_name})")
+                continue
+            self._add_plugin_widget(plugin_name, plugin)
+    
+    def _add_plugin_widget(self, plugin_name: str, plugin, before=None):
+        """
+        プラグインのウィジェットを作成して配置
+        
+        Args:
+            plugin_name: プラグイン名
+            plugin: プラグインのインスタンス
+            before: このウィジェットの前に配置する（Noneの場合は末尾）
+        """
+        try:
+            widget = plugin.create_widget(self)
+            if widget:
+                self.styles.adopt_tree(widget)
+                pack_options = {"fill": "x", "padx": 10, "pady": (0, 10)}
+                if before is not None:
+                    pack_options["before"] = before
+                widget.pack(**pack_options)
+                self.plugin_widgets[plugin_name] = widget
+        except Exception as e:
+            print(f"プラグインウィジェットの表示エラー ({self.name}/{plugin_name}): {e}")
+    
+    def replace_plugin_widget(self, plugin_name: str, plugin):
+        """
+        プラグインのウィジェットを同じ位置で作り直す（ホットリロード後）
+        
+        Args:
+            plugin_name: プラグイン名
+            plugin: 新しいプラグインのインスタンス
+        """
+        old = self.plugin_widgets.pop(plugin_name, None)
+        if old is None:
+            return
+        if plugin is not None and plugin.enabled and getattr(plugin, "multi_window", False):
+            self._add_plugin_widget(plugin_name, plugin, before=old)
+        try:
+            old.destroy()
+        except Exception:
+            pass
+
+    def _on_close(self):
+        """ウィンドウを閉じる処理"""
+        if self.geometry_tracker is not None:
+            self.geometry_tracker.flush()
+        if self.on_close:
+            self.on_close(self)
+        self.destroy()
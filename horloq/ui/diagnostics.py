@@ -0,0 +1,147 @@
+"""
+UIスレッドの停止の記録の表示
+"""
+
+import customtkinter as ctk
+from datetime import datetime
+from typing import Any, Dict, Optional
+from ..core.watchdog import KIND_CORE, KIND_LISTENER, KIND_PLUGIN, MainThreadWatchdog
+
+
+class StallReportWindow(ctk.CTkToplevel):
+    """UIスレッドの停止の原因を停止時間の合計の多い順に表示するウィンドウ"""
+
+    # 原因の種類の表示名
+    KIND_LABELS = {
+        KIND_PLUGIN: "プラグイン",
+        KIND_LISTENER: "リスナー",
+        KIND_CORE: "本体",
+    }
+
+    # 表示する原因の件数
+    LIMIT = 20
+
+    def __init__(self, master, watchdog: MainThreadWatchdog):
+        """
+        初期化
+
+        Args:
+            master: 親ウィンドウ
+            watchdog: UIスレッドの監視
+        """
+        super().__init__(master)
+
+        self.watchdog = watchdog
+        self._refresh_job: Optional[str] = None
+
+        self._setup_window()
+        self._create_widgets()
+        self._refresh()
+
+    def _setup_window(self):
+        """ウィンドウをセットアップ"""
+        self.title("応答停止の記録")
+        self.geometry("640x480")
+        self.minsize(480, 320)
+        self.transient(self.master)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def _create_widgets(self):
+        """ウィジェットを作成"""
+        title_label = ctk.CTkLabel(
+            self,
+            text="応答停止の記録",
+            font=("Arial", 20, "bold"),
+        )
+        title_label.pack(pady=(20, 5))
+
+        self.summary_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=("Arial", 12),
+        )
+        self.summary_label.pack(pady=(0, 10))
+
+        self.textbox = ctk.CTkTextbox(self, font=("Consolas", 11), wrap="none")
+        self.textbox.pack(fill="both", expand=True, padx=20)
+
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.pack(fill="x", padx=20, pady=20)
+
+        close_btn = ctk.CTkButton(
+            button_frame,
+            text="閉じる",
+            command=self.destroy,
+            width=120,
+            height=35,
+        )
+        close_btn.pack(side="right", padx=5)
+
+        reset_btn = ctk.CTkButton(
+            button_frame,
+            text="リセット",
+            command=self._reset,
+            fg_color="gray",
+            hover_color="darkgray",
+            width=120,
+            height=35,
+        )
+        reset_btn.pack(side="right", padx=5)
+
+    def _refresh(self):
+        """表示を更新（2秒ごと）"""
+        self._refresh_job = None
+        report = self.watchdog.report(limit=self.LIMIT)
+        self.summary_label.configure(text=self.format_summary(report))
+
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", self.format_offenders(report))
+        self.textbox.configure(state="disabled")
+
+        self._refresh_job = self.after(2000, self._refresh)
+
+    def _reset(self):
+        """集計を破棄して表示を更新"""
+        self.watchdog.reset()
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+        self._refresh()
+
+    @staticmethod
+    def format_summary(report: Dict[str, Any]) -> str:
+        """停止の回数と合計時間の表示用の文字列"""
+        text = (
+            f"{report['threshold_ms']}ms 以上の停止: {report['stalls']} 回 / "
+            f"合計 {report['blocked_ms'] / 1000:.1f} 秒"
+        )
+        current = report.get("current")
+        if current:
+            text += f"（停止中: {current['name']}）"
+        return text
+
+    @classmethod
+    def format_offenders(cls, report: Dict[str, Any]) -> str:
+        """原因ごとの集計の表示用の文字列"""
+        offenders = report.get("offenders", [])
+        if not offenders:
+            return "停止は記録されていません"
+
+        lines = [f"{'合計':>9}{'最大':>9}{'回数':>6}  {'種類':<6}原因", "-" * 72]
+        for offender in offenders:
+            last_at = datetime.fromtimestamp(offender["last_at"]).strftime("%H:%M:%S")
+            lines.append(
+                f"{offender['total_ms']:>7.0f}ms{offender['max_ms']:>7.0f}ms{offender['count']:>6}  "
+                f"{cls.KIND_LABELS.get(offender['kind'], offender['kind']):<6}{offender['name']}"
+                f"  (最終 {last_at})"
+            )
+            for frame in offender.get("stack", [])[:3]:
+                lines.append(f"{'':>26}  {frame}")
+        return "\n".join(lines)
+
+    def destroy(self):
+        """ウィンドウを破棄（表示の更新を止める）"""
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        super().destroy()
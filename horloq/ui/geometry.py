@@ -0,0 +1,82 @@
+"""
+ウィンドウ位置・サイズの追跡
+"""
+
+from typing import Callable, Dict, Optional
+
+
+class GeometryTracker:
+    """
+    ウィンドウの移動・リサイズを追跡し、落ち着いてから通知する
+
+    ドラッグ中は <Configure> が連続して発生するため、delay_ms の間
+    変化がなくなるまで待ってから、変わった値だけを on_settled に渡す。
+    """
+
+    def __init__(
+        self,
+        window,
+        on_settled: Callable[[Dict[str, int]], None],
+        delay_ms: int = 500,
+    ):
+        """
+        初期化
+
+        Args:
+            window: 対象のトップレベルウィンドウ
+            on_settled: 変化した値（x, y, width, height のうち変わったもの）を受け取るコールバック
+            delay_ms: 変化が落ち着いたとみなすまでの時間（ミリ秒）
+        """
+        self.window = window
+        self.on_settled = on_settled
+        self.delay_ms = delay_ms
+
+        self._job: Optional[str] = None
+        self._last: Dict[str, int] = {}
+
+        window.bind("<Configure>", self._on_configure, add="+")
+
+    def current(self) -> Dict[str, int]:
+        """現在の位置とサイズ"""
+        return {
+            "x": self.window.winfo_x(),
+            "y": self.window.winfo_y(),
+            "width": self.window.winfo_width(),
+            "height": self.window.winfo_height(),
+        }
+
+    def flush(self):
+        """待機中の通知があれば即座に行う（終了時など）"""
+        if self._job is not None:
+            try:
+                self.window.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+        self._settle()
+
+    def _on_configure(self, event):
+        """位置・サイズの変化（子ウィジェットのイベントは無視）"""
+        if event.widget is not self.window:
+            return
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+        self._job = self.window.after(self.delay_ms, self._settle)
+
+    def _settle(self):
+        """変化した値だけを通知"""
+        self._job = None
+        try:
+            geometry = self.current()
+        except Exception:
+            return  # ウィンドウが破棄された
+
+        changed = {key: value for key, value in geometry.items() if self._last.get(key) != value}
+        if not changed:
+            return
+        self._last = geometry
+
+        try:
+            self.on_settled(changed)
+        except Exception as e:
+            print(f"ウィンドウ位置の保存に失敗しました: {e}")
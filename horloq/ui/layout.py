@@ -0,0 +1,164 @@
+"""
+ウィンドウサイズのレイアウト管理
+"""
+
+import tkinter
+from typing import Dict, Optional, Set, Tuple
+
+
+class WindowLayout:
+    """
+    ウィンドウの高さを子ウィジェットの要求サイズから求めるレイアウト管理
+
+    追跡しているウィジェットごとに要求サイズ（winfo_reqheight）をキャッシュし、
+    サイズが変わったウィジェットだけを測り直して合計を差分で更新する。
+    ジオメトリの変更はアイドル時に1回だけ適用し、update_idletasks による
+    同期的な再描画は行わない。
+    """
+
+    def __init__(self, window, width: int, extra_height: int = 0):
+        """
+        初期化
+
+        Args:
+            window: 対象のウィンドウ
+            width: ウィンドウの幅
+            extra_height: 追跡対象以外の固定の余白（ピクセル）
+        """
+        self.window = window
+        self.width = width
+        self.extra_height = extra_height
+
+        # パス名 → (ウィジェット, 余白)
+        self._items: Dict[str, Tuple[object, int]] = {}
+        # パス名 → キャッシュした高さ（余白込み）
+        self._heights: Dict[str, int] = {}
+        self._total = 0
+
+        self._dirty: Set[str] = set()
+        self._job: Optional[str] = None
+        self._applied: Optional[Tuple[int, int]] = None
+
+    @property
+    def height(self) -> int:
+        """現在のキャッシュから求めたウィンドウの高さ"""
+        return self._total + self.extra_height
+
+    def track(self, widget, padding: int = 0):
+        """
+        ウィジェットを追跡対象に追加
+
+        Args:
+            widget: ウィジェット
+            padding: ウィジェットの外側の縦方向の余白（pack の pady の合計）
+        """
+        key = str(widget)
+        if key in self._items:
+            self._remove(key)
+
+        self._items[key] = (widget, padding)
+        self._heights[key] = 0
+
+        # 実際のサイズが変わったとき・破棄されたときに測り直す
+        tkinter.Misc.bind(widget, "<Configure>", lambda e, k=key: self.invalidate_key(k), "+")
+        tkinter.Misc.bind(widget, "<Destroy>", lambda e, k=key: self._on_destroy(k), "+")
+
+        self.invalidate_key(key)
+
+    def untrack(self, widget):
+        """
+        ウィジェットを追跡対象から外す
+
+        Args:
+            widget: ウィジェット
+        """
+        self._remove(str(widget))
+        self.request()
+
+    def invalidate(self, widget):
+        """
+        ウィジェットの要求サイズが変わったことを通知
+
+        Args:
+            widget: ウィジェット
+        """
+        self.invalidate_key(str(widget))
+
+    def invalidate_key(self, key: str):
+        """パス名を指定して測り直しを予約"""
+        if key in self._items:
+            self._dirty.add(key)
+            self.request()
+
+    def set_width(self, width: int):
+        """
+        ウィンドウの幅を変更
+
+        Args:
+            width: 幅
+        """
+        if width != self.width:
+            self.width = width
+            self.request()
+
+    def reapply(self):
+        """ウィンドウのサイズが外部から変更された場合に、次のアイドル時に再適用する"""
+        self._applied = None
+        self.request()
+
+    def request(self):
+        """アイドル時のジオメトリ適用を予約（予約済みの場合は何もしない）"""
+        if self._job is None:
+            try:
+                self._job = self.window.after_idle(self._apply)
+            except Exception:
+                self._job = None
+
+    def _apply(self):
+        """変更のあったウィジェットだけを測り直し、ジオメトリを適用"""
+        self._job = None
+
+        dirty, self._dirty = self._dirty, set()
+        changed = []
+        for key in dirty:
+            item = self._items.get(key)
+            if item is None:
+                continue
+            widget, padding = item
+            try:
+                height = widget.winfo_reqheight() + padding
+            except Exception:
+                self._remove(key)
+                continue
+            if height != self._heights[key]:
+                self._total += height - self._heights[key]
+                self._heights[key] = height
+                changed.append(key)
+
+        # 入れ子のウィジェットの要求サイズは1アイドルずつ伝わるため、
+        # サイズが変わったものは次のアイドルでもう一度確認する
+        if changed:
+            self._dirty.update(changed)
+            self.request()
+
+        size = (self.width, self.height)
+        if size == self._applied:
+            return
+        self._applied = size
+
+        try:
+            self.window.geometry(f"{size[0]}x{size[1]}")
+        except Exception:
+            pass
+
+    def _on_destroy(self, key: str):
+        """追跡中のウィジェットが破棄された"""
+        if key in self._items:
+            self._remove(key)
+            self.request()
+
+    def _remove(self, key: str):
+        """追跡情報を削除"""
+        self._items.pop(key, None)
+        self._dirty.discard(key)
+        self._total -= self._heights.pop(key, 0)
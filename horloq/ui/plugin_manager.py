@@ -3,7 +3,7 @@
 """
 
 import customtkinter as ctk
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Optional
 from pathlib import Path
 from ..plugins.manager import PluginManager
 from ..plugins.installer import PluginInstaller
@@ -17,6 +17,7 @@ class PluginManagerWindow(ctk.CTkToplevel):
         master,
         plugin_manager: PluginManager,
         on_plugin_changed: Optional[Callable] = None,
+        installer: Optional[PluginInstaller] = None,
     ):
         """
         初期化
@@ -25,24 +26,38 @@ class PluginManagerWindow(ctk.CTkToplevel):
             master: 親ウィンドウ
             plugin_manager: プラグインマネージャー
             on_plugin_changed: プラグイン変更時のコールバック
+            installer: プラグインインストーラー（Noneの場合は共有設定から作成）
         """
         super().__init__(master)
         
         self.plugin_manager = plugin_manager
         self.on_plugin_changed = on_plugin_changed
         
-        # プラグインインストーラーを初期化
-        from ..core.config import ConfigManager
-        config = ConfigManager()
-        plugin_dir = config.config_path.parent / "plugins"
-        self.installer = PluginInstaller(plugin_dir)
+        # プラグインインストーラーを初期化（設定はアプリと共有のものを使う）
+        if installer is None:
+            config = plugin_manager.app_context["config"]
+            installer = PluginInstaller(
+                config.config_path.parent / "plugins",
+                index=plugin_manager.loader.index,
+                bytecode_cache=plugin_manager.loader.bytecode_cache,
+                dependency_roots=plugin_manager.loader.dependency_roots,
+                install_format=config.get("plugins.install_format", "directory"),
+            )
+        self.installer = installer
         
         # 更新情報をキャッシュ
         self.available_updates = {}
         self._fetch_updates()
         
+        # プラグイン名 → 一覧の行
+        self._plugin_items: Dict[str, ctk.CTkFrame] = {}
+        # プラグイン名 → リソース使用量のラベル
+        self._usage_labels: Dict[str, ctk.CTkLabel] = {}
+        self._usage_job: Optional[str] = None
+        
         self._setup_window()
         self._create_widgets()
+        self._refresh_usage()
     
     def _setup_window(self):
         """ウィンドウをセットアップ"""
@@ -464,10 +479,14 @@ class PluginManagerWindow(ctk.CTkToplevel):
             print(f"更新情報の取得に失敗: {e}")
             self.available_updates = {}
     
-    def _create_plugin_item(self, parent, plugin_name: str, is_enabled: bool):
+    def _create_plugin_item(self, parent, plugin_name: str, is_enabled: bool, before=None):
         """プラグインアイテムを作成"""
         item_frame = ctk.CTkFrame(parent)
-        item_frame.pack(fill="x", pady=5, padx=5)
+        if before is not None:
+            item_frame.pack(fill="x", pady=5, padx=5, before=before)
+        else:
+            item_frame.pack(fill="x", pady=5, padx=5)
+        self._plugin_items[plugin_name] = item_frame
         
         # チェックボックス
         var = ctk.BooleanVar(value=is_enabled)
@@ -492,20 +511,15 @@ class PluginManagerWindow(ctk.CTkToplevel):
         )
         name_label.pack(anchor="w")
         
-        # プラグインの詳細情報を取得（plugin.yamlから直接読み込む）
-        plugin_info = self.installer.get_plugin_info(plugin_name)
+        # プラグインの詳細情報を取得（plugin.yamlの内容のみ、プラグインのコードは読み込まない）
+        plugin_info = self.plugin_manager.get_metadata(plugin_name)
         if plugin_info:
             description = plugin_info.get("description", "説明なし")
             version = plugin_info.get("version", "不明")
             author = plugin_info.get("author", "不明")
             desc_text = f"{description} (v{version} by {author})"
         else:
-            # アクティブなプラグインから取得を試みる（フォールバック）
-            plugin = self.plugin_manager.get_plugin(plugin_name)
-            if plugin:
-                desc_text = f"{plugin.description} (v{plugin.version} by {plugin.author})"
-            else:
-                desc_text = "プラグインの説明がありません"
+            desc_text = "プラグインの説明がありません"
         
         desc_label = ctk.CTkLabel(
             info_frame,
@@ -550,6 +564,59 @@ class PluginManagerWindow(ctk.CTkToplevel):
                 width=60,
             )
             uninstall_btn.pack(side="right", padx=10)
+        
+        # リソース使用量（読み込み済みのプラグインのみ、定期的に更新）
+        usage_label = ctk.CTkLabel(
+            item_frame,
+            text="",
+            font=("Consolas", 10),
+            text_color="gray70",
+            justify="right",
+            anchor="e",
+        )
+        usage_label.pack(side="right", padx=5)
+        self._usage_labels[plugin_name] = usage_label
+    
+    def _refresh_usage(self):
+        """リソース使用量の列を更新（2秒ごと）"""
+        self._usage_job = None
+        usage = self.plugin_manager.resource_usage()
+        for plugin_name, label in list(self._usage_labels.items()):
+            try:
+                label.configure(text=self._format_usage(usage.get(plugin_name)))
+            except Exception:
+                # 作り直された行のラベル
+                self._usage_labels.pop(plugin_name, None)
+        if usage:
+            self._usage_job = self.after(2000, self._refresh_usage)
+    
+    @staticmethod
+    def _format_usage(usage: Optional[Dict[str, Any]]) -> str:
+        """リソース使用量の表示用の文字列"""
+        if not usage:
+            return ""
+        lines = [f"CPU {usage['cpu_percent']:.1f}% ({usage['cpu_ms']:.0f}ms)"]
+        if usage.get("memory_bytes") is not None:
+            lines[0] += f"  {usage['memory_bytes'] / 1024:.0f} KiB"
+        lines.append(
+            f"タイマー {usage['after_jobs']}  起床 {usage['wakeups_per_min']}/分  "
+            f"リスナー {usage['listeners']}  スレッド {usage['threads']}"
+        )
+        if usage.get("scheduled"):
+            lines[1] += f"  予約 {usage['scheduled']}"
+        if usage.get("backoff", 1) > 1:
+            lines[0] += f"  予算超過: 間隔 ×{usage['backoff']}"
+        return "\n".join(lines)
+    
+    def _refresh_plugin_item(self, plugin_name: str):
+        """プラグインアイテムを同じ位置で作り直す"""
+        old = self._plugin_items.get(plugin_name)
+        if old is None:
+            self._reload_plugins()
+            return
+        is_enabled = plugin_name in self.plugin_manager.list_enabled_plugins()
+        self._create_plugin_item(old.master, plugin_name, is_enabled, before=old)
+        old.destroy()
     
     def _uninstall_plugin(self, plugin_name: str):
         """プラグインをアンインストール"""
@@ -573,7 +640,7 @@ class PluginManagerWindow(ctk.CTkToplevel):
         
         def do_uninstall():
             # 有効な場合は先に無効化
-            if plugin_name in self.plugin_manager.list_active_plugins():
+            if plugin_name in self.plugin_manager.list_enabled_plugins():
                 self.plugin_manager.unload_plugin(plugin_name)
             
             success, msg = self.installer.uninstall(plugin_name)
@@ -638,10 +705,8 @@ class PluginManagerWindow(ctk.CTkToplevel):
         def do_update():
             dialog.destroy()
             
-            # プラグインを無効化
-            was_enabled = plugin_name in self.plugin_manager.list_enabled_plugins()
-            if was_enabled:
-                self.plugin_manager.unload_plugin(plugin_name)
+            # 動作中のプラグインは止めずに、新しいファイルを配置してからホットリロードする
+            was_active = self.plugin_manager.get_plugin(plugin_name) is not None
             
             # 既存のプラグインをアンインストール
             success, msg = self.installer.uninstall(plugin_name)
@@ -673,12 +738,13 @@ class PluginManagerWindow(ctk.CTkToplevel):
                 ok_btn = ctk.CTkButton(success_dialog, text="OK", command=success_dialog.destroy)
                 ok_btn.pack(pady=10)
                 
-                # 以前有効だった場合は再度有効化
-                if was_enabled:
-                    self.plugin_manager.load_plugin(plugin_name)
+                # 動作中だった場合は状態を引き継いで新しいコードに切り替える
+                if was_active:
+                    self.plugin_manager.reload_plugin(plugin_name)
                 
-                # リストを再読み込み
-                self._reload_plugins()
+                # このプラグインの行だけを作り直す
+                self.available_updates.pop(plugin_name, None)
+                self._refresh_plugin_item(plugin_name)
             else:
                 # エラーダイアログ
                 error_dialog = ctk.CTkToplevel(self)
@@ -709,7 +775,7 @@ class PluginManagerWindow(ctk.CTkToplevel):
         """プラグインの有効/無効を切り替え"""
         try:
             if enable:
-                success = self.plugin_manager.load_plugin(plugin_name)
+                success = self.plugin_manager.start_plugins([plugin_name]).get(plugin_name, False)
                 if success:
                     print(f"プラグイン '{plugin_name}' を有効化しました")
                 else:
@@ -739,9 +805,17 @@ class PluginManagerWindow(ctk.CTkToplevel):
             self.master,
             self.plugin_manager,
             self.on_plugin_changed,
+            installer=self.installer,
         )
         new_window.focus()
     
+    def destroy(self):
+        """ウィンドウを破棄（リソース使用量の更新を止める）"""
+        if self._usage_job is not None:
+            self.after_cancel(self._usage_job)
+            self._usage_job = None
+        super().destroy()
+    
     def _on_closing(self):
         """ウィンドウを閉じる"""
         if self.on_plugin_changed:
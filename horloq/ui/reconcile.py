@@ -0,0 +1,185 @@
+"""
+キー付きウィジェットの差分更新
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class WidgetReconciler:
+    """
+    キー（プラグイン名）ごとのウィジェットの差分更新
+
+    表示したいキーの並びを受け取り、新しいキーのウィジェットだけを作成（マウント）し、
+    なくなったキーのウィジェットだけを破棄（アンマウント）する。残ったウィジェットは
+    作り直さず、pack の順序を入れ替えて並べ直す。
+    """
+
+    def __init__(
+        self,
+        container,
+        factory: Callable[[str, Any, Any], Optional[Any]],
+        pack_options: Optional[Dict[str, Any]] = None,
+        on_mount: Optional[Callable[[str, Any, float], None]] = None,
+        on_unmount: Optional[Callable[[str, Any], None]] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            container: ウィジェットを並べる親フレーム
+            factory: (キー, 元データ, 親) を受け取りウィジェットを返す関数（Noneの場合は表示しない）
+            pack_options: pack に渡すオプション
+            on_mount: マウント後に (キー, ウィジェット, 所要時間ミリ秒) で呼ばれる
+            on_unmount: アンマウント前に (キー, ウィジェット) で呼ばれる
+        """
+        self.container = container
+        self.factory = factory
+        self.pack_options = pack_options or {}
+        self.on_mount = on_mount
+        self.on_unmount = on_unmount
+
+        # キー → (元データ, ウィジェット)。並びは表示順
+        self._mounted: Dict[str, Tuple[Any, Any]] = {}
+        # キー → 直近のマウントにかかった時間（ミリ秒）
+        self.mount_times: Dict[str, float] = {}
+
+    @property
+    def keys(self) -> List[str]:
+        """マウント中のキー（表示順）"""
+        return list(self._mounted)
+
+    def get_widget(self, key: str) -> Optional[Any]:
+        """
+        マウント中のウィジェットを取得
+
+        Args:
+            key: キー
+
+        Returns:
+            ウィジェット（マウントされていない場合はNone）
+        """
+        entry = self._mounted.get(key)
+        return entry[1] if entry else None
+
+    def replace_source(self, key: str, source: Any) -> bool:
+        """
+        ウィジェットを作り直さずにキーの元データだけを差し替える
+
+        ウィジェットの中身を呼び出し元が入れ替える場合（プラグインのホットリロードなど）に、
+        次の reconcile() でウィジェットが作り直されないようにする。
+
+        Args:
+            key: キー
+            source: 新しい元データ
+
+        Returns:
+            キーがマウントされていた場合True
+        """
+        entry = self._mounted.get(key)
+        if entry is None:
+            return False
+        self._mounted[key] = (source, entry[1])
+        return True
+
+    def reconcile(self, items: List[Tuple[str, Any]]):
+        """
+        表示内容を items に合わせる
+
+        元データ（プラグインのインスタンスなど）が変わったキーは作り直す。
+
+        Args:
+            items: 表示順の (キー, 元データ) のリスト
+        """
+        wanted = dict(items)
+
+        # なくなったキー・元データが変わったキーをアンマウント
+        for key, (source, _widget) in list(self._mounted.items()):
+            if key not in wanted or wanted[key] is not source:
+                self.unmount(key)
+
+        # 新しいキーをマウント
+        order: List[str] = []
+        for key, source in items:
+            if key not in self._mounted and not self._mount(key, source):
+                continue
+            order.append(key)
+
+        self._reorder(order)
+
+    def unmount(self, key: str):
+        """
+        キーのウィジェットを破棄
+
+        Args:
+            key: キー
+        """
+        entry = self._mounted.pop(key, None)
+        if entry is None:
+            return
+
+        widget = entry[1]
+        if self.on_unmount:
+            try:
+                self.on_unmount(key, widget)
+            except Exception as e:
+                print(f"アンマウント処理のエラー ({key}): {e}")
+        try:
+            widget.destroy()
+        except Exception:
+            pass
+
+    def clear(self):
+        """すべてのウィジェットを破棄"""
+        for key in list(self._mounted):
+            self.unmount(key)
+
+    def _mount(self, key: str, source: Any) -> bool:
+        """ウィジェットを作成して末尾に配置（順序は _reorder で整える）"""
+        start = time.perf_counter()
+        try:
+            widget = self.factory(key, source, self.container)
+        except Exception as e:
+            print(f"ウィジェットの作成エラー ({key}): {e}")
+            return False
+        if widget is None:
+            return False
+
+        widget.pack(**self.pack_options)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._mounted[key] = (source, widget)
+        self.mount_times[key] = elapsed_ms
+
+        if self.on_mount:
+            try:
+                self.on_mount(key, widget, elapsed_ms)
+            except Exception as e:
+                print(f"マウント処理のエラー ({key}): {e}")
+        return True
+
+    def _reorder(self, order: List[str]):
+        """pack の順序を order に合わせる（ずれている位置以降だけを移動）"""
+        current = [key for key in self._mounted if key in order]
+        self._mounted = {key: self._mounted[key] for key in order}
+
+        if current == order:
+            return
+
+        previous = None
+        for index, key in enumerate(order):
+            widget = self._mounted[key][1]
+            if index < len(current) and current[index] == key and previous is None:
+                # 先頭から順序が一致している部分はそのまま
+                continue
+            if previous is None and index > 0:
+                previous = self._mounted[order[index - 1]][1]
+            if previous is None:
+                widget.pack_configure(before=self._first_slave(widget))
+            else:
+                widget.pack_configure(after=previous)
+            previous = widget
+
+    def _first_slave(self, widget):
+        """コンテナ内で先頭に pack されているウィジェット"""
+        slaves = self.container.pack_slaves()
+        return slaves[0] if slaves else widget
@@ -0,0 +1,192 @@
+"""
+別プロセスのプラグインのウィジェット（記述ツリーの描画）
+"""
+
+import customtkinter as ctk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..plugins.isolation import ROOT_ID
+
+
+class RemoteWidget(ctk.CTkFrame):
+    """
+    記述ツリーを描画するフレーム
+
+    ノードのIDごとにウィジェットを持ち、パッチの "update" は configure で、
+    "replace" は同じ位置に作り直して反映する。
+    """
+
+    def __init__(
+        self,
+        master,
+        styles=None,
+        on_command: Optional[Callable[[str, Any], None]] = None,
+        **kwargs
+    ):
+        """
+        初期化
+
+        Args:
+            master: 親ウィジェット
+            styles: StyleRegistry（テーマの色を適用する場合）
+            on_command: ボタンが押されたときに (command, 値) で呼ばれる
+            **kwargs: その他のフレームオプション
+        """
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.styles = styles
+        self.on_command = on_command
+
+        # ノードのID → ウィジェット
+        self._widgets: Dict[str, Any] = {}
+        # ノードのID → ボタンの command（更新で変わっても同じボタンから送る）
+        self._commands: Dict[str, str] = {}
+        # ノードのID → 親の並べ方（"top" または "left"）
+        self._sides: Dict[str, str] = {}
+
+    def render(self, tree: Optional[Dict[str, Any]]):
+        """
+        ツリー全体を描画し直す
+
+        Args:
+            tree: 記述ツリー
+        """
+        self._clear()
+        if tree is not None:
+            self._build(tree, self, ROOT_ID, "top")
+
+    def apply(self, patches: List[Tuple]):
+        """
+        パッチを反映
+
+        Args:
+            patches: ("replace", ID, ノード) または ("update", ID, {プロパティ: 値}) のリスト
+        """
+        for op, node_id, value in patches:
+            if op == "replace":
+                self._replace(node_id, value)
+            elif op == "update":
+                widget = self._widgets.get(node_id)
+                if widget is not None:
+                    self._configure(node_id, widget, value)
+
+    def show_status(self, text: str, action: Optional[Tuple[str, Callable[[], None]]] = None):
+        """
+        ツリーの代わりに状態（起動中・エラー）を表示
+
+        Args:
+            text: 表示する文字列
+            action: (ボタンの文字列, 押されたときの処理)
+        """
+        self._clear()
+        label = ctk.CTkLabel(self, text=text, font=("Arial", 11), anchor="w")
+        if self.styles is not None:
+            self.styles.register(label, text_color="fg_secondary")
+        label.pack(side="left", padx=10, pady=6)
+        self._widgets[ROOT_ID] = label
+        if action is not None:
+            button = ctk.CTkButton(self, text=action[0], width=60, height=24, command=action[1])
+            if self.styles is not None:
+                self.styles.register(button, fg_color="accent", hover_color="hover")
+            button.pack(side="right", padx=10, pady=6)
+
+    def _clear(self):
+        """描画したウィジェットをすべて破棄"""
+        for child in self.winfo_children():
+            child.destroy()
+        self._widgets.clear()
+        self._commands.clear()
+        self._sides.clear()
+
+    def _replace(self, node_id: str, node: Optional[Dict[str, Any]]):
+        """ノードを同じ位置に作り直す"""
+        old = self._widgets.get(node_id)
+        if node_id == ROOT_ID or old is None:
+            self.render(node)
+            return
+
+        side = self._sides.get(node_id, "top")
+        self._forget(node_id)
+        if node is not None:
+            self._build(node, old.master, node_id, side, before=old)
+        old.destroy()
+
+    def _forget(self, node_id: str):
+        """ノードと子孫のIDを記録から外す"""
+        prefix = node_id + "/"
+        for key in [k for k in self._widgets if k == node_id or k.startswith(prefix)]:
+            self._widgets.pop(key, None)
+            self._commands.pop(key, None)
+            self._sides.pop(key, None)
+
+    def _build(self, node: Dict[str, Any], parent, node_id: str, side: str, before=None):
+        """ノードとその子孫のウィジェットを作成して配置"""
+        node_type = node.get("type", "frame")
+        if node_type == "label":
+            widget = ctk.CTkLabel(parent, text=str(node.get("text", "")))
+            if self.styles is not None and "text_color" not in node:
+                self.styles.register(widget, text_color="fg")
+        elif node_type == "button":
+            widget = ctk.CTkButton(
+                parent,
+                text=str(node.get("text", "")),
+                command=lambda: self._on_click(node_id),
+            )
+            if self.styles is not None and "fg_color" not in node:
+                self.styles.register(widget, fg_color="accent", hover_color="hover")
+        elif node_type == "progress":
+            widget = ctk.CTkProgressBar(parent)
+            if self.styles is not None:
+                self.styles.register(widget, progress_color="accent")
+        else:
+            widget = ctk.CTkFrame(parent, fg_color="transparent")
+
+        self._widgets[node_id] = widget
+        self._sides[node_id] = side
+        self._configure(node_id, widget, node)
+
+        pack_options = {
+            "side": side,
+            "padx": node.get("padx", 0),
+            "pady": node.get("pady", 0),
+            "fill": node.get("fill", "none"),
+            "expand": bool(node.get("expand", False)),
+        }
+        if before is not None:
+            pack_options["before"] = before
+        widget.pack(**pack_options)
+
+        child_side = "left" if node.get("direction") == "row" else "top"
+        for index, child in enumerate(node.get("children") or []):
+            self._build(child, widget, f"{node_id}/{child.get('key', index)}", child_side)
+
+    def _configure(self, node_id: str, widget, props: Dict[str, Any]):
+        """プロパティをウィジェットに反映"""
+        options: Dict[str, Any] = {}
+        for key in ("text", "text_color", "fg_color", "width", "height", "anchor"):
+            if key in props:
+                value = props[key]
+                if value is None:
+                    continue
+                options[key] = str(value) if key == "text" else value
+        if props.get("font") is not None:
+            options["font"] = tuple(props["font"]) if isinstance(props["font"], list) else props["font"]
+
+        if "command" in props and props["command"] is not None:
+            self._commands[node_id] = props["command"]
+        if props.get("value") is not None and isinstance(widget, ctk.CTkProgressBar):
+            widget.set(float(props["value"]))
+
+        # フレームは text などを持たないため、受け付けるオプションだけを渡す
+        if isinstance(widget, ctk.CTkFrame):
+            options = {k: v for k, v in options.items() if k in ("fg_color", "width", "height")}
+        if options:
+            try:
+                widget.configure(**options)
+            except Exception as e:
+                print(f"プラグインのウィジェットの更新エラー ({node_id}): {e}")
+
+    def _on_click(self, node_id: str):
+        """ボタンの command をプラグインに送る"""
+        command = self._commands.get(node_id)
+        if command is not None and self.on_command is not None:
+            self.on_command(command, None)
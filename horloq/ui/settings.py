@@ -442,10 +442,17 @@ class SettingsWindow(ctk.CTkToplevel):
         if file_path:
             try:
                 self.config.import_config(Path(file_path))
-                # 成功メッセージを表示
-                self._show_message("成功", "設定をインポートしました\nアプリを再起動してください")
             except Exception as e:
                 self._show_message("エラー", f"インポートに失敗しました: {e}")
+                return
+            
+            # 変更を即座に反映
+            if self.on_save:
+                self.on_save()
+            
+            # 成功メッセージを表示（画面の入力値は古くなるため閉じる）
+            self._show_message("成功", "設定をインポートしました")
+            self.destroy()
     
     def _show_message(self, title: str, message: str):
         """メッセージダイアログを表示"""
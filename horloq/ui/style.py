@@ -0,0 +1,323 @@
+"""
+ウィジェットのスタイル登録
+"""
+
+import tkinter
+import weakref
+import customtkinter as ctk
+from typing import Any, Dict, Optional, Set, Tuple
+from ..core.events import EventManager
+from ..core.theme import Theme, ThemeManager
+from .animation import Animator, color_ramp, linear
+
+
+class StyleRegistry:
+    """
+    ウィジェットとテーマロールの対応表
+
+    ウィジェットは使用するテーマロール（fg, bg_secondary, accent など）を
+    オプション名ごとに登録する。テーマが切り替わると、新旧のテーマで値が
+    異なるロールを使っているウィジェットだけを、アイドル時にまとめて再設定する。
+    Animator が設定されている場合は、新旧の色の間をクロスフェードさせる。
+    """
+
+    ROLES = ("bg", "fg", "accent", "bg_secondary", "fg_secondary", "border", "hover")
+
+    # テーマ既定値のまま作られたウィジェットに割り当てるロール（MainWindow._apply_theme と対応）
+    DEFAULT_ROLES: Dict[str, Dict[str, str]] = {
+        "CTkFrame": {"fg_color": "bg_secondary"},
+        "CTkLabel": {"text_color": "fg"},
+        "CTkButton": {"fg_color": "accent", "hover_color": "hover", "text_color": "fg"},
+    }
+
+    def __init__(self, theme_manager: ThemeManager, event_manager: EventManager):
+        """
+        初期化
+
+        Args:
+            theme_manager: テーママネージャー
+            event_manager: イベントマネージャー
+        """
+        self.themes = theme_manager
+        self.events = event_manager
+
+        # ウィジェットのパス名 → (弱参照, {オプション名: ロール})
+        self._entries: Dict[str, Tuple[weakref.ref, Dict[str, str]]] = {}
+        # ロール → ウィジェットのパス名
+        self._by_role: Dict[str, Set[str]] = {}
+
+        self._applied_theme: Theme = theme_manager.current_theme
+        self._previous_theme: Theme = self._applied_theme
+        self._pending: Dict[str, Set[str]] = {}
+        self._flush_job: Optional[str] = None
+        self._root = None
+
+        # テーマ切り替えのクロスフェード
+        self.animator: Optional[Animator] = None
+        self.transition_duration = 0.0
+        # フェード中に表示している色（(パス名, オプション名) → 色）
+        self._displayed: Dict[Tuple[str, str], str] = {}
+
+        self.events.on("theme_changed", self._on_theme_changed)
+
+    def bind_root(self, root):
+        """
+        アイドル処理に使うルートウィンドウを設定
+
+        Args:
+            root: Tkのルートウィンドウ
+        """
+        self._root = root
+
+    def set_transition(self, animator: Optional[Animator], duration: float):
+        """
+        テーマ切り替え時のクロスフェードを設定
+
+        Args:
+            animator: アニメーションエンジン（Noneの場合は即座に切り替える）
+            duration: フェードの長さ（秒、0以下の場合は即座に切り替える）
+        """
+        self.animator = animator
+        self.transition_duration = max(0.0, duration)
+
+    def color(self, theme: Theme, role: str) -> str:
+        """
+        テーマからロールの色を取得
+
+        Args:
+            theme: テーマ（ThemeManager が返すテーマは全ロールが補完済み）
+            role: ロール名
+
+        Returns:
+            色
+        """
+        return getattr(theme, role)
+
+    def register(self, widget, apply: bool = True, **roles: str):
+        """
+        ウィジェットが使うロールを登録
+
+        Args:
+            widget: ウィジェット
+            apply: 現在のテーマを即座に適用するかどうか
+            **roles: オプション名とロール名の対応（例: text_color="fg"）
+        """
+        key = str(widget)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is widget:
+            entry[1].update(roles)
+        else:
+            self._entries[key] = (weakref.ref(widget), dict(roles))
+            self._watch_destroy(widget, key)
+
+        for role in roles.values():
+            self._by_role.setdefault(role, set()).add(key)
+
+        if apply:
+            theme = self._applied_theme
+            widget.configure(**{option: self.color(theme, role) for option, role in roles.items()})
+
+    def unregister(self, widget):
+        """
+        ウィジェットの登録を解除
+
+        Args:
+            widget: ウィジェット
+        """
+        self._discard(str(widget))
+
+    def adopt_tree(self, widget):
+        """
+        テーマ既定値のまま作られたウィジェットを子孫も含めて登録
+
+        プラグインのウィジェットなど、ロールを明示的に登録していないウィジェットを
+        テーマ切り替えの対象にする。色を個別に指定しているオプションは対象外。
+
+        Args:
+            widget: 起点のウィジェット
+        """
+        stack = [widget]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.winfo_children())
+
+            defaults = self._default_roles_for(current)
+            if not defaults:
+                continue
+
+            theme_defaults = ctk.ThemeManager.theme.get(type(current).__name__, {})
+            roles = {}
+            for option, role in defaults.items():
+                try:
+                    if current.cget(option) == theme_defaults.get(option):
+                        roles[option] = role
+                except Exception:
+                    continue
+            if roles:
+                self.register(current, apply=False, **roles)
+
+    def _default_roles_for(self, widget) -> Dict[str, str]:
+        """ウィジェットのクラスに対応する既定ロールを取得"""
+        for cls in type(widget).__mro__:
+            roles = self.DEFAULT_ROLES.get(cls.__name__)
+            if roles is not None:
+                return roles
+        return {}
+
+    def _watch_destroy(self, widget, key: str):
+        """
+        ウィジェットが破棄されたら登録情報を削除する
+
+        LazySlot は再表示のたびに adopt_tree() で登録し直すため、破棄されたウィジェットを
+        次のテーマ切り替えまで残すと登録情報が増え続ける。
+        CTk のウィジェットは bind() を内部のキャンバスに振り向けるため、tkinter の bind を直接使う。
+        """
+        def on_destroy(event):
+            # トップレベルには子孫の <Destroy> も届く
+            if str(event.widget) == key:
+                self._discard(key)
+
+        try:
+            tkinter.Misc.bind(widget, "<Destroy>", on_destroy, add="+")
+        except Exception:
+            pass
+
+    def _discard(self, key: str):
+        """登録情報を削除"""
+        entry = self._entries.pop(key, None)
+        self._pending.pop(key, None)
+        if entry is None:
+            return
+        for role in entry[1].values():
+            keys = self._by_role.get(role)
+            if keys is not None:
+                keys.discard(key)
+
+    def _on_theme_changed(self, event):
+        """テーマ変更時に、値が変わったロールを使うウィジェットだけを再設定"""
+        old_theme = self._applied_theme
+        new_theme = self.themes.current_theme
+        self._applied_theme = new_theme
+        if not self._pending:
+            self._previous_theme = old_theme
+
+        changed_roles = [
+            role for role in self.ROLES
+            if self.color(old_theme, role) != self.color(new_theme, role)
+        ]
+
+        for role in changed_roles:
+            for key in self._by_role.get(role, ()):
+                self._pending.setdefault(key, set()).add(role)
+
+        if not self._pending:
+            return
+
+        if self._root is None:
+            self._flush()
+        elif self._flush_job is None:
+            self._flush_job = self._root.after_idle(self._flush)
+
+    def _flush(self):
+        """保留中のウィジェットをまとめて再設定"""
+        self._flush_job = None
+        pending, self._pending = self._pending, {}
+        theme = self._applied_theme
+
+        if self.animator is not None and self.transition_duration > 0:
+            self._fade(pending, self._previous_theme, theme)
+            return
+
+        for key, roles in pending.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            widget = entry[0]()
+            if widget is None or not self._exists(widget):
+                self._discard(key)
+                continue
+
+            options: Dict[str, Any] = {
+                option: self.color(theme, role)
+                for option, role in entry[1].items()
+                if role in roles
+            }
+            try:
+                widget.configure(**options)
+            except Exception as e:
+                print(f"スタイルの適用に失敗しました ({key}): {e}")
+
+    def _fade(self, pending: Dict[str, Set[str]], old_theme: Theme, new_theme: Theme):
+        """
+        保留中のウィジェットを新旧の色の間でクロスフェード
+
+        補間色は切り替えごとに一度だけ計算し、各フレームでは色が変わった
+        ウィジェットだけを再設定する。
+        """
+        steps = max(2, int(self.transition_duration / self.animator.frame_interval) + 1)
+        targets = []
+
+        # 途中で置き換えられたフェードの対象も、現在の色から引き継ぐ
+        for key, option in list(self._displayed):
+            entry = self._entries.get(key)
+            if entry is not None and option in entry[1]:
+                pending.setdefault(key, set()).add(entry[1][option])
+
+        for key, roles in pending.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            widget = entry[0]()
+            if widget is None or not self._exists(widget):
+                self._discard(key)
+                continue
+
+            ramps = {}
+            for option, role in entry[1].items():
+                if role not in roles:
+                    continue
+                start = self._displayed.get((key, option), self.color(old_theme, role))
+                ramps[option] = color_ramp(start, self.color(new_theme, role), steps)
+            if ramps:
+                targets.append((key, entry[0], ramps))
+
+        last_index = [-1]
+
+        def on_frame(t: float):
+            index = round(t * (steps - 1))
+            if index == last_index[0]:
+                return
+            last_index[0] = index
+
+            for key, ref, ramps in targets:
+                widget = ref()
+                if widget is None:
+                    continue
+                options = {}
+                for option, ramp in ramps.items():
+                    color = ramp[min(index, len(ramp) - 1)]
+                    if self._displayed.get((key, option)) != color:
+                        options[option] = color
+                        self._displayed[(key, option)] = color
+                if not options:
+                    continue
+                try:
+                    widget.configure(**options)
+                except Exception:
+                    continue
+
+        self.animator.animate(
+            self.transition_duration,
+            on_frame,
+            easing=linear,
+            on_done=self._displayed.clear,
+            key=("style", "theme"),
+        )
+
+    @staticmethod
+    def _exists(widget) -> bool:
+        """ウィジェットが破棄されていないかどうか"""
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
@@ -0,0 +1,276 @@
+"""
+仮想化されたスクロール可能なウィジェットリスト
+"""
+
+import sys
+import time
+import tkinter
+import customtkinter as ctk
+from typing import Any, Callable, Optional
+
+
+class LazySlot(ctk.CTkFrame):
+    """
+    中身を遅延作成するスロット
+
+    表示範囲に入るまではキャッシュした高さのプレースホルダーとして振る舞い、
+    mount() で初めて factory を呼んで中身のウィジェットを作成する。
+    """
+
+    def __init__(
+        self,
+        master,
+        key: str,
+        factory: Callable[[Any], Optional[Any]],
+        height: int,
+        rebuildable: bool = False,
+        on_mount: Optional[Callable[[str, Any, float], None]] = None,
+        on_measured: Optional[Callable[[str, int], None]] = None,
+        **kwargs
+    ):
+        """
+        初期化
+
+        Args:
+            master: 親ウィジェット
+            key: スロットのキー（プラグイン名）
+            factory: 親を受け取って中身のウィジェットを返す関数（Noneの場合は空のスロット）
+            height: プレースホルダーの高さ（前回の実測値など）
+            rebuildable: 表示範囲から大きく外れたときに中身を破棄してよいかどうか
+            on_mount: 中身の作成後に (キー, ウィジェット, 所要時間ミリ秒) で呼ばれる
+            on_measured: 中身の高さが変わったときに (キー, 高さ) で呼ばれる
+            **kwargs: その他のフレームオプション
+        """
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, height=max(1, height), **kwargs)
+        self.key = key
+        self.factory = factory
+        self.estimated_height = max(1, height)
+        self.rebuildable = rebuildable
+        self.on_mount = on_mount
+        self.on_measured = on_measured
+
+        self.widget: Optional[Any] = None
+        self.empty = False
+
+        # 中身を作るまではプレースホルダーの高さを保つ
+        self.pack_propagate(False)
+
+    @property
+    def mounted(self) -> bool:
+        """中身が作成されているかどうか"""
+        return self.widget is not None
+
+    def mount(self):
+        """中身のウィジェットを作成"""
+        if self.widget is not None or self.empty:
+            return
+
+        start = time.perf_counter()
+        try:
+            widget = self.factory(self)
+        except Exception as e:
+            print(f"ウィジェットの作成エラー ({self.key}): {e}")
+            widget = None
+
+        if widget is None:
+            # 表示するものがないスロットは詰める
+            self.empty = True
+            self.estimated_height = 1
+            self.configure(height=1)
+            self.pack_configure(pady=0)
+            return
+
+        widget.pack(fill="both", expand=True)
+        self.widget = widget
+        self.pack_propagate(True)
+        tkinter.Misc.bind(widget, "<Configure>", self._on_widget_configure, "+")
+
+        if self.on_mount:
+            self.on_mount(self.key, widget, (time.perf_counter() - start) * 1000)
+
+    def unmount(self):
+        """中身を破棄してプレースホルダーに戻す"""
+        if self.widget is None:
+            return
+
+        widget = self.widget
+        self.widget = None
+        self.pack_propagate(False)
+        self.configure(height=self.estimated_height)
+        try:
+            widget.destroy()
+        except Exception:
+            pass
+
+    def _on_widget_configure(self, event):
+        """中身の実際の高さを記録"""
+        height = event.height
+        if height <= 1 or height == self.estimated_height:
+            return
+        self.estimated_height = height
+        if self.on_measured:
+            self.on_measured(self.key, height)
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    仮想化されたスクロール可能なリスト
+
+    子は inner に pack された LazySlot で、表示範囲（と前後の先読み範囲）に
+    入ったスロットだけ中身を作成する。rebuildable なスロットは表示範囲から
+    大きく外れると中身を破棄する。スロットの位置は各スロットの推定高さから
+    計算するため、レイアウトの確定を待たずに判定できる。
+    """
+
+    # スロットを pack するときの縦方向の余白（片側）
+    SLOT_PADY = 5
+
+    def __init__(
+        self,
+        master,
+        max_height: int = 400,
+        overscan: float = 0.5,
+        keep_distance: float = 2.0,
+        **kwargs
+    ):
+        """
+        初期化
+
+        Args:
+            master: 親ウィジェット
+            max_height: 表示領域の最大の高さ（これを超えるとスクロールする）
+            overscan: 表示範囲の前後に先読みする量（表示領域の高さに対する割合）
+            keep_distance: rebuildable なスロットの中身を破棄する距離（表示領域の高さに対する割合）
+            **kwargs: その他のフレームオプション
+        """
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.max_height = max_height
+        self.overscan = overscan
+        self.keep_distance = keep_distance
+
+        self.canvas = tkinter.Canvas(self, height=1, highlightthickness=0, borderwidth=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.inner = ctk.CTkFrame(self.canvas, fg_color="transparent")
+        self._window_id = self.canvas.create_window(0, 0, window=self.inner, anchor="nw")
+
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._scrollbar_visible = False
+
+        tkinter.Misc.bind(self.inner, "<Configure>", self._on_inner_configure, "+")
+        tkinter.Misc.bind(self.canvas, "<Configure>", self._on_canvas_configure, "+")
+        tkinter.Misc.bind(self.canvas, "<Enter>", self._bind_wheel, "+")
+        tkinter.Misc.bind(self.canvas, "<Leave>", self._unbind_wheel, "+")
+
+        self._check_job: Optional[str] = None
+
+    def slots(self):
+        """表示順のスロット"""
+        return [slot for slot in self.inner.pack_slaves() if isinstance(slot, LazySlot)]
+
+    def refresh(self):
+        """表示範囲の判定をアイドル時に予約"""
+        if self._check_job is None:
+            self._check_job = self.after_idle(self._update_visibility)
+
+    def _slot_extent(self, slot: LazySlot) -> int:
+        """スロットが占める高さ（余白込み）"""
+        if slot.empty:
+            return slot.estimated_height
+        return slot.estimated_height + self.SLOT_PADY * 2
+
+    def _update_visibility(self):
+        """表示範囲に入ったスロットの中身を作成し、遠く離れたものを破棄"""
+        self._check_job = None
+        slots = self.slots()
+        if not slots:
+            # 空のフレームは既定の大きさを要求し続けるため、表示領域を明示的に畳む
+            self._resize_viewport(0)
+            return
+
+        total = sum(self._slot_extent(slot) for slot in slots)
+        viewport = self.canvas.winfo_height()
+        if viewport <= 1:
+            viewport = min(total, self.max_height)
+        first, _last = self.canvas.yview()
+        top = first * total
+        bottom = top + viewport
+
+        near_top = top - viewport * self.overscan
+        near_bottom = bottom + viewport * self.overscan
+        far_top = top - viewport * self.keep_distance
+        far_bottom = bottom + viewport * self.keep_distance
+
+        y = 0
+        for slot in slots:
+            extent = self._slot_extent(slot)
+            y0, y1 = y, y + extent
+            y = y1
+
+            if y1 >= near_top and y0 <= near_bottom:
+                slot.mount()
+            elif slot.rebuildable and slot.mounted and (y1 < far_top or y0 > far_bottom):
+                slot.unmount()
+
+    def _on_inner_configure(self, event):
+        """中身の大きさに合わせてスクロール範囲と表示領域の高さを更新"""
+        self.canvas.configure(scrollregion=(0, 0, event.width, event.height))
+        self._resize_viewport(event.height if self.inner.pack_slaves() else 0)
+        self.refresh()
+
+    def _resize_viewport(self, content_height: int):
+        """表示領域の高さを中身に合わせ、はみ出す場合はスクロールバーを表示"""
+        height = max(1, min(content_height, self.max_height))
+        if int(self.canvas.cget("height")) != height:
+            self.canvas.configure(height=height)
+
+        overflow = content_height > self.max_height
+        if overflow != self._scrollbar_visible:
+            self._scrollbar_visible = overflow
+            if overflow:
+                self.scrollbar.pack(side="right", fill="y")
+            else:
+                self.scrollbar.pack_forget()
+                self.canvas.yview_moveto(0)
+
+    def _on_canvas_configure(self, event):
+        """中身の幅を表示領域に合わせる"""
+        self.canvas.itemconfigure(self._window_id, width=event.width)
+        self.refresh()
+
+    def _on_yscroll(self, first, last):
+        """スクロール位置の変更"""
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _bind_wheel(self, event):
+        """ポインタが乗っている間だけホイールでスクロールする"""
+        if sys.platform.startswith("linux"):
+            self.canvas.bind_all("<Button-4>", self._on_wheel)
+            self.canvas.bind_all("<Button-5>", self._on_wheel)
+        else:
+            self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+
+    def _unbind_wheel(self, event):
+        """ホイールのバインドを解除"""
+        if sys.platform.startswith("linux"):
+            self.canvas.unbind_all("<Button-4>")
+            self.canvas.unbind_all("<Button-5>")
+        else:
+            self.canvas.unbind_all("<MouseWheel>")
+
+    def _on_wheel(self, event):
+        """ホイールでスクロール"""
+        if not self._scrollbar_visible:
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -event.delta // 120
+        self.canvas.yview_scroll(delta, "units")
@@ -9,6 +9,7 @@ import sys
 from ..core.config import ConfigManager
 from ..core.events import EventManager
 from ..core.theme import ThemeManager
+from .geometry import GeometryTracker
 
 
 class MainWindow(ctk.CTk):
@@ -19,6 +20,7 @@ class MainWindow(ctk.CTk):
         config_manager: ConfigManager,
         event_manager: EventManager,
         theme_manager: ThemeManager,
+        styles=None,
     ):
         """
         初期化
@@ -27,16 +29,24 @@ class MainWindow(ctk.CTk):
             config_manager: 設定マネージャー
             event_manager: イベントマネージャー
             theme_manager: テーママネージャー
+            styles: StyleRegistry（指定した場合は背景色をテーマロールとして登録）
         """
         super().__init__()
         
         self.config = config_manager
         self.events = event_manager
         self.themes = theme_manager
+        self.styles = styles
         
         self._setup_window()
         self._apply_theme()
         
+        if self.styles is not None:
+            self.styles.register(self, fg_color="bg")
+        
+        # 移動・リサイズが落ち着いたら位置とサイズを保存
+        self.geometry_tracker = GeometryTracker(self, self._save_geometry)
+        
         # イベントリスナーを登録
         self.events.on("theme_changed", self._on_theme_changed)
         self.events.on("config_changed", self._on_config_changed)
@@ -55,9 +65,8 @@ class MainWindow(ctk.CTk):
         if x is not None and y is not None:
             self.geometry(f"{width}x{height}+{x}+{y}")
         else:
-            self.geometry(f"{width}x{height}")
             # 画面中央に配置
-            self._center_window()
+            self._center_window(width, height)
         
         # 常に最前面
         if self.config.get("window.always_on_top", True):
@@ -73,19 +82,21 @@ class MainWindow(ctk.CTk):
         # ウィンドウを閉じるときのイベント
         self.protocol("WM_DELETE_WINDOW", self._on_close)
     
-    def _center_window(self):
-        """ウィンドウを画面中央に配置"""
-        self.update_idletasks()
+    def _center_window(self, width: int, height: int):
+        """
+        ウィンドウを画面中央に配置
         
-        width = self.winfo_width()
-        height = self.winfo_height()
+        Args:
+            width: ウィンドウの幅
+            height: ウィンドウの高さ
+        """
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         
         x = (screen_width - width) // 2
         y = (screen_height - height) // 2
         
-        self.geometry(f"+{x}+{y}")
+        self.geometry(f"{width}x{height}+{x}+{y}")
     
     def _set_window_icon(self):
         """ウィンドウアイコンを設定"""
@@ -126,15 +137,16 @@ class MainWindow(ctk.CTk):
         is_dark = theme.name.lower() != "light"
         ctk.set_appearance_mode("dark" if is_dark else "light")
         
-        # 背景色とテキスト色を設定
-        self.configure(fg_color=theme.bg)
+        # 背景色を設定（スタイル登録済みの場合は StyleRegistry が差分を適用する）
+        if self.styles is None:
+            self.configure(fg_color=theme.bg)
         
-        # デフォルトカラーをオーバーライド
+        # これから作られるウィジェットのデフォルトカラーをオーバーライド
         ctk.ThemeManager.theme["CTk"]["fg_color"] = [theme.bg, theme.bg]
-        ctk.ThemeManager.theme["CTkFrame"]["fg_color"] = [theme.bg_secondary or theme.bg, theme.bg_secondary or theme.bg]
+        ctk.ThemeManager.theme["CTkFrame"]["fg_color"] = [theme.bg_secondary, theme.bg_secondary]
         ctk.ThemeManager.theme["CTkLabel"]["text_color"] = [theme.fg, theme.fg]
         ctk.ThemeManager.theme["CTkButton"]["fg_color"] = [theme.accent, theme.accent]
-        ctk.ThemeManager.theme["CTkButton"]["hover_color"] = [theme.hover or theme.accent, theme.hover or theme.accent]
+        ctk.ThemeManager.theme["CTkButton"]["hover_color"] = [theme.hover, theme.hover]
         ctk.ThemeManager.theme["CTkButton"]["text_color"] = [theme.fg, theme.fg]
     
     def _on_theme_changed(self, event):
@@ -147,12 +159,28 @@ class MainWindow(ctk.CTk):
         if event.data and "window" in event.data:
             self._setup_window()
     
+    def _save_geometry(self, changed: dict):
+        """
+        位置とサイズを設定に反映（書き込みは ConfigManager がまとめて行う）
+        
+        Args:
+            changed: 変化した値（x, y, width, height）
+        """
+        updated = {}
+        for key, value in changed.items():
+            if self.config.get(f"window.{key}") != value:
+                self.config.set(f"window.{key}", value)
+                updated[key] = value
+        
+        if updated:
+            self.config.save_later()
+            self.events.emit("window_geometry_changed", updated)
+    
     def _on_close(self):
         """ウィンドウを閉じる処理"""
-        # 現在の位置を保存
-        self.config.set("window.x", self.winfo_x())
-        self.config.set("window.y", self.winfo_y())
-        self.config.save()
+        # 現在の位置とサイズを保存
+        self.geometry_tracker.flush()
+        self.config.flush()
         
         # イベントを発行
         self.events.emit("app_closing")
@@ -0,0 +1,62 @@
+"""
+起動トリガーの時刻指定（CronSchedule）のテスト
+"""
+
+from datetime import datetime
+import pytest
+from horloq.plugins.activation import CronSchedule
+
+
+def test_every_minute_matches_any_time():
+    schedule = CronSchedule("* * * * *")
+    assert schedule.matches(datetime(2024, 1, 1, 0, 0))
+    assert schedule.matches(datetime(2024, 12, 31, 23, 59))
+
+
+def test_fixed_time_on_weekdays():
+    schedule = CronSchedule("0 7 * * 1-5")
+    assert schedule.matches(datetime(2024, 6, 3, 7, 0))  # 月曜日
+    assert schedule.matches(datetime(2024, 6, 7, 7, 0))  # 金曜日
+    assert not schedule.matches(datetime(2024, 6, 8, 7, 0))  # 土曜日
+    assert not schedule.matches(datetime(2024, 6, 3, 7, 1))
+    assert not schedule.matches(datetime(2024, 6, 3, 8, 0))
+
+
+def test_steps_and_lists():
+    schedule = CronSchedule("*/15 9,18 * * *")
+    assert [m for m in range(60) if schedule.matches(datetime(2024, 6, 3, 9, m))] == [0, 15, 30, 45]
+    assert schedule.matches(datetime(2024, 6, 3, 18, 30))
+    assert not schedule.matches(datetime(2024, 6, 3, 12, 30))
+
+
+def test_step_from_a_start_value():
+    schedule = CronSchedule("5/20 * * * *")
+    assert [m for m in range(60) if schedule.matches(datetime(2024, 6, 3, 9, m))] == [5, 25, 45]
+
+
+@pytest.mark.parametrize("weekday_field", ["0", "7"])
+def test_sunday_is_0_or_7(weekday_field):
+    schedule = CronSchedule(f"0 0 * * {weekday_field}")
+    assert schedule.matches(datetime(2024, 6, 2, 0, 0))  # 日曜日
+    assert not schedule.matches(datetime(2024, 6, 3, 0, 0))
+
+
+def test_day_and_month_fields():
+    schedule = CronSchedule("30 12 1 1 *")
+    assert schedule.matches(datetime(2025, 1, 1, 12, 30))
+    assert not schedule.matches(datetime(2025, 2, 1, 12, 30))
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
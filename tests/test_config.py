@@ -0,0 +1,123 @@
+"""
+ConfigManager のレイヤーの解決とキャッシュの破棄のテスト
+"""
+
+import os
+import pytest
+import yaml
+from horloq.core.config import ConfigManager
+
+
+@pytest.fixture
+def make_config(tmp_path, monkeypatch):
+    """一時ディレクトリの設定ファイルとsystemレイヤーで ConfigManager を作る"""
+    system_path = tmp_path / "system.yaml"
+    monkeypatch.setenv(ConfigManager.SYSTEM_CONFIG_ENV, str(system_path))
+    monkeypatch.delenv(ConfigManager.SESSION_CONFIG_ENV, raising=False)
+    for name in list(os.environ):
+        if name.startswith(ConfigManager.ENV_PREFIX):
+            monkeypatch.delenv(name)
+
+    def make(system=None, user=None):
+        if system is not None:
+            system_path.write_text(yaml.safe_dump(system), encoding="utf-8")
+        config_path = tmp_path / "config.yaml"
+        if user is not None:
+            config_path.write_text(yaml.safe_dump(user), encoding="utf-8")
+        return ConfigManager(config_path)
+
+    return make
+
+
+def test_layers_resolve_in_priority_order(make_config):
+    config = make_config(system={"clock": {"font_size": 50}})
+    assert config.get("clock.font_size") == 50
+
+    config.set("clock.font_size", 60)
+    assert config.get("clock.font_size") == 60
+
+    config.set_layer("env", {"clock": {"font_size": 70}})
+    assert config.get("clock.font_size") == 70
+
+
+def test_dict_values_merge_only_below_the_key(make_config):
+    config = make_config(system={"clock": {"font_size": 50}})
+    config.set("clock.timezone", "UTC")
+
+    clock = config.get("clock")
+    assert clock["font_size"] == 50
+    assert clock["timezone"] == "UTC"
+    # 他のレイヤーにしかないキーも残る
+    assert clock["format"] == ConfigManager.DEFAULT_CONFIG["clock"]["format"]
+
+
+def test_set_invalidates_parent_and_child_keys(make_config):
+    config = make_config()
+    assert config.get("clock")["font_size"] == ConfigManager.DEFAULT_CONFIG["clock"]["font_size"]
+    config.get("clock.font_size")
+
+    config.set("clock", {**config.get("clock"), "font_size": 80})
+    assert config.get("clock.font_size") == 80
+
+    config.set("clock.font_size", 90)
+    assert config.get("clock")["font_size"] == 90
+
+
+def test_set_layer_invalidates_only_changed_keys(make_config):
+    config = make_config(system={"clock": {"font_size": 50}, "window": {"width": 500}})
+    assert config.get("clock.font_size") == 50
+    assert config.get("window.width") == 500
+
+    changed = config.set_layer("system", {"clock": {"font_size": 55}, "window": {"width": 500}})
+    assert changed == ["clock.font_size"]
+    assert "window.width" in config._cache
+    assert "clock.font_size" not in config._cache
+    assert config.get("clock.font_size") == 55
+
+
+def test_get_returns_a_copy(make_config):
+    config = make_config()
+    clock = config.get("clock")
+    clock["font_size"] = 1
+    assert config.get("clock.font_size") != 1
+
+
+def test_missing_key_returns_default(make_config):
+    config = make_config()
+    assert config.get("no.such.key", "fallback") == "fallback"
+    config.set("no.such.key", 1)
+    assert config.get("no.such.key", "fallback") == 1
+
+
+def test_user_value_equal_to_builtin_default_overrides_system(make_config):
+    default = ConfigManager.DEFAULT_CONFIG["clock"]["font_size"]
+    config = make_config(
+        system={"clock": {"font_size": default + 10}},
+        user={"clock": {"font_size": default}},
+    )
+    assert config.get("clock.font_size") == default
+
+
+def test_user_values_equal_to_lower_layers_are_pruned(make_config):
+    config = make_config(
+        system={"clock": {"font_size": 50}},
+        user={"clock": {"font_size": 50, "timezone": "UTC"}},
+    )
+    assert config.get_layer("user") == {"clock": {"timezone": "UTC"}}
+
+
+def test_reload_applies_external_changes(make_config, tmp_path):
+    config = make_config()
+    other = ConfigManager(tmp_path / "config.yaml")
+    other.set("clock.timezone", "UTC")
+    other.save()
+
+    received = []
+    config.add_change_listener(received.append)
+    changed = config.reload()
+    assert any(ConfigManager._is_related_key(key, "clock.timezone") for key in changed)
+    assert config.get("clock.timezone") == "UTC"
+    assert received == [changed]
+
+    # 変更がなければ読み直さない
+    assert config.reload() == []
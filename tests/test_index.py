@@ -0,0 +1,150 @@
+"""
+PluginIndex の差分の再構築と永続化のテスト
+"""
+
+import json
+import os
+import pytest
+import yaml
+from horloq.plugins.index import PluginIndex
+
+
+def bump_mtime(path, seconds=10):
+    """mtime を進める（同じ時刻の刻みで書き込んだ場合も変更として検出させる）"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def write_plugin(plugin_dir, name, version="1.0.0", source="VALUE = 1\n"):
+    """ディレクトリ形式のプラグインを作る"""
+    path = plugin_dir / name
+    path.mkdir(exist_ok=True)
+    (path / "plugin.yaml").write_text(yaml.safe_dump({"name": name, "version": version}), encoding="utf-8")
+    (path / "__init__.py").write_text(source, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def plugin_dir(tmp_path):
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    write_plugin(plugin_dir, "alpha")
+    write_plugin(plugin_dir, "beta")
+    return plugin_dir
+
+
+def test_refresh_finds_all_kinds(plugin_dir):
+    (plugin_dir / "legacy.py").write_text("VALUE = 1\n", encoding="utf-8")
+    (plugin_dir / "_private.py").write_text("", encoding="utf-8")
+    (plugin_dir / ".hidden").mkdir()
+
+    entries = PluginIndex([plugin_dir]).refresh()
+    assert sorted(entries) == ["alpha", "beta", "legacy"]
+    assert entries["alpha"].kind == "package"
+    assert entries["alpha"].metadata["version"] == "1.0.0"
+    assert set(entries["alpha"].hashes) == {"__init__.py", "plugin.yaml"}
+    assert entries["legacy"].kind == "module"
+
+
+def test_unchanged_entries_are_reused(plugin_dir):
+    index = PluginIndex([plugin_dir])
+    first = index.refresh()
+    second = index.refresh()
+    assert second["alpha"] is first["alpha"]
+    assert second["beta"] is first["beta"]
+
+
+def test_edited_plugin_yaml_rebuilds_only_that_entry(plugin_dir):
+    index = PluginIndex([plugin_dir])
+    first = index.refresh()
+
+    write_plugin(plugin_dir, "alpha", version="2.0.0")
+    bump_mtime(plugin_dir / "alpha" / "plugin.yaml")
+
+    second = index.refresh()
+    assert second["alpha"] is not first["alpha"]
+    assert second["alpha"].metadata["version"] == "2.0.0"
+    assert second["alpha"].digest != first["alpha"].digest
+    assert second["beta"] is first["beta"]
+
+
+def test_get_uses_the_last_refresh(plugin_dir):
+    index = PluginIndex([plugin_dir])
+    assert index.get("alpha").metadata["version"] == "1.0.0"
+
+    write_plugin(plugin_dir, "alpha", version="2.0.0")
+    bump_mtime(plugin_dir / "alpha" / "plugin.yaml")
+    assert index.get("alpha").metadata["version"] == "1.0.0"
+
+    index.refresh()
+    assert index.get("alpha").metadata["version"] == "2.0.0"
+    assert index.get("missing") is None
+
+
+def test_refresh_entry_picks_up_submodule_edits(plugin_dir):
+    helper = plugin_dir / "alpha" / "helper.py"
+    helper.write_text("X = 1\n", encoding="utf-8")
+    index = PluginIndex([plugin_dir])
+    before = index.refresh()["alpha"].hashes["helper.py"]
+    helper.write_text("X = 2\n", encoding="utf-8")
+
+    # 既存のサブモジュールの編集は refresh() では検出しない
+    assert index.refresh()["alpha"].hashes["helper.py"] == before
+
+    rebuilt = index.refresh_entry("alpha")
+    assert rebuilt.hashes["helper.py"] != before
+    assert index.get("alpha") is rebuilt
+    assert index.refresh_entry("missing") is None
+
+
+def test_added_and_removed_plugins(plugin_dir):
+    index = PluginIndex([plugin_dir])
+    first = index.refresh()
+
+    write_plugin(plugin_dir, "gamma")
+    for child in (plugin_dir / "beta").iterdir():
+        child.unlink()
+    (plugin_dir / "beta").rmdir()
+    bump_mtime(plugin_dir)
+
+    second = index.refresh()
+    assert sorted(second) == ["alpha", "gamma"]
+    assert second["alpha"] is first["alpha"]
+    assert index.get("beta") is None
+
+
+def test_earlier_directories_take_priority(tmp_path, plugin_dir):
+    user_dir = tmp_path / "user_plugins"
+    user_dir.mkdir()
+    write_plugin(user_dir, "alpha", version="9.0.0")
+
+    entries = PluginIndex([user_dir, plugin_dir]).refresh()
+    assert entries["alpha"].metadata["version"] == "9.0.0"
+    assert "beta" in entries
+
+
+def test_index_is_saved_and_reloaded(tmp_path, plugin_dir):
+    index_path = tmp_path / "index.json"
+    first = PluginIndex([plugin_dir], index_path=index_path).refresh()
+
+    data = json.loads(index_path.read_text(encoding="utf-8"))
+    assert data["version"] == PluginIndex.VERSION
+    assert sorted(data["roots"][str(plugin_dir)]["entries"]) == ["alpha", "beta"]
+
+    second = PluginIndex([plugin_dir], index_path=index_path).refresh()
+    assert second["alpha"] == first["alpha"]
+
+
+def test_read_only_index_does_not_write(tmp_path, plugin_dir):
+    index_path = tmp_path / "index.json"
+    PluginIndex([plugin_dir], index_path=index_path, read_only=True).refresh()
+    assert not index_path.exists()
+
+
+def test_broken_index_file_is_rebuilt(tmp_path, plugin_dir, capsys):
+    index_path = tmp_path / "index.json"
+    index_path.write_text(json.dumps({"version": PluginIndex.VERSION, "roots": {"x": {}}}), encoding="utf-8")
+
+    entries = PluginIndex([plugin_dir], index_path=index_path).refresh()
+    assert sorted(entries) == ["alpha", "beta"]
+    assert "作り直します" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+"""
+分離モードの記述ツリーの差分（diff_tree / apply_patches）のテスト
+"""
+
+from copy import deepcopy
+import pytest
+from horloq.plugins.isolation import ROOT_ID, apply_patches, diff_tree, find_node
+
+
+def counter(count, items=("a", "b")):
+    """テスト用の記述ツリー"""
+    return {
+        "type": "frame",
+        "direction": "row",
+        "children": [
+            {"type": "label", "key": "count", "text": f"{count} 回"},
+            {"type": "button", "key": "inc", "text": "+1", "command": "increment"},
+            {
+                "type": "frame",
+                "key": "items",
+                "children": [{"type": "label", "key": item, "text": item} for item in items],
+            },
+        ],
+    }
+
+
+def test_same_tree_has_no_patches():
+    assert diff_tree(counter(1), counter(1)) == []
+
+
+def test_changed_property_is_sent_as_update():
+    patches = diff_tree(counter(1), counter(2))
+    assert patches == [("update", "root/count", {"text": "2 回"})]
+
+
+def test_removed_property_is_sent_as_none():
+    old = counter(1)
+    new = deepcopy(old)
+    del new["direction"]
+    assert diff_tree(old, new) == [("update", ROOT_ID, {"direction": None})]
+
+
+def test_changed_children_replace_the_parent():
+    patches = diff_tree(counter(1, items=("a", "b")), counter(1, items=("b", "a")))
+    assert len(patches) == 1
+    op, node_id, node = patches[0]
+    assert (op, node_id) == ("replace", "root/items")
+    assert [child["key"] for child in node["children"]] == ["b", "a"]
+
+
+def test_changed_type_replaces_the_node():
+    old = counter(1)
+    new = deepcopy(old)
+    new["children"][1]["type"] = "label"
+    assert diff_tree(old, new) == [("replace", "root/inc", new["children"][1])]
+
+
+def test_none_trees():
+    assert diff_tree(None, None) == []
+    assert diff_tree(None, counter(1)) == [("replace", ROOT_ID, counter(1))]
+    assert diff_tree(counter(1), None) == [("replace", ROOT_ID, None)]
+
+
+@pytest.mark.parametrize("old, new", [
+    (None, counter(1)),
+    (counter(1), counter(5)),
+    (counter(1), counter(1, items=("a", "b", "c"))),
+    (counter(1, items=("a",)), counter(3, items=())),
+    (counter(1), {"type": "label", "text": "done"}),
+    (counter(1), None),
+])
+def test_apply_patches_reproduces_the_new_tree(old, new):
+    tree = apply_patches(deepcopy(old), diff_tree(old, new))
+    assert tree == new
+
+
+def test_unkeyed_children_use_their_position():
+    old = {"type": "frame", "children": [{"type": "label", "text": "x"}, {"type": "label", "text": "y"}]}
+    new = deepcopy(old)
+    new["children"][1]["text"] = "z"
+    assert diff_tree(old, new) == [("update", "root/1", {"text": "z"})]
+    assert find_node(new, "root/1") == {"type": "label", "text": "z"}
+
+
+def test_patches_for_missing_nodes_are_ignored():
+    tree = counter(1)
+    patches = [("update", "root/nothing", {"text": "x"}), ("replace", "root/items/zzz", None)]
+    assert apply_patches(deepcopy(tree), patches) == tree
@@ -0,0 +1,211 @@
+"""
+Scheduler をルートウィンドウなしで run_pending() / timeout() から駆動するテスト
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from horloq.core.scheduler import Scheduler
+
+
+class Owner:
+    """予約の持ち主（プラグインの代わり）"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler(budget_percent=0)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def drive(scheduler, until, limit=2.0):
+    """条件を満たすまで timeout() の間だけ待って run_pending() を呼ぶ"""
+    deadline = time.time() + limit
+    while not until():
+        if time.time() > deadline:
+            raise AssertionError("時間内に条件を満たしませんでした")
+        timeout = scheduler.timeout()
+        time.sleep(min(timeout if timeout is not None else 0.01, 0.05))
+        scheduler.run_pending()
+
+
+def test_no_jobs_means_no_timeout(scheduler):
+    assert scheduler.timeout() is None
+
+
+def test_schedule_at_runs_once(scheduler):
+    calls = []
+    scheduler.schedule_at(Owner("a"), time.time() + 0.05, lambda: calls.append(1))
+    assert 0 < scheduler.timeout() <= 0.05
+
+    scheduler.run_pending()
+    assert calls == []
+
+    drive(scheduler, lambda: calls)
+    scheduler.run_pending()
+    assert calls == [1]
+    assert scheduler.timeout() is None
+
+
+def test_past_time_runs_immediately(scheduler):
+    calls = []
+    scheduler.schedule_at(Owner("a"), time.time() - 10, lambda: calls.append(1))
+    assert scheduler.timeout() == 0.0
+    scheduler.run_pending()
+    assert calls == [1]
+
+
+def test_periodic_job_repeats_until_cancelled(scheduler):
+    calls = []
+    job_id = scheduler.schedule_periodic(Owner("a"), 0.02, lambda: calls.append(1), align=False)
+    drive(scheduler, lambda: len(calls) >= 3)
+
+    scheduler.cancel(job_id)
+    assert scheduler.timeout() is None
+    count = len(calls)
+    time.sleep(0.05)
+    scheduler.run_pending()
+    assert len(calls) == count
+
+
+def test_aligned_jobs_share_a_wakeup(scheduler):
+    owner = Owner("a")
+    scheduler.schedule_periodic(owner, 1.0, lambda: None)
+    scheduler.schedule_periodic(owner, 1.0, lambda: None)
+    dues = [job.due for job in scheduler._jobs.values()]
+    assert dues[0] == dues[1]
+    assert dues[0] == int(dues[0])
+
+
+def test_cancel_owner_removes_only_its_jobs(scheduler):
+    a, b = Owner("a"), Owner("b")
+    scheduler.schedule_periodic(a, 1.0, lambda: None)
+    scheduler.schedule_at(a, time.time() + 10, lambda: None)
+    scheduler.schedule_at(b, time.time() + 10, lambda: None)
+
+    assert scheduler.cancel_owner(a) == 2
+    assert scheduler.jobs(a) == 0
+    assert scheduler.jobs(b) == 1
+
+
+def test_paused_owner_does_not_run(scheduler):
+    owner = Owner("a")
+    calls = []
+    scheduler.schedule_at(owner, time.time() - 1, lambda: calls.append(1))
+
+    scheduler.pause_owner(owner)
+    assert scheduler.timeout() is None
+    scheduler.run_pending()
+    assert calls == []
+
+    scheduler.resume_owner(owner)
+    scheduler.run_pending()
+    assert calls == [1]
+
+
+def test_job_can_cancel_a_later_job_in_the_same_batch(scheduler):
+    owner = Owner("a")
+    calls = []
+    now = time.time()
+    scheduler.schedule_at(owner, now - 2, lambda: scheduler.cancel(second))
+    second = scheduler.schedule_at(owner, now - 1, lambda: calls.append(1))
+    scheduler.run_pending()
+    assert calls == []
+
+
+def test_errors_in_jobs_do_not_stop_others(scheduler, capsys):
+    owner = Owner("a")
+    calls = []
+    scheduler.schedule_at(owner, time.time() - 2, lambda: 1 / 0)
+    scheduler.schedule_at(owner, time.time() - 1, lambda: calls.append(1))
+    scheduler.run_pending()
+    assert calls == [1]
+    assert "(a)" in capsys.readouterr().out
+
+
+def test_background_result_is_delivered_by_run_pending(scheduler):
+    owner = Owner("a")
+    results = []
+    threads = []
+
+    def work():
+        threads.append(threading.current_thread())
+        return 42
+
+    scheduler.run_in_background(owner, work, lambda result, error: results.append((result, error, threading.current_thread())))
+    assert scheduler.timeout() is not None
+    drive(scheduler, lambda: results)
+
+    assert results == [(42, None, threading.current_thread())]
+    assert threads[0] is not threading.current_thread()
+    assert scheduler.jobs(owner) == 0
+    assert scheduler.timeout() is None
+
+
+def test_background_error_is_passed_to_on_done(scheduler):
+    results = []
+
+    def work():
+        raise RuntimeError("boom")
+
+    scheduler.run_in_background(Owner("a"), work, lambda result, error: results.append((result, error)))
+    drive(scheduler, lambda: results)
+    assert results[0][0] is None
+    assert isinstance(results[0][1], RuntimeError)
+
+
+def test_cancelled_background_job_is_not_reported(scheduler):
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def work():
+        started.set()
+        release.wait(1)
+
+    owner = Owner("a")
+    job_id = scheduler.run_in_background(owner, work, lambda result, error: results.append(result))
+    started.wait(1)
+    scheduler.cancel(job_id)
+    release.set()
+    time.sleep(0.05)
+    scheduler.run_pending()
+    assert results == []
+    assert scheduler.jobs(owner) == 0
+
+
+def test_coroutine_runs_off_the_calling_thread(scheduler):
+    results = []
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return threading.current_thread()
+
+    scheduler.run_coroutine(Owner("a"), work(), lambda result, error: results.append((result, error)))
+    drive(scheduler, lambda: results)
+    thread, error = results[0]
+    assert error is None
+    assert thread is not threading.current_thread()
+
+
+def test_tasks_created_by_a_coroutine_keep_running(scheduler):
+    done = threading.Event()
+    results = []
+
+    async def background():
+        await asyncio.sleep(0.05)
+        done.set()
+
+    async def work():
+        asyncio.get_running_loop().create_task(background())
+        return "ready"
+
+    scheduler.run_coroutine(Owner("a"), work(), lambda result, error: results.append(result))
+    drive(scheduler, lambda: results)
+    assert results == ["ready"]
+    assert done.wait(1)